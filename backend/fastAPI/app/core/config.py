@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
@@ -9,14 +10,65 @@ class Settings:
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
     REDIS_TTL: int = 60 * 60 * 24  # 24 Stunden Cache-Zeit
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))  # Pool des API-Caches pro Worker
+
+    # Datenbank: "supabase" (RPC exec_sql) oder "postgres" (asyncpg-Pool)
+    DATABASE_BACKEND: str = os.getenv("DATABASE_BACKEND", "supabase")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://postgres@localhost:5432/postgres")
+    DATABASE_POOL_MIN_SIZE: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", 2))
+    DATABASE_POOL_MAX_SIZE: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", 10))
 
     # API Football Settings
     API_FOOTBALL_KEY: str = os.getenv("API_FOOTBALL_KEY")
-    API_FOOTBALL_URL: str = "https://v3.football.api-sports.io"
+    API_FOOTBALL_URL: str = os.getenv("API_FOOTBALL_URL", "https://v3.football.api-sports.io")
     API_FOOTBALL_HEADERS: dict = {
         'x-rapidapi-host': "api-football-v1.p.rapidapi.com",
         'x-rapidapi-key': API_FOOTBALL_KEY
     }
+    API_FOOTBALL_TIMEOUT: float = float(os.getenv("API_FOOTBALL_TIMEOUT", 10))  # Sekunden pro Versuch
+    API_FOOTBALL_RETRIES: int = int(os.getenv("API_FOOTBALL_RETRIES", 3))  # Wiederholungen bei 429/5xx
+    API_FOOTBALL_BACKOFF: float = float(os.getenv("API_FOOTBALL_BACKOFF", 0.5))  # Sekunden, verdoppelt pro Versuch
+    API_FOOTBALL_MAX_CONNECTIONS: int = int(os.getenv("API_FOOTBALL_MAX_CONNECTIONS", 20))
+
+    # Optimierung
+    # SA-Budget in Sekunden für Anfragen ohne latency_budget/time_budget (Kombinationen,
+    # Batch pro Anfrage, Stream, Jobs). Der adaptive Plan nutzt sein Budget aus
+    # (gedeckelt durch max_iterations), daher bewusst kurz statt des früheren Zeitlimits von 10 s
+    SA_DEFAULT_BUDGET: float = float(os.getenv("SA_DEFAULT_BUDGET", 0.5))
+    # Anzahl paralleler SA-Ketten (0/1 = eine Kette im Event-Loop-Prozess)
+    SA_PARALLEL_CHAINS: int = int(os.getenv("SA_PARALLEL_CHAINS", 0))
+    # Sekunden zwischen Migrationen der besten Lösung (0 = keine Migration)
+    SA_MIGRATION_INTERVAL: float = float(os.getenv("SA_MIGRATION_INTERVAL", 0))
+    # Prozesse im gemeinsamen Pool (parallele SA-Ketten, Batch-Anfragen), 0 = Anzahl CPUs.
+    # Pro uvicorn-Worker ein Pool; gestartet beim App-Start nur mit SA_PARALLEL_CHAINS > 1,
+    # sonst bei der ersten Batch-Anfrage
+    PROCESS_POOL_WORKERS: int = int(os.getenv("PROCESS_POOL_WORKERS", 0))
+
+    # Hintergrund-Jobs
+    JOB_STORE: str = os.getenv("JOB_STORE", "redis")  # "redis" oder "memory"
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))  # Parallele Verfeinerungen pro Prozess
+    JOB_TTL: int = int(os.getenv("JOB_TTL", 60 * 15))  # Sekunden bis ein Job verfällt
+    JOB_MAX_TIME_BUDGET: float = float(os.getenv("JOB_MAX_TIME_BUDGET", 30))
+
+    # App-Lebenszyklus
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"  # Verbindungen vor der ersten Anfrage aufbauen
+    SHUTDOWN_GRACE_PERIOD: float = float(os.getenv("SHUTDOWN_GRACE_PERIOD", 5))  # Sekunden für laufende Jobs beim Beenden
+
+    # Ergebnis-Cache für Kombinations-Anfragen
+    RESULT_CACHE_STORE: str = os.getenv("RESULT_CACHE_STORE", "redis")  # "redis" oder "memory"
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", 60 * 60))  # Sekunden in Redis
+    RESULT_CACHE_LOCAL_SIZE: int = int(os.getenv("RESULT_CACHE_LOCAL_SIZE", 512))  # Einträge pro Prozess
+    RESULT_CACHE_LOCAL_TTL: float = float(os.getenv("RESULT_CACHE_LOCAL_TTL", 60 * 5))  # Sekunden im Prozess
+    # Manuell erhöhen, wenn sich Daten ohne neuen Snapshot bzw. bump_dataset_version geändert haben
+    DATASET_VERSION: str = os.getenv("DATASET_VERSION", "1")
+
+    # Kosten-Cache des PackageCostCalculator (Einträge pro Calculator, LRU)
+    COST_CACHE_SIZE: int = int(os.getenv("COST_CACHE_SIZE", 2 ** 16))
+
+    # Snapshot von game, streaming_offer und streaming_package (mmap-Datei, von allen Workern geteilt)
+    SNAPSHOT_ENABLED: bool = os.getenv("SNAPSHOT_ENABLED", "true").lower() == "true"
+    SNAPSHOT_REFRESH_INTERVAL: float = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", 60 * 15))  # Sekunden
+    SNAPSHOT_PATH: str = os.getenv("SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "check24_dataset.snapshot"))
 
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from fastapi import Request
+from .config import settings
+from .database import get_database, postgres_database
+from .result_cache import result_cache
+from .snapshot import dataset_snapshot
+from ..services.api_football_service import APIFootballService
+from ..services.game_service import GameService
+from ..services.job_service import job_manager
+from ..services.league_service import league_table
+from ..services.package_service import PackageService
+from ..services.team_search import TeamSearchIndex
+from ..services.optimization.simulated_annealing.parallel import shutdown_executor, start_executor
+
+
+class ServiceContainer:
+    """
+    Clients und Services für die Lebensdauer der App (pro Worker einmal).
+
+    Datenbank, Redis-Client und die Services werden beim Start erzeugt und
+    von allen Anfragen geteilt; sie halten keinen Zustand pro Anfrage (nur
+    Caches wie den Kosten-Cache des Calculators). Anfragen bekommen sie über
+    die Dependencies unten.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.api_service: Optional[APIFootballService] = None
+        self.game_service: Optional[GameService] = None
+        self.package_service: Optional[PackageService] = None
+        self.team_search = TeamSearchIndex(settings.SNAPSHOT_REFRESH_INTERVAL)
+        self.warmup: Dict[str, Dict] = {}
+        self._index_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.db = get_database()
+        if self.db is postgres_database:
+            await postgres_database.connect()
+        self.api_service = APIFootballService()
+        self.game_service = GameService(self.db, self.api_service, dataset_snapshot)
+        self.package_service = PackageService(self.db, dataset_snapshot)
+
+        if settings.SNAPSHOT_ENABLED:
+            try:
+                await dataset_snapshot.load(self.db)
+            except Exception as e:
+                print(f"Snapshot load failed, falling back to database: {str(e)}")
+            dataset_snapshot.start_refresh(self.db, settings.SNAPSHOT_REFRESH_INTERVAL)
+
+        await self._refresh_indexes()
+        self._index_task = asyncio.create_task(self._refresh_indexes_loop())
+
+        if settings.WARMUP_ENABLED:
+            await self.warm_up()
+
+    async def _refresh_indexes(self):
+        try:
+            await self.team_search.refresh(self.db, dataset_snapshot)
+        except Exception as e:
+            print(f"Team search index build failed: {str(e)}")
+        try:
+            await league_table.refresh(self.db, dataset_snapshot)
+        except Exception as e:
+            print(f"League table build failed: {str(e)}")
+
+    async def _refresh_indexes_loop(self):
+        """
+        Hält Suchindex und Tabelle im Takt des Snapshot-Refreshs aktuell, damit
+        Anfragen sie nie selbst neu bauen. Gebaut wird nur, wenn stale() es
+        verlangt (neue Snapshot-Datei oder, ohne Snapshot, refresh_interval abgelaufen).
+        """
+        interval = min(dataset_snapshot.CHECK_INTERVAL, settings.SNAPSHOT_REFRESH_INTERVAL)
+        while True:
+            await asyncio.sleep(interval)
+            await self._refresh_indexes()
+
+    async def _warm_step(self, name: str, step):
+        started = time.perf_counter()
+        try:
+            await step()
+            self.warmup[name] = {"ok": True}
+        except Exception as e:
+            print(f"Warmup {name} failed: {str(e)}")
+            self.warmup[name] = {"ok": False, "error": str(e)}
+        self.warmup[name]["duration"] = round(time.perf_counter() - started, 3)
+
+    async def warm_up(self):
+        """
+        Baut Verbindungen vor der ersten Anfrage auf: DB-Roundtrip, Redis
+        (API-Cache und Ergebnis-Cache) und, wenn parallele SA-Ketten
+        konfiguriert sind, alle Prozesse des Pools. Ohne parallele Ketten nutzen
+        ihn nur Batch-Anfragen; er entsteht dann erst bei der ersten davon.
+        Fehler werden nur protokolliert; die App startet trotzdem.
+        """
+        async def database():
+            await self.db.execute("SELECT 1")
+
+        async def redis():
+            await self.api_service.redis.ping()
+            await result_cache.dataset_version()
+
+        async def process_pool():
+            await start_executor()
+
+        steps = [("database", database), ("redis", redis)]
+        if settings.SA_PARALLEL_CHAINS > 1:
+            steps.append(("process_pool", process_pool))
+        await asyncio.gather(*(self._warm_step(name, step) for name, step in steps))
+
+    async def stop(self):
+        """Beendet laufende Jobs, Snapshot- und Index-Refresh, Prozesspool und Verbindungen."""
+        await job_manager.shutdown(settings.SHUTDOWN_GRACE_PERIOD)
+        dataset_snapshot.stop_refresh()
+        if self._index_task:
+            self._index_task.cancel()
+        shutdown_executor()
+        if self.db is postgres_database:
+            await postgres_database.close()
+        if self.api_service:
+            await self.api_service.close()
+
+
+def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
+
+
+def get_db(request: Request):
+    return get_services(request).db
+
+
+def get_api_service(request: Request) -> APIFootballService:
+    return get_services(request).api_service
+
+
+def get_game_service(request: Request) -> GameService:
+    return get_services(request).game_service
+
+
+def get_package_service(request: Request) -> PackageService:
+    return get_services(request).package_service
+
+
+def get_team_search(request: Request) -> TeamSearchIndex:
+    return get_services(request).team_search
@@ -1,9 +1,19 @@
+import re
+import asyncpg
 import supabase
 from dotenv import load_dotenv
 import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from .config import settings
 
 load_dotenv()
 from asyncio import to_thread
+
+# :name, aber nicht ::typ-Casts oder Uhrzeiten wie 12:30
+_PARAMETER = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+
 class Database:
     def __init__(self):
         self.client: supabase.Client = supabase.create_client(
@@ -18,7 +28,8 @@ class Database:
             if params:
                 for key, value in params.items():
                     if isinstance(value, list):
-                        placeholders = ','.join([f"'{v}'" for v in value])
+                        # Zahlen ohne Quotes, sonst wird ein text[] gebaut
+                        placeholders = ','.join([str(v) if isinstance(v, int) else f"'{v}'" for v in value])
                         query = query.replace(f":{key}", f"ARRAY[{placeholders}]")
                     else:
                         query = query.replace(f":{key}", f"'{value}'")
@@ -32,4 +43,78 @@ class Database:
 
         except Exception as e:
             print(f"Database error: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+@lru_cache(maxsize=256)
+def _positional(query: str, names: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Übersetzt :name-Parameter in $n-Platzhalter. Liefert die SQL und die
+    Parameternamen in Platzhalter-Reihenfolge; mehrfach verwendete Namen
+    bekommen denselben Platzhalter. Unbekannte Namen bleiben stehen.
+    """
+    order: List[str] = []
+
+    def replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in names:
+            return match.group(0)
+        if name not in order:
+            order.append(name)
+        return f"${order.index(name) + 1}"
+
+    return _PARAMETER.sub(replace, query), tuple(order)
+
+
+class PostgresDatabase:
+    """
+    Direkter Postgres-Zugriff über einen asyncpg-Pool mit echten Bind-Parametern.
+
+    Gleiche Schnittstelle wie Database: :name-Parameter werden zu $n,
+    Listen werden als Arrays gebunden (z.B. = ANY(:teams)). asyncpg bereitet
+    jede Query serverseitig vor und cacht das Statement pro Verbindung.
+    Der Pool wird einmal beim App-Start mit connect() erzeugt.
+    """
+
+    def __init__(self, dsn: str, min_size: int, max_size: int):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool = None
+
+    async def connect(self):
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def execute(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Execute SQL query with bind parameters"""
+        if self.pool is None:
+            raise RuntimeError("Postgres-Pool ist nicht verbunden (connect() beim Start aufrufen)")
+        params = params or {}
+        sql, order = _positional(query, tuple(sorted(params)))
+        try:
+            rows = await self.pool.fetch(sql, *(params[name] for name in order))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Database error: {str(e)}")
+            raise
+
+
+# Globale Instanz (nur für DATABASE_BACKEND=postgres)
+postgres_database = PostgresDatabase(
+    settings.DATABASE_URL,
+    min_size=settings.DATABASE_POOL_MIN_SIZE,
+    max_size=settings.DATABASE_POOL_MAX_SIZE
+)
+
+
+def get_database():
+    """Datenbank für eine Anfrage: der geteilte Postgres-Pool oder ein Supabase-Client."""
+    if settings.DATABASE_BACKEND == "postgres":
+        return postgres_database
+    return Database()
@@ -0,0 +1,91 @@
+import time
+from typing import Dict, Optional, Tuple
+import redis.asyncio as aioredis
+from redis.exceptions import WatchError
+from .config import settings
+
+
+class MemoryStore:
+    """In-Memory-Ersatz für Redis (Tests, lokale Entwicklung, ein einzelner Worker)."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, str]] = {}
+
+    def _missing(self, key: str) -> bool:
+        """True, wenn der Key fehlt oder abgelaufen ist (abgelaufene werden entfernt)."""
+        entry = self._data.get(key)
+        if entry and entry[0] < time.time():
+            del self._data[key]
+            return True
+        return entry is None
+
+    async def get(self, key: str) -> Optional[str]:
+        if self._missing(key):
+            return None
+        return self._data[key][1]
+
+    async def set(self, key: str, value: str, ttl: int):
+        self._data[key] = (time.time() + ttl, value)
+
+    async def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        if not self._missing(key):
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def compare_and_set(self, key: str, expected: str, value: str, ttl: int) -> bool:
+        # Ohne await dazwischen atomar im Event-Loop
+        if self._missing(key) or self._data[key][1] != expected:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+
+class RedisStore:
+    """Redis-Backend, damit alle uvicorn-Worker denselben Zustand sehen."""
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        self.client = client or aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self.client.setex(key, ttl, value)
+
+    async def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        return bool(await self.client.set(key, value, ex=ttl, nx=True))
+
+    async def compare_and_set(self, key: str, expected: str, value: str, ttl: int) -> bool:
+        """Schreibt value nur, wenn der Key noch expected enthält (WATCH/MULTI)."""
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != expected:
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.set(key, value, ex=ttl)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+
+def create_store(kind: str):
+    """Erstellt einen Store nach Konfiguration: "redis" oder "memory"."""
+    if kind == "memory":
+        return MemoryStore()
+    if kind == "redis":
+        return RedisStore()
+    raise ValueError(f"Unbekannter Store: {kind}")
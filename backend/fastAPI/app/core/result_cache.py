@@ -0,0 +1,227 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from prometheus_client import Counter
+from .config import settings
+from .kv_store import create_store
+from .snapshot import DatasetSnapshot, dataset_snapshot
+from ..utils.query import query_distance, query_hash
+
+CACHE_REQUESTS = Counter(
+    "result_cache_requests_total",
+    "Zugriffe auf den Ergebnis-Cache",
+    ["tier", "result"]
+)
+
+
+class LocalLRU:
+    """In-Process-Tier: LRU mit TTL pro Eintrag."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Dict):
+        self._entries[key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResultCache:
+    """
+    Ergebnis-Cache für Kombinations-Anfragen.
+
+    Key: normalisierte Anfrage (Teams sortiert, Startdatum auf den Tag) plus
+    Datenstand; der enthält die geladene Snapshot-Datei, ein Refresh oder
+    Export macht also alle älteren Einträge unerreichbar. Zwei Stufen:
+    In-Process-LRU für wiederholte Anfragen im selben Worker, Redis für alle
+    Worker. Fällt Redis aus oder antwortet zu langsam, arbeitet der Cache für
+    REDIS_RETRY_AFTER Sekunden nur lokal.
+    Gecachte Werte werden geteilt und dürfen nicht verändert werden.
+    """
+
+    VERSION_KEY = "dataset:version"
+    MAX_SEED_DATE_SHIFT = 3  # Tage, die eine Anfrage für Warmstarts entfernt sein darf
+    VERSION_CHECK_INTERVAL = 30.0  # Sekunden, so lange gilt der gelesene Datenstand
+    REDIS_TIMEOUT = 0.25  # Sekunden pro Redis-Zugriff
+    REDIS_RETRY_AFTER = 30.0  # Sekunden ohne Redis nach einem Fehler
+
+    def __init__(
+            self,
+            store,
+            local_size: int,
+            local_ttl: float,
+            ttl: int,
+            snapshot: Optional[DatasetSnapshot] = None
+    ):
+        self.store = store
+        self.snapshot = snapshot
+        self.local = LocalLRU(local_size, local_ttl)
+        self.ttl = ttl
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+        self._redis_down_until = 0.0
+        # Zuletzt gespeicherte Lösungen dieses Prozesses: Key -> {query, package_ids}
+        self._solutions: "OrderedDict[str, Dict]" = OrderedDict()
+        self.stats_counter = {"local_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    @staticmethod
+    def _count(tier: str, result: str):
+        CACHE_REQUESTS.labels(tier=tier, result=result).inc()
+
+    async def _store_call(self, method: str, *args) -> Any:
+        """Redis-Zugriff mit Timeout; nach einem Fehler wird Redis eine Weile übersprungen."""
+        if time.time() < self._redis_down_until:
+            return None
+        try:
+            return await asyncio.wait_for(getattr(self.store, method)(*args), self.REDIS_TIMEOUT)
+        except Exception:
+            self.stats_counter["errors"] += 1
+            self._redis_down_until = time.time() + self.REDIS_RETRY_AFTER
+            return None
+
+    async def dataset_version(self) -> str:
+        """
+        Aktueller Datenstand: Konfiguration, Zähler, den Datenimporte erhöhen,
+        und die geladene Snapshot-Datei (gleich in allen Workern eines Hosts).
+        """
+        now = time.time()
+        if self._version is None or now - self._version_checked > self.VERSION_CHECK_INTERVAL:
+            stored = await self._store_call("get", self.VERSION_KEY)
+            self._version = f"{settings.DATASET_VERSION}:{stored or 0}"
+            self._version_checked = now
+        if self.snapshot and self.snapshot.ready:
+            return f"{self._version}:{self._snapshot_version()}"
+        return self._version
+
+    def _snapshot_version(self) -> str:
+        return "-".join(str(part) for part in self.snapshot.data.identity)
+
+    async def bump_dataset_version(self):
+        """Nach Datenänderungen aufrufen: macht alle bisherigen Einträge unerreichbar."""
+        await self.store.set(self.VERSION_KEY, str(time.time_ns()), 60 * 60 * 24 * 365)
+        self._version = None
+        self.local.clear()
+
+    async def key(self, query: Dict, prefix: str = "result") -> str:
+        return f"{prefix}:{await self.dataset_version()}:{query_hash(query)}"
+
+    async def get(self, query: Dict) -> Optional[Dict]:
+        key = await self.key(query)
+
+        value = self.local.get(key)
+        if value is not None:
+            self.stats_counter["local_hits"] += 1
+            self._count("local", "hit")
+            return value
+        self._count("local", "miss")
+
+        cached = await self._store_call("get", key)
+        if cached is None:
+            self.stats_counter["misses"] += 1
+            self._count("redis", "miss")
+            return None
+
+        self.stats_counter["redis_hits"] += 1
+        self._count("redis", "hit")
+        value = json.loads(cached)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, query: Dict, value: Dict):
+        key = await self.key(query)
+        self.local.set(key, value)
+        self.stats_counter["stores"] += 1
+        await self._store_call("set", key, json.dumps(value), self.ttl)
+
+    async def remember_solution(self, query: Dict, package_ids: List[int]):
+        """Speichert die beste Lösung einer Anfrage als Warmstart für ähnliche Anfragen."""
+        key = await self.key(query, "solution")
+        entry = {"query": query, "package_ids": package_ids}
+        self._solutions[key] = entry
+        self._solutions.move_to_end(key)
+        while len(self._solutions) > self.local.max_size:
+            self._solutions.popitem(last=False)
+        await self._store_call("set", key, json.dumps(entry), self.ttl)
+
+    def _neighbor_queries(self, query: Dict) -> List[Dict]:
+        """Nachbarn für Redis-Lookups: ein Team weniger oder Startdatum um wenige Tage verschoben."""
+        neighbors = []
+        if len(query["teams"]) > 1:
+            for team in query["teams"]:
+                neighbors.append({**query, "teams": [t for t in query["teams"] if t != team]})
+        start = date.fromisoformat(query["start_date"])
+        for shift in range(1, self.MAX_SEED_DATE_SHIFT + 1):
+            for day in (start - timedelta(days=shift), start + timedelta(days=shift)):
+                neighbors.append({**query, "start_date": day.isoformat()})
+        return neighbors
+
+    async def nearest_solution(self, query: Dict) -> Optional[Dict]:
+        """
+        Gespeicherte Lösung der ähnlichsten Anfrage (höchstens ein Team mehr oder
+        weniger, Startdatum bis MAX_SEED_DATE_SHIFT Tage entfernt), sonst None.
+        Lokal bekannte Lösungen werden direkt verglichen; "ein Team weniger" und
+        verschobene Daten werden zusätzlich in Redis nachgeschlagen.
+        """
+        candidates = []
+        for entry in self._solutions.values():
+            distance = query_distance(query, entry["query"])
+            if distance is not None and distance[0] <= 1 and distance[1] <= self.MAX_SEED_DATE_SHIFT:
+                candidates.append((distance, entry))
+
+        neighbors = self._neighbor_queries(query)
+        keys = [await self.key(neighbor, "solution") for neighbor in neighbors]
+        missing = [(neighbor, key) for neighbor, key in zip(neighbors, keys) if key not in self._solutions]
+        stored = await asyncio.gather(*(self._store_call("get", key) for _, key in missing))
+        for (neighbor, _), cached in zip(missing, stored):
+            if cached:
+                candidates.append((query_distance(query, neighbor), json.loads(cached)))
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda candidate: candidate[0])[1]
+
+    def stats(self) -> Dict:
+        lookups = self.stats_counter["local_hits"] + self.stats_counter["redis_hits"] + self.stats_counter["misses"]
+        hits = self.stats_counter["local_hits"] + self.stats_counter["redis_hits"]
+        return {
+            **self.stats_counter,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "local_entries": len(self.local),
+            "local_evictions": self.local.evictions,
+            "dataset_version": self._version,
+            "snapshot_version": self._snapshot_version() if self.snapshot and self.snapshot.ready else None
+        }
+
+
+# Globale Instanz
+result_cache = ResultCache(
+    store=create_store(settings.RESULT_CACHE_STORE),
+    local_size=settings.RESULT_CACHE_LOCAL_SIZE,
+    local_ttl=settings.RESULT_CACHE_LOCAL_TTL,
+    ttl=settings.RESULT_CACHE_TTL,
+    snapshot=dataset_snapshot
+)
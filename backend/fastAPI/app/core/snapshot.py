@@ -0,0 +1,266 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from .config import settings
+from .database import Database, get_database, postgres_database
+from .snapshot_file import OFFER_HIGHLIGHTS, OFFER_LIVE, SnapshotFile, to_datetime, to_datetime64, write_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: ohne Lock exportiert im Zweifel jeder Worker selbst
+    fcntl = None
+
+
+class _ExportLock:
+    """Prozessübergreifender Lock (flock) auf path + '.lock' für den Export."""
+
+    def __init__(self, path: str, blocking: bool):
+        self.path = f"{path}.lock"
+        self.blocking = blocking
+        self._file = None
+
+    def __enter__(self) -> bool:
+        if fcntl is None:
+            return True
+        self._file = open(self.path, "a")
+        flags = fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(self._file.fileno(), flags)
+            return True
+        except BlockingIOError:
+            return False
+
+    def __exit__(self, *exc):
+        if self._file:
+            self._file.close()  # gibt den flock frei
+            self._file = None
+
+
+class DatasetSnapshot:
+    """
+    game, streaming_offer und streaming_package als spaltenweise Binärdatei,
+    die jeder Worker per mmap liest (siehe snapshot_file). Die Daten liegen
+    einmal im Page-Cache, egal wie viele Worker laufen; beim Start wird eine
+    vorhandene Datei nur geöffnet, die DB wird nur gelesen, wenn sie fehlt.
+
+    Refresh: Ist die Datei älter als das Refresh-Intervall, exportiert genau
+    ein Worker (flock) neu und ersetzt sie per os.replace. Alle Worker prüfen
+    regelmäßig, ob sich die Datei geändert hat, und tauschen ihr Mapping in
+    einem Schritt; laufende Anfragen lesen weiter den alten Stand.
+    """
+
+    CHECK_INTERVAL = 10.0  # Sekunden zwischen Prüfungen auf eine neue Datei
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: Optional[SnapshotFile] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._data is not None
+
+    @property
+    def data(self) -> SnapshotFile:
+        if self._data is None:
+            raise RuntimeError("Dataset-Snapshot ist nicht geladen")
+        return self._data
+
+    async def export(self, db: Database):
+        """Liest alle drei Tabellen aus der DB und schreibt die Snapshot-Datei neu."""
+        games, offers, packages = await asyncio.gather(
+            db.execute("SELECT id, team_home, team_away, tournament_name, starts_at FROM game"),
+            db.execute("SELECT game_id, streaming_package_id, live, highlights FROM streaming_offer"),
+            db.execute("""
+            SELECT
+                id,
+                name,
+                monthly_price_cents,
+                monthly_price_yearly_subscription_in_cents
+            FROM streaming_package
+            """)
+        )
+        await asyncio.to_thread(write_snapshot, self.path, games or [], offers or [], packages or [])
+
+    async def _export_locked(self, db: Database, max_age: Optional[float], blocking: bool):
+        """
+        Exportiert unter dem Datei-Lock, falls die Datei fehlt oder älter als
+        max_age ist (None = nur wenn sie fehlt). Wer den Lock nicht sofort
+        bekommt und nicht blockieren soll, überlässt den Export dem Halter.
+        """
+        def stale() -> bool:
+            if not os.path.exists(self.path):
+                return True
+            return max_age is not None and time.time() - os.path.getmtime(self.path) >= max_age
+
+        if not stale():
+            return
+        lock = _ExportLock(self.path, blocking)
+        acquired = await asyncio.to_thread(lock.__enter__)
+        try:
+            # Ein anderer Worker kann während des Wartens exportiert haben
+            if acquired and stale():
+                await self.export(db)
+        finally:
+            lock.__exit__()
+
+    def reopen(self) -> bool:
+        """Mappt die Datei neu, wenn sie ersetzt wurde; True bei Wechsel."""
+        identity = SnapshotFile.file_identity(self.path)
+        if identity is None or (self._data is not None and self._data.identity == identity):
+            return False
+        self._data = SnapshotFile(self.path)
+        return True
+
+    async def load(self, db: Database):
+        """Öffnet die vorhandene Snapshot-Datei; fehlt sie, wird sie einmalig exportiert."""
+        await self._export_locked(db, max_age=None, blocking=True)
+        try:
+            self.reopen()
+        except (ValueError, KeyError) as e:
+            # Datei in einem älteren Format: sofort neu exportieren
+            print(f"Snapshot file unreadable, exporting again: {str(e)}")
+            await self._export_locked(db, max_age=0, blocking=True)
+            self.reopen()
+
+    def start_refresh(self, db: Database, interval: float):
+        """Exportiert spätestens alle interval Sekunden neu und übernimmt neue Dateien anderer Worker."""
+        async def refresh():
+            while True:
+                await asyncio.sleep(min(self.CHECK_INTERVAL, interval))
+                try:
+                    await self._export_locked(db, max_age=interval, blocking=False)
+                    self.reopen()
+                except Exception as e:
+                    print(f"Snapshot refresh failed: {str(e)}")
+
+        self._refresh_task = asyncio.create_task(refresh())
+
+    def stop_refresh(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def team_tournaments(self, teams: Iterable[str]) -> Set[str]:
+        """Alle Turniere, in denen eines der Teams spielt."""
+        data = self.data
+        codes = set()
+        for team in teams:
+            code = data.team_code.get(team)
+            if code is not None:
+                codes.update(data.tournament_codes(code).tolist())
+        return {data.tournaments[code] for code in codes}
+
+    def tournaments_by_team(self) -> Dict[str, List[str]]:
+        """Team -> alle Turniere des Teams, für die vorberechneten Liga-Tabellen."""
+        data = self.data
+        return {
+            team: [data.tournaments[code] for code in data.tournament_codes(team_code).tolist()]
+            for team_code, team in enumerate(data.teams)
+        }
+
+    def games_for_teams(
+            self,
+            teams: Iterable[str],
+            start_date: datetime,
+            end_date: datetime,
+            tournament: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Spiele der Teams mit Anstoß in [start_date, end_date] als Zeilen wie
+        aus der game-Tabelle plus streamed-Flag, sortiert nach Anstoß.
+        """
+        data = self.data
+        start, end = to_datetime64(start_date), to_datetime64(end_date)
+        chunks = []
+        for team in set(teams):
+            team_slice = data.team_slice(team)
+            if team_slice is None:
+                continue
+            starts = data.team_starts[team_slice]
+            lo = int(np.searchsorted(starts, start, side="left"))
+            hi = int(np.searchsorted(starts, end, side="right"))
+            chunks.append(data.team_positions[team_slice][lo:hi])
+        if not chunks:
+            return []
+
+        positions = np.unique(np.concatenate(chunks))
+        if tournament:
+            code = data.tournament_code.get(tournament)
+            positions = positions[data.tournament[positions] == code] if code is not None else positions[:0]
+
+        streamed = data.streamed[positions]
+        return [
+            {
+                "id": int(data.game_id[position]),
+                "team_home": data.teams[data.home[position]],
+                "team_away": data.teams[data.away[position]],
+                "tournament_name": data.tournaments[data.tournament[position]],
+                "starts_at": to_datetime(data.starts_at[position]),
+                "streamed": bool(is_streamed)
+            }
+            for position, is_streamed in zip(positions.tolist(), streamed.tolist())
+        ]
+
+    def offers_for_games(self, game_ids: Iterable[int]) -> List[Dict]:
+        data = self.data
+        offers = []
+        for position in data.positions_of(game_ids).tolist():
+            game_id = int(data.game_id[position])
+            lo, hi = int(data.offer_offsets[position]), int(data.offer_offsets[position + 1])
+            for package_id, flags in zip(data.offer_package[lo:hi].tolist(), data.offer_flags[lo:hi].tolist()):
+                offers.append({
+                    "game_id": game_id,
+                    "streaming_package_id": package_id,
+                    "live": bool(flags & OFFER_LIVE),
+                    "highlights": bool(flags & OFFER_HIGHLIGHTS)
+                })
+        return offers
+
+    def team_game_counts(self) -> Dict[str, int]:
+        """Anzahl Spiele pro Team."""
+        data = self.data
+        return dict(zip(data.teams, np.diff(data.team_offsets).tolist()))
+
+    def packages(self) -> List[Dict]:
+        return [dict(package) for package in self.data.packages]
+
+    def info(self) -> Dict:
+        """Kennzahlen für /debug/performance."""
+        if self._data is None:
+            return {"ready": False, "path": self.path}
+        return {
+            "ready": True,
+            "path": self.path,
+            "games": len(self._data),
+            "offers": int(self._data.offer_offsets[-1]) if len(self._data) else 0,
+            "file_bytes": self._data.size,
+            "age_seconds": time.time() - self._data.created_at
+        }
+
+
+# Globale Instanz
+dataset_snapshot = DatasetSnapshot(settings.SNAPSHOT_PATH)
+
+
+if __name__ == "__main__":
+    # Export vor dem Deployment: python -m app.core.snapshot
+    async def export():
+        # Hier importiert: result_cache hängt selbst vom Snapshot ab
+        from .result_cache import result_cache
+
+        db = get_database()
+        if db is postgres_database:
+            await db.connect()
+        try:
+            await dataset_snapshot.export(db)
+            # Auch Worker ohne Snapshot (DB-Modus) sollen neu rechnen
+            await result_cache.bump_dataset_version()
+        finally:
+            await postgres_database.close()
+
+    asyncio.run(export())
+    print(f"Snapshot written to {dataset_snapshot.path}")
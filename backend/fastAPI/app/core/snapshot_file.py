@@ -0,0 +1,240 @@
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Dateiformat: MAGIC, Header-Länge (uint64), JSON-Header, dann die Spalten,
+# jeweils auf ALIGNMENT Bytes ausgerichtet. Der Header enthält Wörterbücher
+# (Teams, Turniere), die Pakete und pro Spalte dtype, Länge und Offset.
+MAGIC = b"C24SNAP2"
+ALIGNMENT = 64
+
+OFFER_LIVE = 1
+OFFER_HIGHLIGHTS = 2
+
+EPOCH = np.datetime64(0, "s")
+
+
+def to_datetime64(value) -> np.datetime64:
+    """DB-Zeitstempel oder datetime als UTC-Sekunden."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "s")
+
+
+def to_datetime(value: np.datetime64) -> datetime:
+    """datetime64[s] als UTC-aware datetime."""
+    return datetime.fromtimestamp(int((value - EPOCH) // np.timedelta64(1, "s")), timezone.utc)
+
+
+def build_columns(games: List[Dict], offers: List[Dict], packages: List[Dict]) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Spalten aus den Tabellenzeilen:
+
+    - Spiele sortiert nach (Anstoß, ID): game_id int32, starts_at datetime64[s],
+      home/away/tournament als int32-Codes in die Wörterbücher des Headers
+    - Team-Index (CSR): team_offsets[t]:team_offsets[t+1] sind die Spiel-
+      Positionen von Team t, aufsteigend und damit nach Anstoß sortiert;
+      team_starts enthält die Anstoßzeiten dazu (für searchsorted)
+    - id_order: Positionen nach game_id sortiert (Lookup per searchsorted)
+    - Angebote (CSR) pro Spiel-Position: offer_package int32, offer_flags uint8
+    - streamed uint8 pro Spiel-Position: 1, wenn es mindestens ein Angebot gibt
+    - Turniere pro Team (CSR): team_tournament_offsets/team_tournament_codes,
+      Turnier-Codes aufsteigend, jedes einmal
+    """
+    game_ids = np.array([row["id"] for row in games], dtype=np.int32)
+    starts_at = np.array([to_datetime64(row["starts_at"]) for row in games], dtype="datetime64[s]")
+    order = np.lexsort((game_ids, starts_at))
+    games = [games[i] for i in order]
+    game_ids, starts_at = game_ids[order], starts_at[order]
+
+    teams = sorted({row["team_home"] for row in games} | {row["team_away"] for row in games})
+    tournaments = sorted({row["tournament_name"] for row in games})
+    team_code = {team: code for code, team in enumerate(teams)}
+    tournament_code = {tournament: code for code, tournament in enumerate(tournaments)}
+    home = np.array([team_code[row["team_home"]] for row in games], dtype=np.int32)
+    away = np.array([team_code[row["team_away"]] for row in games], dtype=np.int32)
+    tournament = np.array([tournament_code[row["tournament_name"]] for row in games], dtype=np.int32)
+
+    positions = np.arange(len(games), dtype=np.int32)
+    distinct_away = away != home
+    entry_team = np.concatenate([home, away[distinct_away]])
+    entry_position = np.concatenate([positions, positions[distinct_away]])
+    by_team = np.lexsort((entry_position, entry_team))
+    team_positions = entry_position[by_team].astype(np.int32)
+    team_offsets = np.zeros(len(teams) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(entry_team, minlength=len(teams)), out=team_offsets[1:])
+
+    # Angebote für Spiele außerhalb der game-Tabelle werden verworfen
+    position_of = {int(game_id): position for position, game_id in enumerate(game_ids)}
+    offer_rows = [(position_of[offer["game_id"]], offer) for offer in offers if offer["game_id"] in position_of]
+    offer_position = np.array([position for position, _ in offer_rows], dtype=np.int64)
+    offer_package = np.array([offer["streaming_package_id"] for _, offer in offer_rows], dtype=np.int32)
+    offer_flags = np.array([
+        (OFFER_LIVE if offer["live"] else 0) | (OFFER_HIGHLIGHTS if offer["highlights"] else 0)
+        for _, offer in offer_rows
+    ], dtype=np.uint8)
+    by_game = np.argsort(offer_position, kind="stable")
+    offer_offsets = np.zeros(len(games) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(offer_position, minlength=len(games)), out=offer_offsets[1:])
+
+    # (Team, Turnier)-Paare als ein Schlüssel, damit np.unique sie dedupliziert und sortiert
+    tournament_count = max(len(tournaments), 1)
+    pairs = np.unique(entry_team.astype(np.int64) * tournament_count + tournament[entry_position])
+    team_tournament_offsets = np.zeros(len(teams) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs // tournament_count, minlength=len(teams)), out=team_tournament_offsets[1:])
+
+    header = {
+        "teams": teams,
+        "tournaments": tournaments,
+        "packages": [dict(package) for package in packages],
+    }
+    columns = {
+        "game_id": game_ids,
+        "starts_at": starts_at,
+        "home": home,
+        "away": away,
+        "tournament": tournament,
+        "id_order": np.argsort(game_ids, kind="stable").astype(np.int32),
+        "team_offsets": team_offsets,
+        "team_positions": team_positions,
+        "team_starts": starts_at[team_positions],
+        "offer_offsets": offer_offsets,
+        "offer_package": offer_package[by_game],
+        "offer_flags": offer_flags[by_game],
+        "streamed": (np.diff(offer_offsets) > 0).astype(np.uint8),
+        "team_tournament_offsets": team_tournament_offsets,
+        "team_tournament_codes": (pairs % tournament_count).astype(np.int32),
+    }
+    return header, columns
+
+
+def write_snapshot(path: str, games: List[Dict], offers: List[Dict], packages: List[Dict]):
+    """
+    Schreibt den Snapshot in eine temporäre Datei daneben und ersetzt path
+    atomar. Prozesse, die die alte Datei gemappt haben, lesen unverändert
+    weiter, bis sie neu öffnen.
+    """
+    header, columns = build_columns(games, offers, packages)
+
+    layout = {}
+    offset = 0
+    for name, column in columns.items():
+        layout[name] = {"dtype": column.dtype.str, "length": len(column), "offset": offset}
+        offset += -(-column.nbytes // ALIGNMENT) * ALIGNMENT
+    header["columns"] = layout
+    encoded = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<Q", len(encoded)))
+            file.write(encoded)
+            for name, column in columns.items():
+                file.seek(data_start + layout[name]["offset"])
+                file.write(np.ascontiguousarray(column).tobytes())
+            file.truncate(data_start + offset)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class SnapshotFile:
+    """
+    Read-only-Sicht auf eine Snapshot-Datei. Die Spalten sind numpy-Views
+    direkt auf das mmap (kein Kopieren); alle Prozesse, die dieselbe Datei
+    öffnen, teilen sich die Seiten im Page-Cache. Das mmap bleibt gültig,
+    solange die Instanz lebt, auch wenn die Datei inzwischen ersetzt wurde.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        self.created_at = stat.st_mtime
+        self.size = stat.st_size
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} ist keine Snapshot-Datei")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+        data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+
+        columns = {
+            name: np.frombuffer(
+                self._mmap,
+                dtype=np.dtype(spec["dtype"]),
+                count=spec["length"],
+                offset=data_start + spec["offset"]
+            )
+            for name, spec in header["columns"].items()
+        }
+        self.game_id: np.ndarray = columns["game_id"]
+        self.starts_at: np.ndarray = columns["starts_at"]
+        self.home: np.ndarray = columns["home"]
+        self.away: np.ndarray = columns["away"]
+        self.tournament: np.ndarray = columns["tournament"]
+        self.id_order: np.ndarray = columns["id_order"]
+        self.team_offsets: np.ndarray = columns["team_offsets"]
+        self.team_positions: np.ndarray = columns["team_positions"]
+        self.team_starts: np.ndarray = columns["team_starts"]
+        self.offer_offsets: np.ndarray = columns["offer_offsets"]
+        self.offer_package: np.ndarray = columns["offer_package"]
+        self.offer_flags: np.ndarray = columns["offer_flags"]
+        self.streamed: np.ndarray = columns["streamed"]
+        self.team_tournament_offsets: np.ndarray = columns["team_tournament_offsets"]
+        self.team_tournament_codes: np.ndarray = columns["team_tournament_codes"]
+
+        self.teams: List[str] = header["teams"]
+        self.tournaments: List[str] = header["tournaments"]
+        self.packages: List[Dict] = header["packages"]
+        self.team_code: Dict[str, int] = {team: code for code, team in enumerate(self.teams)}
+        self.tournament_code: Dict[str, int] = {name: code for code, name in enumerate(self.tournaments)}
+
+    @staticmethod
+    def file_identity(path: str) -> Optional[Tuple[int, int, int]]:
+        """(Gerät, Inode, mtime) der Datei unter path, None wenn sie fehlt."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+    def team_slice(self, team: str) -> Optional[slice]:
+        code = self.team_code.get(team)
+        if code is None:
+            return None
+        return slice(int(self.team_offsets[code]), int(self.team_offsets[code + 1]))
+
+    def tournament_codes(self, team_code: int) -> np.ndarray:
+        """Codes aller Turniere, in denen das Team spielt."""
+        lo, hi = self.team_tournament_offsets[team_code], self.team_tournament_offsets[team_code + 1]
+        return self.team_tournament_codes[lo:hi]
+
+    def positions_of(self, game_ids) -> np.ndarray:
+        """Spiel-Positionen zu IDs; unbekannte IDs werden ausgelassen."""
+        ids = np.asarray(list(game_ids), dtype=np.int64)
+        if not len(ids) or not len(self.game_id):
+            return np.empty(0, dtype=np.int64)
+        sorted_ids = self.game_id[self.id_order]
+        found = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        hit = sorted_ids[found] == ids
+        return self.id_order[found[hit]]
+
+    def __len__(self) -> int:
+        return len(self.game_id)
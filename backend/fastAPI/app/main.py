@@ -17,16 +17,38 @@ from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExp
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 from datetime import datetime
 from .utils.constants import POPULAR_TEAMS, POPULAR_NATIONS, POPULAR_TOURNAMENTS
-from .core.database import Database
+from .core.container import (
+    ServiceContainer,
+    get_api_service,
+    get_game_service,
+    get_package_service,
+    get_services,
+    get_team_search
+)
+from .models.api import BatchCombinationRequest
 from .services.game_service import GameService
 from .services.package_service import PackageService
 from .services.api_football_service import APIFootballService
+from .services.team_search import TeamSearchIndex
+from .services.job_service import job_manager
 from .core.monitoring import ProfilingMiddleware
 from .core.performance_tracker import tracker
-from .utils.formatting import format_date_iso, format_package_for_response, format_game_for_response
+from .core.result_cache import result_cache
+from .core.snapshot import dataset_snapshot
+from .utils.formatting import (
+    format_date_iso,
+    format_result_for_response,
+    format_pareto_front_for_response,
+    format_warm_start_for_response
+)
+from .utils.query import normalize_query
 
 
 # Limiter initialisieren
@@ -44,7 +66,21 @@ trace.set_tracer_provider(tracer_provider)
 meter_provider = MeterProvider(resource=resource)
 metric_exporter = OTLPMetricExporter(endpoint="http://localhost:4317")
 
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ein Service-Container pro Worker: Start mit Warmup, beim Beenden geordnet schließen."""
+    services = ServiceContainer()
+    await services.start()
+    app.state.services = services
+    try:
+        yield
+    finally:
+        await services.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 FastAPIInstrumentor.instrument_app(app)
 
@@ -82,9 +118,14 @@ async def test():
 
 
 @app.get("/debug/performance")
-async def get_performance_stats():
+async def get_performance_stats(services: ServiceContainer = Depends(get_services)):
     """Endpoint für Performance-Statistiken."""
-    return tracker.get_stats()
+    return {
+        **tracker.get_stats(),
+        "result_cache": result_cache.stats(),
+        "dataset_snapshot": dataset_snapshot.info(),
+        "warmup": services.warmup
+    }
 
 tracer = trace.get_tracer(__name__)
 
@@ -96,22 +137,47 @@ async def find_streaming_combinations(
     max_combinations: Optional[int] = Query(3, description="Maximum number of packages"),
     live_only: Optional[bool] = Query(True, description="Only include live streams"),
     start_date: Optional[datetime] = Query(datetime.now(), description="Optional start date"),
-
+    latency_budget: Optional[float] = Query(None, description="Optional optimization budget in seconds (default: SA_DEFAULT_BUDGET)"),
+    pareto: Optional[bool] = Query(False, description="Also return all cost/coverage trade-offs for 1..max_combinations packages"),
+    game_service: GameService = Depends(get_game_service),
+    package_service: PackageService = Depends(get_package_service),
 ):
     with tracer.start_as_current_span("find_combinations") as span:
         try:
-            db = Database()
-            api_service = APIFootballService()
-            game_service = GameService(db, api_service)
-            package_service = PackageService(db)
-
             request_time = datetime.now()
 
-            # 1. Hole analysierte Spiele
+            # 0. Ergebnis-Cache (normalisierte Anfrage + Datenstand)
+            query = normalize_query(teams, start_date, max_combinations, live_only)
+            cache_query = {
+                **query,
+                "latency_budget": latency_budget,
+                "pareto": bool(pareto)
+            }
+            cached = await result_cache.get(cache_query)
+            span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                return {
+                    "meta": {
+                        "serverTime": format_date_iso(request_time),
+                        "requestDurationMS": int((datetime.now() - request_time).total_seconds() * 1000),
+                        "teamsRequested": teams,
+                        **cached["meta"],
+                        # Beim Treffer lief keine Optimierung, also auch kein Warmstart
+                        "warmStart": None,
+                        "cache": "hit"
+                    },
+                    "data": cached["data"],
+                    "status": "success"
+                }
+
+            # 1. Hole analysierte Spiele, parallel dazu den Warmstart aus der ähnlichsten bekannten Anfrage
             with tracer.start_as_current_span("get_analyzed_games") as game_span:
-                analysis = await game_service.get_analyzed_games(
-                    teams=teams,
-                    start_date=start_date
+                analysis, seed = await asyncio.gather(
+                    game_service.get_analyzed_games(
+                        teams=teams,
+                        start_date=start_date
+                    ),
+                    result_cache.nearest_solution(query)
                 )
                 game_span.set_attribute("teams_count", len(teams))
 
@@ -120,38 +186,45 @@ async def find_streaming_combinations(
                 result = await package_service.find_best_combination(
                     games=analysis["games"],
                     max_packages=max_combinations,
-                    require_live=live_only
+                    require_live=live_only,
+                    latency_budget=latency_budget,
+                    pareto=pareto,
+                    seed_solutions=[seed["package_ids"]] if seed else None
                 )
                 pkg_span.set_attribute("packages_found", len(result["selected_packages"]))
+                pkg_span.set_attribute("warm_start", "warm_start" in result)
+            await result_cache.remember_solution(
+                query,
+                [package["package"]["id"] for package in result["selected_packages"]]
+            )
+
+            data = format_result_for_response(result, analysis["unstreamable_games"])
+            if pareto:
+                data["pareto_front"] = format_pareto_front_for_response(result["pareto_front"])
+                data["pareto_exact"] = result["pareto_exact"]
+
+            meta = {
+                "timeRange": {
+                    "start": format_date_iso(analysis["timeframe"]["start"]),
+                    "end": format_date_iso(analysis["timeframe"]["end"]),
+                },
+                "mainLeague": analysis["main_league"],
+                "optimizer": result.get("strategy"),
+                "annealing": result.get("annealing"),
+                "pruning": result.get("pruning")
+            }
+            await result_cache.set(cache_query, {"meta": meta, "data": data})
 
             return {
                 "meta": {
                     "serverTime": format_date_iso(request_time),
                     "requestDurationMS": int((datetime.now() - request_time).total_seconds() * 1000),
                     "teamsRequested": teams,
-                    "timeRange": {
-                        "start": format_date_iso(analysis["timeframe"]["start"]),
-                        "end": format_date_iso(analysis["timeframe"]["end"]),
-                    },
-                    "mainLeague": analysis["main_league"]
-                },
-                "data": {
-                    "selected_packages": [
-                        format_package_for_response(pkg)
-                        for pkg in result["selected_packages"]
-                    ],
-                    "total_cost": result["total_cost"] / 100,  # Convert cents to euros
-                    "coverage_ratio": f"{result['coverage_ratio'] * 100:.1f}%",
-                    "weighted_coverage": f"{result['weighted_coverage'] * 100:.1f}%",
-                    "uncovered_games": [
-                        format_game_for_response(g)
-                        for g in result["uncovered_games"]
-                    ],
-                    "unstreamable_games": [
-                        format_game_for_response(g)
-                        for g in analysis["unstreamable_games"]
-                    ]
+                    **meta,
+                    "warmStart": format_warm_start_for_response(seed, result.get("warm_start")),
+                    "cache": "miss"
                 },
+                "data": data,
                 "status": "success"
             }
 
@@ -169,9 +242,236 @@ async def find_streaming_combinations(
             )
 
 
+@app.get("/api/v1/streaming-combinations/stream/")
+@limiter.limit("20/minute")
+async def stream_streaming_combinations(
+    request: Request,
+    teams: List[str] = Query(..., description="Teams to watch"),
+    max_combinations: Optional[int] = Query(3, description="Maximum number of packages"),
+    live_only: Optional[bool] = Query(True, description="Only include live streams"),
+    start_date: Optional[datetime] = Query(datetime.now(), description="Optional start date"),
+    game_service: GameService = Depends(get_game_service),
+    package_service: PackageService = Depends(get_package_service),
+):
+    """
+    Server-Sent Events: zuerst die Greedy-Lösung, danach jede bessere Lösung
+    des Simulated Annealing als eigenes "solution"-Event, am Ende "done".
+    """
+    request_time = datetime.now()
+
+    try:
+        analysis = await game_service.get_analyzed_games(
+            teams=teams,
+            start_date=start_date
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "meta": {"serverTime": format_date_iso(datetime.now())},
+                "error": str(e),
+                "status": "error"
+            }
+        )
+
+    def sse(event: str, payload: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    async def event_stream():
+        meta = {
+            "serverTime": format_date_iso(request_time),
+            "teamsRequested": teams,
+            "timeRange": {
+                "start": format_date_iso(analysis["timeframe"]["start"]),
+                "end": format_date_iso(analysis["timeframe"]["end"]),
+            },
+            "mainLeague": analysis["main_league"]
+        }
+        updates = 0
+        try:
+            async for result in package_service.iter_best_combinations(
+                    games=analysis["games"],
+                    max_packages=max_combinations,
+                    require_live=live_only
+            ):
+                updates += 1
+                yield sse("solution", {
+                    "meta": {
+                        **meta,
+                        "optimizer": result["strategy"],
+                        "elapsedMS": int((datetime.now() - request_time).total_seconds() * 1000)
+                    },
+                    "data": format_result_for_response(result, analysis["unstreamable_games"]),
+                    "status": "success"
+                })
+            yield sse("done", {
+                "meta": {
+                    **meta,
+                    "requestDurationMS": int((datetime.now() - request_time).total_seconds() * 1000),
+                    "updates": updates
+                },
+                "status": "success"
+            })
+        except Exception as e:
+            yield sse("error", {
+                "meta": {"serverTime": format_date_iso(datetime.now())},
+                "error": str(e),
+                "status": "error"
+            })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/v1/streaming-combinations/batch/")
+@limiter.limit("5/minute")
+async def find_streaming_combinations_batch(
+    request: Request,
+    batch: BatchCombinationRequest,
+    game_service: GameService = Depends(get_game_service),
+    package_service: PackageService = Depends(get_package_service),
+):
+    """
+    Viele Kombinations-Anfragen in einem Request. Pakete und Angebote werden
+    einmal geladen und die Anfragen parallel optimiert. Ergebnisse kommen in
+    Anfragereihenfolge, Fehler werden pro Eintrag gemeldet.
+
+    latency_budget gilt pro Anfrage, ohne Angabe settings.SA_DEFAULT_BUDGET.
+    Das SA nutzt sein Budget aus; die Laufzeit des Batches liegt daher bei
+    etwa Anfragen / Prozesse im Pool (PROCESS_POOL_WORKERS) mal Budget.
+    Ohne parallele SA-Ketten startet die erste Batch-Anfrage den Pool.
+    """
+    request_time = datetime.now()
+
+    def error_item(error: Exception) -> dict:
+        return {"error": str(error), "status": "error"}
+
+    analyses = await asyncio.gather(*(
+        game_service.get_analyzed_games(
+            teams=query.teams,
+            start_date=query.start_date or request_time
+        )
+        for query in batch.queries
+    ), return_exceptions=True)
+
+    # Fehlgeschlagene Analysen werden direkt als Fehler gemeldet, der Rest wird optimiert;
+    # Fehler einzelner Anfragen kommen als Exception an ihrer Stelle zurück
+    pending = [i for i, analysis in enumerate(analyses) if not isinstance(analysis, Exception)]
+    results = await package_service.find_best_combinations_batch(
+        queries=[
+            {
+                "games": analyses[i]["games"],
+                "max_packages": batch.queries[i].max_combinations,
+                "require_live": batch.queries[i].live_only
+            }
+            for i in pending
+        ],
+        latency_budget=batch.latency_budget
+    )
+    results_by_index = dict(zip(pending, results))
+
+    items = []
+    for i, (query, analysis) in enumerate(zip(batch.queries, analyses)):
+        result = results_by_index.get(i, analysis)
+        if isinstance(result, Exception):
+            items.append(error_item(result))
+            continue
+        items.append({
+            "meta": {
+                "teamsRequested": query.teams,
+                "timeRange": {
+                    "start": format_date_iso(analysis["timeframe"]["start"]),
+                    "end": format_date_iso(analysis["timeframe"]["end"]),
+                },
+                "mainLeague": analysis["main_league"],
+                "optimizer": result.get("strategy"),
+                "pruning": result.get("pruning")
+            },
+            "data": format_result_for_response(result, analysis["unstreamable_games"]),
+            "status": "success"
+        })
+
+    return {
+        "meta": {
+            "serverTime": format_date_iso(request_time),
+            "requestDurationMS": int((datetime.now() - request_time).total_seconds() * 1000),
+            "queries": len(batch.queries),
+            "failed": sum(1 for item in items if item["status"] == "error")
+        },
+        "results": items,
+        "status": "success"
+    }
+
+
+@app.post("/api/v1/jobs/")
+@limiter.limit("20/minute")
+async def create_optimization_job(
+    request: Request,
+    teams: List[str] = Query(..., description="Teams to watch"),
+    max_combinations: Optional[int] = Query(3, description="Maximum number of packages"),
+    live_only: Optional[bool] = Query(True, description="Only include live streams"),
+    start_date: Optional[datetime] = Query(datetime.now(), description="Optional start date"),
+    time_budget: Optional[float] = Query(None, description="Optional refinement budget in seconds"),
+    game_service: GameService = Depends(get_game_service),
+    package_service: PackageService = Depends(get_package_service),
+):
+    """
+    Startet eine Hintergrund-Optimierung. Antwortet sofort mit Job-ID und
+    Greedy-Lösung; die Verfeinerung kann per GET /api/v1/jobs/{id} abgefragt werden.
+    Identische Anfragen mit gleichem Budget bekommen den bestehenden Job zurück.
+    """
+    query = normalize_query(teams, start_date, max_combinations, live_only)
+    try:
+        job = await job_manager.find_duplicate(query, job_manager.time_budget(time_budget, package_service))
+        if not job:
+            analysis = await game_service.get_analyzed_games(
+                teams=teams,
+                start_date=start_date
+            )
+            job = await job_manager.submit(
+                query=query,
+                games=analysis["games"],
+                unstreamable_games=analysis["unstreamable_games"],
+                package_service=package_service,
+                time_budget=time_budget
+            )
+        return {"job": job, "status": "success"}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "meta": {"serverTime": format_date_iso(datetime.now())},
+                "error": str(e),
+                "status": "error"
+            }
+        )
+
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_optimization_job(
+    job_id: str,
+    wait: Optional[float] = Query(0, ge=0, le=30, description="Long-polling timeout in seconds"),
+):
+    job = await job_manager.get(job_id, wait=wait)
+    if not job:
+        raise HTTPException(status_code=404, detail={"error": "Job not found", "status": "error"})
+    return {"job": job, "status": "success"}
+
+
+@app.delete("/api/v1/jobs/{job_id}")
+async def cancel_optimization_job(job_id: str):
+    job = await job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail={"error": "Job not found", "status": "error"})
+    return {"job": job, "status": "success"}
+
+
 @app.get("/api/v1/cache-test/")
-async def test_cache():
-    api_service = APIFootballService()
+async def test_cache(api_service: APIFootballService = Depends(get_api_service)):
 
     # Test 1: Erste Abfrage (sollte API call machen)
     start_time = datetime.now()
@@ -205,18 +505,17 @@ async def test_cache():
 
 
 @app.get("/api/v1/redis-test/")
-async def test_redis():
-    api_service = APIFootballService()
+async def test_redis(api_service: APIFootballService = Depends(get_api_service)):
 
     test_key = "test:connection"
     test_value = "hello"
 
     try:
-        api_service.redis.set(test_key, test_value)
+        await api_service.redis.set(test_key, test_value)
 
-        read_value = api_service.redis.get(test_key)
+        read_value = (await api_service.redis.get(test_key)).decode()
 
-        api_service.redis.delete(test_key)
+        await api_service.redis.delete(test_key)
 
         return {
             "redis_working": True,
@@ -235,41 +534,30 @@ async def test_redis():
 
 
 @app.get("/api/v1/clear-cache/")
-async def clear_cache():
-    api_service = APIFootballService()
+async def clear_cache(api_service: APIFootballService = Depends(get_api_service)):
     try:
         # Löscht ALLE Keys
-        api_service.redis.flushall()
+        await api_service.redis.flushall()
+        result_cache.local.clear()
         return {"message": "Cache erfolgreich geleert"}
     except Exception as e:
         return {"error": str(e)}
 
 
 @app.get("/api/v1/search/")
-async def search_teams(query: str):
-    db = Database()
-
+async def search_teams(
+    query: str,
+    team_search: TeamSearchIndex = Depends(get_team_search),
+):
+    """
+    Type-Ahead über den In-Memory-Index (Präfix + Tippfehler, nach Beliebtheit).
+    Der Index wird im Hintergrund mit dem Snapshot aktualisiert, nie pro Anfrage.
+    """
     if len(query) < 2:
         return {"suggestions": []}
 
     try:
-        search_query = """
-        SELECT DISTINCT team_home as team 
-        FROM game 
-        WHERE team_home ILIKE :query || '%'
-        UNION 
-        SELECT DISTINCT team_away as team
-        FROM game 
-        WHERE team_away ILIKE :query || '%'
-        LIMIT 10
-        """
-
-        result = await db.execute(search_query, {
-            "query": query
-        })
-
-        suggestions = [row["team"] for row in result]
-        return {"suggestions": suggestions}
+        return {"suggestions": team_search.search(query)}
 
     except Exception as e:
-        return {"suggestions": [], "error": str(e)}
\ No newline at end of file
+        return {"suggestions": [], "error": str(e)}
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class CombinationQuery(BaseModel):
+    """Eine Kombinations-Anfrage wie bei /api/v1/streaming-combinations/."""
+    teams: List[str] = Field(..., min_length=1)
+    start_date: Optional[datetime] = None
+    max_combinations: int = Field(3, ge=1)
+    live_only: bool = True
+
+
+class BatchCombinationRequest(BaseModel):
+    queries: List[CombinationQuery] = Field(..., min_length=1, max_length=100)
+    latency_budget: Optional[float] = Field(None, ge=0, description="Optimization budget per query in seconds (default: SA_DEFAULT_BUDGET); the batch takes about queries / pool processes times this budget")
@@ -1,7 +1,9 @@
+import asyncio
 from datetime import datetime, timezone
 import json
-from typing import Optional, Tuple, Dict, Any
-import redis
+import random
+from typing import Optional, Tuple, Dict, Any, List, Callable, Awaitable
+import redis.asyncio as aioredis
 import aiohttp
 from ..core.config import settings
 from ..utils.constants import LEAGUE_IDS
@@ -9,17 +11,69 @@ import re
 
 
 class APIFootballService:
-    def __init__(self):
+    MAX_RETRY_DELAY = 30.0  # Sekunden, auch bei längerem Retry-After
+
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
         self.headers = settings.API_FOOTBALL_HEADERS
         self.base_url = settings.API_FOOTBALL_URL
 
-        self.redis = redis.Redis(
+        # Async-Client mit Pool, pro Worker einmal (Service lebt im ServiceContainer)
+        self.redis = redis_client or aioredis.Redis(connection_pool=aioredis.ConnectionPool(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
-            decode_responses=True
-        )
+            max_connections=settings.REDIS_MAX_CONNECTIONS
+        ))
         self.cache_ttl = settings.REDIS_TTL
 
+        # HTTP-Session mit Keep-Alive, erst im laufenden Event-Loop erzeugt
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Laufende Abrufe/Cache-Füllungen pro Key (Single-Flight)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def close(self):
+        if self._session:
+            await self._session.close()
+            self._session = None
+        await self.redis.aclose()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.API_FOOTBALL_MAX_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=settings.API_FOOTBALL_TIMEOUT),
+                headers=self.headers
+            )
+        return self._session
+
+    async def _single_flight(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Gleichzeitige Aufrufe mit demselben Key teilen sich einen Lauf von
+        load (ein API-Abruf, eine Cache-Füllung) und bekommen dasselbe
+        Ergebnis bzw. denselben Fehler. Bricht ein Aufrufer ab, läuft der
+        Abruf für die anderen weiter.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._in_flight[key] = task
+
+            def done(finished: asyncio.Task):
+                if self._in_flight.get(key) is finished:
+                    del self._in_flight[key]
+                if not finished.cancelled():
+                    finished.exception()  # gilt als abgeholt, auch wenn niemand mehr wartet
+
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Exponentielles Backoff mit Jitter; ein Retry-After (Sekunden) des Servers hat Vorrang."""
+        delay = settings.API_FOOTBALL_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.0)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return min(delay, APIFootballService.MAX_RETRY_DELAY)
+
     @staticmethod
     def _get_league_id(tournament: str) -> Optional[int]:
         """Konvertiert Turniernamen zu API-Football League ID."""
@@ -33,6 +87,19 @@ class APIFootballService:
         """Ermittelt die Saison basierend auf dem Datum."""
         return date.year if date.month > 6 else date.year - 1
 
+    def _cache_key(self, kind: str, tournament: str, game_date: datetime) -> str:
+        """Cache-Key für die komplette Saison"""
+        return f"{kind}:{tournament}:{self._get_season(game_date)}"
+
+    async def _read_maps(self, cache_keys: List[str]) -> Dict[str, Optional[Dict]]:
+        """Liest Saison-Maps in einem Roundtrip (Pipeline); fehlende sind None."""
+        keys = list(dict.fromkeys(cache_keys))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+            values = await pipe.execute()
+        return {key: json.loads(value) if value else None for key, value in zip(keys, values)}
+
     async def _fetch_from_api(self, tournament: str, game_date: datetime) -> Dict[str, Any]:
         """Holt Rohdaten von der API."""
         league_id = self._get_league_id(tournament)
@@ -40,20 +107,35 @@ class APIFootballService:
             raise ValueError(f"Unbekanntes Turnier: {tournament}")
 
         season = self._get_season(game_date)
+        # Phasen und Tabellen derselben Saison brauchen dieselben Rohdaten
+        return await self._single_flight(
+            f"fixtures:{league_id}:{season}",
+            lambda: self._request_fixtures(league_id, season)
+        )
 
+    async def _request_fixtures(self, league_id: int, season: int) -> Dict[str, Any]:
+        """GET /fixtures; bei 429, 5xx, Timeout und Verbindungsfehlern mit Backoff wiederholt."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                        f"{self.base_url}/fixtures",
-                        headers=self.headers,
-                        params={
-                            "league": league_id,
-                            "season": season,
-                        }
-                ) as response:
-                    if response.status != 200:
-                        raise Exception(f"API Error: {response.status}")
-                    return await response.json()
+            for attempt in range(settings.API_FOOTBALL_RETRIES + 1):
+                last_attempt = attempt == settings.API_FOOTBALL_RETRIES
+                retry_after = None
+                try:
+                    async with self._get_session().get(
+                            f"{self.base_url}/fixtures",
+                            params={
+                                "league": league_id,
+                                "season": season,
+                            }
+                    ) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        if last_attempt or (response.status != 429 and response.status < 500):
+                            raise Exception(f"API Error: {response.status}")
+                        retry_after = response.headers.get("Retry-After")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if last_attempt:
+                        raise Exception(f"{type(e).__name__} {str(e)}")
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
         except Exception as e:
             raise Exception(f"API Request fehlgeschlagen: {str(e)}")
 
@@ -62,17 +144,35 @@ class APIFootballService:
         Ermittelt die Phase eines Spiels.
         Returns: 'GROUP', 'KNOCKOUT', 'SEMI', 'FINAL'
         """
-        # Cache-Key für die komplette Saison
-        season = self._get_season(game_date)
-        cache_key = f"phases:{tournament}:{season}"
-
-        # Versuche Phasen-Map aus Cache zu lesen
-        cached_phases = self.redis.get(cache_key)
-        if cached_phases:
-            phases_map = json.loads(cached_phases)
-            date_str = game_date.strftime('%Y-%m-%d')
-            return phases_map.get(date_str, "GROUP")
+        return (await self.get_game_phases([(tournament, game_date)]))[0]
 
+    async def get_game_phases(self, games: List[Tuple[str, datetime]]) -> List[str]:
+        """
+        Phasen mehrerer Spiele (Turnier, Datum). Alle Saison-Maps kommen in
+        einem Redis-Roundtrip, fehlende werden einmal pro Saison von der API geholt.
+        """
+        cache_keys = [self._cache_key("phases", tournament, game_date) for tournament, game_date in games]
+        phases_maps = await self._read_maps(cache_keys)
+
+        # Fehlende Saisons parallel holen; gleichzeitige Anfragen teilen sich Abruf und Cache-Füllung
+        missing = {
+            cache_key: (tournament, game_date)
+            for cache_key, (tournament, game_date) in zip(cache_keys, games)
+            if phases_maps[cache_key] is None
+        }
+        fetched = await asyncio.gather(*(
+            self._single_flight(cache_key, lambda args=args, key=cache_key: self._fetch_phases(*args, key))
+            for cache_key, args in missing.items()
+        ))
+        phases_maps.update(zip(missing, fetched))
+
+        return [
+            phases_maps[cache_key].get(game_date.strftime('%Y-%m-%d'), "GROUP")
+            for cache_key, (_, game_date) in zip(cache_keys, games)
+        ]
+
+    async def _fetch_phases(self, tournament: str, game_date: datetime, cache_key: str) -> Dict[str, str]:
+        """Baut die Phasen-Map der Saison aus der API und cacht sie."""
         # Hole ALLE Spiele der Saison
         data = await self._fetch_from_api(tournament, game_date)
 
@@ -95,174 +195,185 @@ class APIFootballService:
             phases_map[match_date] = phase
 
         # Cache die komplette Map
-        self.redis.setex(cache_key, self.cache_ttl, json.dumps(phases_map))
-
-        return phases_map.get(game_date.strftime('%Y-%m-%d'), "GROUP")
+        await self.redis.setex(cache_key, self.cache_ttl, json.dumps(phases_map))
+        return phases_map
 
     async def get_table_positions(self, tournament: str, team: str, game_date: datetime) -> Tuple[int, int]:
         """
         Ermittelt die Position eines Teams in der Tabelle.
         Returns: (position, total_teams)
         """
+        return (await self.get_table_positions_many(tournament, [team], game_date))[0]
+
+    async def get_table_positions_many(
+            self,
+            tournament: str,
+            teams: List[str],
+            game_date: datetime
+    ) -> List[Tuple[int, int]]:
+        """
+        Positionen mehrerer Teams in derselben Tabelle (Tabelle nur einmal gelesen).
+        Returns: [(position, total_teams), ...] in der Reihenfolge von teams
+        """
         # Stelle sicher, dass game_date timezone-aware ist
         if game_date.tzinfo is None:
             game_date = game_date.replace(tzinfo=timezone.utc)
 
         try:
-            # Cache-Key für die komplette Saison
-            season = self._get_season(game_date)
-            cache_key = f"tables:{tournament}:{season}"
-            print(f"Checking cache for key: {cache_key}")
-
-            # Versuche alle Tabellen der Saison aus Cache zu lesen
-            cached_tables = self.redis.get(cache_key)
-
-            print(f"Cache result: {cached_tables is not None}")
-
-            if cached_tables:
-                tables_map = json.loads(cached_tables)
-                date_str = game_date.strftime('%Y-%m-%d')
-                print(f"Looking for date: {date_str}")
-                print(f"Available dates: {sorted(tables_map.keys())}")
-                # Suche nächstgelegenes Datum in der Vergangenheit
-                available_dates = sorted(tables_map.keys())
-
-                # Finde letzte Tabelle vor unserem Datum
-                closest_date = None
-                for table_date in available_dates:
-                    if table_date <= date_str:
-                        closest_date = table_date
-                    else:
-                        break
-                # Wenn keine frühere Tabelle gefunden, nimm die erste
-                if not closest_date and available_dates:
-                    closest_date = available_dates[0]
-
-                if closest_date:
-                    table = tables_map[closest_date]
-                    if team in table:
-                        return table[team]["position"], len(table)
-
-            print("Cache miss, fetching from API...")
-
-            # Wenn nicht im Cache, hole ALLE Spiele der Saison
-            data = await self._fetch_from_api(tournament, game_date)
-
-            # Erstelle Map von Datum → Tabelle für alle Spieltage
-            tables_map = {}
-
-            # Sortiere Spiele nach Datum
-            sorted_matches = sorted(
-                data["response"],
-                key=lambda x: datetime.fromisoformat(x["fixture"]["date"])
-            )
-
-            # Für jedes Spiel aktualisieren wir die Tabelle
-            for match in sorted_matches:
-                match_date = datetime.fromisoformat(match["fixture"]["date"])
-                if match_date > game_date:
-                    continue  # Ignoriere Spiele nach unserem Anfragedatum
+            # Hash pro Saison: Datum -> Tabelle nach diesem Spieltag. Ein Roundtrip
+            # (HGETALL), dekodiert wird aber nur die benötigte Tabelle, nie die
+            # ganze Saison (json.loads hält den GIL, auch im Thread).
+            cache_key = self._cache_key("table_days", tournament, game_date)
+            date_str = game_date.strftime('%Y-%m-%d')
 
-                date_str = match_date.strftime('%Y-%m-%d')
+            table = None
+            encoded_tables = {day.decode(): encoded for day, encoded in (await self.redis.hgetall(cache_key)).items()}
+            closest_date = self._closest_date(list(encoded_tables), date_str)
+            if closest_date:
+                table = json.loads(encoded_tables[closest_date])
 
-                # Hole letzte Tabelle als Basis oder starte neu
-                last_table = tables_map.get(
-                    max(tables_map.keys()) if tables_map else None,
-                    {}
+            if table is None or any(team not in table for team in teams):
+                # Wenn nicht (vollständig) im Cache, hole ALLE Spiele der Saison
+                tables_map = await self._single_flight(
+                    cache_key,
+                    lambda: self._fetch_tables(tournament, game_date, cache_key)
                 )
+                closest_date = self._closest_date(list(tables_map), date_str)
+                table = tables_map[closest_date] if closest_date else None
 
-                if last_table:
-                    current_table = last_table.copy()
-                else:
-                    current_table = {}
-
-                # Update Tabelle mit neuem Spiel
-                home_team = match["teams"]["home"]["name"]
-                away_team = match["teams"]["away"]["name"]
-                home_goals = match["goals"]["home"]
-                away_goals = match["goals"]["away"]
-
-                # Überspringe Spiele ohne Ergebnis
-                if home_goals is None or away_goals is None:
-                    continue
-
-                # Initialisiere Teams falls nötig
-                for team_name in [home_team, away_team]:
-                    if team_name not in current_table:
-                        current_table[team_name] = {
-                            "points": 0,
-                            "goals_for": 0,
-                            "goals_against": 0,
-                            "matches_played": 0
-                        }
-
-                # Update Statistiken
-                current_table[home_team]["matches_played"] += 1
-                current_table[away_team]["matches_played"] += 1
-
-                if home_goals > away_goals:
-                    current_table[home_team]["points"] += 3
-                elif away_goals > home_goals:
-                    current_table[away_team]["points"] += 3
-                else:
-                    current_table[home_team]["points"] += 1
-                    current_table[away_team]["points"] += 1
-
-                current_table[home_team]["goals_for"] += home_goals
-                current_table[home_team]["goals_against"] += away_goals
-                current_table[away_team]["goals_for"] += away_goals
-                current_table[away_team]["goals_against"] += home_goals
-
-                # Berechne Positionen
-                sorted_teams = sorted(
-                    current_table.items(),
-                    key=lambda x: (
-                        x[1]["points"],
-                        x[1]["goals_for"] - x[1]["goals_against"],
-                        x[1]["goals_for"]
-                    ),
-                    reverse=True
-                )
+            if table is None:
+                return [(0, 0)] * len(teams)
+            # Team nicht in Tabelle = letzter Platz
+            return [
+                (table[team]["position"], len(table)) if team in table else (len(table), len(table))
+                for team in teams
+            ]
 
-                # Füge Positionen hinzu
-                final_table = {}
-                for position, (team_name, stats) in enumerate(sorted_teams, 1):
-                    final_table[team_name] = {
-                        **stats,  # Kopiert alle Werte aus Stats
-                        "position": position
-                    }
-                print(final_table)
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Tabellenposition: {str(e)}")
+            return [(0, 0)] * len(teams)  # Fallback bei Fehler
 
-                tables_map[date_str] = final_table
+    @staticmethod
+    def _closest_date(dates: List[str], date_str: str) -> Optional[str]:
+        """Letztes Datum vor (oder an) date_str; gibt es keins, das erste verfügbare."""
+        available_dates = sorted(dates)
+
+        closest_date = None
+        for table_date in available_dates:
+            if table_date <= date_str:
+                closest_date = table_date
+            else:
+                break
+
+        if not closest_date and available_dates:
+            closest_date = available_dates[0]
+        return closest_date
+
+    async def _write_tables(self, cache_key: str, tables_map: Dict[str, Dict]):
+        """Cacht alle Tabellen der Saison als Hash (ein Feld pro Spieltag)."""
+        if not tables_map:
+            return
+        encoded = await asyncio.to_thread(lambda: {day: json.dumps(table) for day, table in tables_map.items()})
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(cache_key)
+            pipe.hset(cache_key, mapping=encoded)
+            pipe.expire(cache_key, self.cache_ttl)
+            await pipe.execute()
+
+    async def _fetch_tables(self, tournament: str, game_date: datetime, cache_key: str) -> Dict[str, Dict]:
+        """Holt die Spiele der Saison, baut daraus die Tabellen (im Thread) und cacht sie."""
+        data = await self._fetch_from_api(tournament, game_date)
+        tables_map = await asyncio.to_thread(self._build_tables, data, game_date)
+        await self._write_tables(cache_key, tables_map)
+        return tables_map
 
-            # Cache die komplette Map
-            self.redis.setex(cache_key, self.cache_ttl, json.dumps(tables_map))
+    @staticmethod
+    def _build_tables(data: Dict[str, Any], game_date: datetime) -> Dict[str, Dict]:
+        """Tabellen aller Spieltage bis game_date aus den Spielen der Saison."""
+        # Erstelle Map von Datum → Tabelle für alle Spieltage
+        tables_map = {}
+
+        # Sortiere Spiele nach Datum
+        sorted_matches = sorted(
+            data["response"],
+            key=lambda x: datetime.fromisoformat(x["fixture"]["date"])
+        )
 
-            # Formatiere Anfragedatum
-            search_date = game_date.strftime('%Y-%m-%d')
+        # Für jedes Spiel aktualisieren wir die Tabelle
+        for match in sorted_matches:
+            match_date = datetime.fromisoformat(match["fixture"]["date"])
+            if match_date > game_date:
+                continue  # Ignoriere Spiele nach unserem Anfragedatum
 
-            # Hole und sortiere alle verfügbaren Daten
-            available_dates = sorted(tables_map.keys())
+            date_str = match_date.strftime('%Y-%m-%d')
 
-            # Finde das letzte Datum vor unserem Anfragedatum
-            closest_date = None
-            for date in available_dates:
-                if date <= search_date:
-                    closest_date = date
-                else:
-                    break
+            # Hole letzte Tabelle als Basis oder starte neu
+            last_table = tables_map.get(
+                max(tables_map.keys()) if tables_map else None,
+                {}
+            )
 
-            # Wenn kein passendes Datum gefunden, nimm das erste verfügbare
-            if not closest_date and available_dates:
-                closest_date = available_dates[0]
+            if last_table:
+                current_table = last_table.copy()
+            else:
+                current_table = {}
+
+            # Update Tabelle mit neuem Spiel
+            home_team = match["teams"]["home"]["name"]
+            away_team = match["teams"]["away"]["name"]
+            home_goals = match["goals"]["home"]
+            away_goals = match["goals"]["away"]
+
+            # Überspringe Spiele ohne Ergebnis
+            if home_goals is None or away_goals is None:
+                continue
+
+            # Initialisiere Teams falls nötig
+            for team_name in [home_team, away_team]:
+                if team_name not in current_table:
+                    current_table[team_name] = {
+                        "points": 0,
+                        "goals_for": 0,
+                        "goals_against": 0,
+                        "matches_played": 0
+                    }
 
-            # Hole Position, wenn möglich
-            if closest_date:
-                table = tables_map[closest_date]
-                if team in table:
-                    return table[team]["position"], len(table)
-                return len(table), len(table)  # Team nicht in Tabelle = letzter Platz
+            # Update Statistiken
+            current_table[home_team]["matches_played"] += 1
+            current_table[away_team]["matches_played"] += 1
 
-        except Exception as e:
-            print(f"Fehler beim Abrufen der Tabellenposition: {str(e)}")
-            return 0, 0  # Fallback bei Fehler
+            if home_goals > away_goals:
+                current_table[home_team]["points"] += 3
+            elif away_goals > home_goals:
+                current_table[away_team]["points"] += 3
+            else:
+                current_table[home_team]["points"] += 1
+                current_table[away_team]["points"] += 1
+
+            current_table[home_team]["goals_for"] += home_goals
+            current_table[home_team]["goals_against"] += away_goals
+            current_table[away_team]["goals_for"] += away_goals
+            current_table[away_team]["goals_against"] += home_goals
+
+            # Berechne Positionen
+            sorted_teams = sorted(
+                current_table.items(),
+                key=lambda x: (
+                    x[1]["points"],
+                    x[1]["goals_for"] - x[1]["goals_against"],
+                    x[1]["goals_for"]
+                ),
+                reverse=True
+            )
+
+            # Füge Positionen hinzu
+            final_table = {}
+            for position, (team_name, stats) in enumerate(sorted_teams, 1):
+                final_table[team_name] = {
+                    **stats,  # Kopiert alle Werte aus Stats
+                    "position": position
+                }
+
+            tables_map[date_str] = final_table
+
+        return tables_map
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Tuple, Optional
 from ..core.database import Database
+from ..core.snapshot import DatasetSnapshot
 from ..models.domain import Game
 from .api_football_service import APIFootballService
 from . import league_service
@@ -13,48 +14,51 @@ class GameService:
     def __init__(
             self,
             db: Database,
-            api_service: APIFootballService
+            api_service: APIFootballService,
+            snapshot: Optional[DatasetSnapshot] = None  # sobald geladen, ersetzt er die DB-Abfragen
     ):
         self.db = db
+        self.snapshot = snapshot
         self.api_service = api_service
         self.weight_calculator = WeightCalculator(api_service)
         self.pause_detector = PauseDetector()
 
-    async def _get_relevant_games(
+    async def _get_team_games(
             self,
             teams: List[str],
             start_date: datetime,
-            end_date: datetime,
-            tournament: Optional[str] = None
+            end_date: datetime
     ) -> Tuple[List[Game], List[Game]]:
-        """DB-Call für Spiele, optional nur für ein Turnier."""
-
+        """
+        Spiele der Teams in [start_date, end_date] mit streamed-Flag,
+        aufgeteilt in streamable und unstreamable.
+        """
         query = """
-        SELECT g.*, (so.game_id IS NOT NULL) as streamed
+        SELECT
+            g.id,
+            g.team_home,
+            g.team_away,
+            g.tournament_name,
+            g.starts_at,
+            EXISTS (SELECT 1 FROM streaming_offer so WHERE so.game_id = g.id) AS streamed
         FROM game g
-        LEFT JOIN (
-            SELECT DISTINCT game_id 
-            FROM streaming_offer
-        ) so ON g.id = so.game_id
         WHERE (g.team_home = ANY(:teams) OR g.team_away = ANY(:teams))
         AND g.starts_at BETWEEN :start_date AND :end_date
+        ORDER BY g.starts_at
         """
 
-        if tournament:
-            query += ' AND g.tournament_name = :tournament'
-
-        query +=" ORDER BY g.starts_at"
+        if self.snapshot and self.snapshot.ready:
+            result = self.snapshot.games_for_teams(teams, start_date, end_date)
+        else:
+            result = await self.db.execute(query, {
+                "teams": teams,
+                "start_date": start_date,
+                "end_date": end_date
+            })
 
         streamable_games = []
         unstreamable_games = []
 
-        result = await self.db.execute(query, {
-            "teams": teams,
-            "start_date": start_date,
-            "end_date": end_date,
-            "tournament": tournament
-        })
-
         # Konvertierung anpassen
         for row in result:
             game = Game(
@@ -86,27 +90,29 @@ class GameService:
             # Falls start_date ohne timezone übergeben wurde
             start_date = start_date.replace(tzinfo=timezone.utc)
 
-        # 1. Hole Turniere und Hauptliga
-        with ProfilingBlock("game_service.get_leagues"):
-            tournaments = await league_service.get_team_tournaments(self.db, teams)
-        with ProfilingBlock("game_service.get_main_league"):
-            main_league = await league_service.get_main_league(self.db, teams)
-
-        # 2. Hole erstmal nur Spiele der Hauptliga für 6 Monate
-        temp_end = start_date + timedelta(days=180)
-        with ProfilingBlock("game_service.get_main_league_games"):
-            main_league_games = await self._get_relevant_games(
+        # 1. Turniere und Main Liga aus den vorberechneten Tabellen (O(Teams))
+        league_table = league_service.league_table
+        with ProfilingBlock("game_service.main_league"):
+            await league_table.refresh(self.db, self.snapshot)
+            tournaments = league_table.tournaments(teams)
+            main_league = league_table.main_league(teams)
+
+        # Ein Roundtrip: alle Spiele der nächsten 6 Monate
+        horizon_end = start_date + timedelta(days=180)
+        with ProfilingBlock("game_service.get_team_games"):
+            horizon_streamable, horizon_unstreamable = await self._get_team_games(
                 teams=teams,
                 start_date=start_date,
-                end_date=temp_end,
-                tournament=main_league
+                end_date=horizon_end
             )
 
-        # 3. Finde Pausen nur anhand der Hauptliga-Spiele
+        # 2. Finde Pausen nur anhand der streamable Hauptliga-Spiele (ohne Main Liga: alle)
         with ProfilingBlock("game_service.find_pauses"):
-            main_league_pauses = self.pause_detector.find_pauses(main_league_games[0])  # [0] für streamable
+            main_league_pauses = self.pause_detector.find_pauses([
+                game for game in horizon_streamable if not main_league or game.tournament == main_league
+            ])
 
-        # 4. Bestimme Enddatum basierend auf Pausen
+        # 3. Bestimme Enddatum basierend auf Pausen (liegt immer im 6-Monats-Horizont)
         min_end_date = start_date + timedelta(days=90)
         end_date = min_end_date  # Fallback
 
@@ -115,15 +121,11 @@ class GameService:
                 end_date = pause["start"]
                 break
 
-        # 5. Jetzt erst hole alle relevanten Spiele für den finalen Zeitraum
-        with ProfilingBlock("game_service.get_final_games"):
-            streamable_games, unstreamable_games = await self._get_relevant_games(
-                teams=teams,
-                start_date=start_date,
-                end_date=end_date
-            )
+        # 4. Spiele des finalen Zeitraums aus dem Horizont schneiden
+        streamable_games = [game for game in horizon_streamable if game.starts_at <= end_date]
+        unstreamable_games = [game for game in horizon_unstreamable if game.starts_at <= end_date]
 
-        # 6. Gewichte nur die streamable Spiele
+        # 5. Gewichte nur die streamable Spiele
         with ProfilingBlock("game_service.calculate_weights"):
             weighted_games = await self.weight_calculator.calculate_weight(streamable_games)
 
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from ..core.config import settings
+from ..core.kv_store import create_store
+from ..models.domain import Game
+from ..utils.formatting import format_result_for_response
+from ..utils.query import query_hash
+from .package_service import PackageService
+
+ACTIVE_STATUSES = ("running", "finished")
+
+
+class JobManager:
+    """
+    Hintergrund-Optimierung mit Job-Handles.
+
+    Ein Job liefert sofort die Greedy-Lösung; das Simulated Annealing läuft
+    danach in einem begrenzten Pool weiter und schreibt jede Verbesserung in
+    den Store. Da Jobs in Redis liegen, kann jeder uvicorn-Worker Polls
+    beantworten und Jobs abbrechen.
+    """
+
+    POLL_INTERVAL = 0.2  # Sekunden zwischen Store-Abfragen beim Long-Polling
+    CANCEL_CHECK_INTERVAL = 1.0  # Sekunden zwischen Prüfungen auf fremde Abbrüche
+
+    def __init__(self, store, max_workers: int, ttl: int, max_time_budget: float):
+        self.store = store
+        self.ttl = ttl
+        self.max_time_budget = max_time_budget
+        self._slots = asyncio.Semaphore(max_workers)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    @staticmethod
+    def _query_key(query: Dict, time_budget: float) -> str:
+        # Gleiche Anfrage mit anderem Budget liefert andere Verfeinerungen: eigener Job
+        return f"job:query:{query_hash(query)}:{time_budget:g}"
+
+    def time_budget(self, requested: Optional[float], package_service: PackageService) -> float:
+        """Tatsächliches SA-Budget eines Jobs: angefragt oder SA-Zeitlimit, höchstens max_time_budget."""
+        return min(requested or package_service.sa_optimizer.time_limit, self.max_time_budget)
+
+    async def _load(self, job_id: str) -> Optional[Dict]:
+        return (await self._load_raw(job_id))[1]
+
+    async def _load_raw(self, job_id: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Job samt gespeichertem JSON (Vergleichswert für _replace)."""
+        cached = await self.store.get(self._job_key(job_id))
+        return cached, json.loads(cached) if cached else None
+
+    def _encode(self, job: Dict) -> str:
+        job["updated_at"] = time.time()
+        job["expires_at"] = job["updated_at"] + self.ttl
+        return json.dumps(job)
+
+    async def _save(self, job: Dict) -> str:
+        encoded = self._encode(job)
+        await self.store.set(self._job_key(job["id"]), encoded, self.ttl)
+        return encoded
+
+    async def _replace(self, job: Dict, expected: str) -> Optional[str]:
+        """
+        Schreibt den Job nur, wenn im Store noch expected steht (Compare-and-Set).
+        Returns: neuer Vergleichswert, None wenn inzwischen jemand anderes
+        (z.B. ein Abbruch auf einem anderen Worker) geschrieben hat
+        """
+        encoded = self._encode(job)
+        if await self.store.compare_and_set(self._job_key(job["id"]), expected, encoded, self.ttl):
+            return encoded
+        return None
+
+    async def _release_query(self, job: Dict):
+        """Entfernt den Dedup-Verweis, sofern er noch auf diesen Job zeigt."""
+        query_key = self._query_key(job["query"], job["time_budget"])
+        if await self.store.get(query_key) == job["id"]:
+            await self.store.delete(query_key)
+
+    async def find_duplicate(self, query: Dict, time_budget: float) -> Optional[Dict]:
+        """Laufender oder fertiger Job für dieselbe normalisierte Anfrage und dasselbe Budget (siehe time_budget)."""
+        job_id = await self.store.get(self._query_key(query, time_budget))
+        if not job_id:
+            return None
+        job = await self._load(job_id)
+        return job if job and job["status"] in ACTIVE_STATUSES else None
+
+    async def submit(
+            self,
+            query: Dict,
+            games: List[Game],
+            unstreamable_games: List[Game],
+            package_service: PackageService,
+            time_budget: Optional[float] = None
+    ) -> Dict:
+        """Startet einen Job (oder liefert den bestehenden) mit der Greedy-Lösung."""
+        time_budget = self.time_budget(time_budget, package_service)
+        query_key = self._query_key(query, time_budget)
+        duplicate = await self.find_duplicate(query, time_budget)
+        if duplicate:
+            return duplicate
+
+        job_id = uuid.uuid4().hex
+        if not await self.store.set_if_absent(query_key, job_id, self.ttl):
+            # Parallel angelegt: bestehenden Job nehmen, sonst Verweis übernehmen
+            duplicate = await self.find_duplicate(query, time_budget)
+            if duplicate:
+                return duplicate
+            await self.store.set(query_key, job_id, self.ttl)
+
+        improvements = package_service.iter_best_combinations(
+            games=games,
+            max_packages=query["max_combinations"],
+            require_live=query["live_only"],
+            time_limit=time_budget
+        )
+
+        try:
+            greedy_result = await improvements.__anext__()
+        except Exception:
+            await improvements.aclose()
+            await self.store.delete(query_key)
+            raise
+
+        job = {
+            "id": job_id,
+            "status": "running",
+            "query": query,
+            "time_budget": time_budget,
+            "strategy": greedy_result["strategy"],
+            "updates": 1,
+            "data": format_result_for_response(greedy_result, unstreamable_games),
+            "error": None,
+            "created_at": time.time()
+        }
+        written = await self._save(job)
+
+        task = asyncio.create_task(self._refine(job, written, improvements, unstreamable_games))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def _refine(
+            self,
+            job: Dict,
+            written: str,
+            improvements: AsyncIterator[Dict],
+            unstreamable_games: List[Game]
+    ):
+        """
+        Verfeinert einen Job im begrenzten Pool und schreibt Verbesserungen in
+        den Store. Jeder Schreibvorgang ist ein Compare-and-Set gegen den zuletzt
+        selbst geschriebenen Stand (written): hat ein anderer Worker den Job
+        inzwischen abgebrochen, wird nichts überschrieben und die Verfeinerung endet.
+        """
+        watcher = asyncio.create_task(self._watch_cancellation(job["id"], asyncio.current_task()))
+        try:
+            async with self._slots:
+                async for result in improvements:
+                    job.update({
+                        "strategy": result["strategy"],
+                        "updates": job["updates"] + 1,
+                        "data": format_result_for_response(result, unstreamable_games)
+                    })
+                    written = await self._replace(job, written)
+                    if written is None:
+                        break
+            if job["status"] == "running" and written is not None:
+                job["status"] = "finished"
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            watcher.cancel()
+            await improvements.aclose()
+
+        # Fremder Schreibvorgang (Abbruch): dessen Stand bleibt, er hat die Anfrage freigegeben
+        if written is None or await self._replace(job, written) is None:
+            return
+        if job["status"] != "finished":
+            await self._release_query(job)
+
+    async def _watch_cancellation(self, job_id: str, task: asyncio.Task):
+        """Bricht den lokalen Task ab, wenn ein anderer Worker den Job abgebrochen hat."""
+        while not task.done():
+            await asyncio.sleep(self.CANCEL_CHECK_INTERVAL)
+            job = await self._load(job_id)
+            if not job or job["status"] == "cancelled":
+                task.cancel()
+                return
+
+    async def get(self, job_id: str, wait: float = 0) -> Optional[Dict]:
+        """
+        Liefert den Job. Mit wait > 0 (Long-Polling) wird bis zu wait Sekunden
+        auf eine neue Lösung oder das Ende des Jobs gewartet.
+        """
+        job = await self._load(job_id)
+        if not job or wait <= 0 or job["status"] != "running":
+            return job
+
+        deadline = time.time() + wait
+        updates = job["updates"]
+        while time.time() < deadline:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            job = await self._load(job_id)
+            if not job or job["status"] != "running" or job["updates"] != updates:
+                return job
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Dict]:
+        """Bricht einen laufenden Job ab; der ausführende Worker stoppt das SA."""
+        while True:
+            stored, job = await self._load_raw(job_id)
+            if not job:
+                return None
+            if job["status"] != "running":
+                break
+            # Compare-and-Set: ein gleichzeitiges Update oder Ende des Jobs wird nicht überschrieben
+            job["status"] = "cancelled"
+            if await self._replace(job, stored) is not None:
+                await self._release_query(job)
+                break
+
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+        return job
+
+    async def shutdown(self, grace_period: float):
+        """
+        Beim Herunterfahren: laufende Verfeinerungen bis zu grace_period
+        Sekunden weiterlaufen lassen, dann abbrechen. Abgebrochene Jobs werden
+        als "cancelled" gespeichert und geben ihre Anfrage frei.
+        """
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=grace_period)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+# Globale Instanz
+job_manager = JobManager(
+    store=create_store(settings.JOB_STORE),
+    max_workers=settings.JOB_WORKERS,
+    ttl=settings.JOB_TTL,
+    max_time_budget=settings.JOB_MAX_TIME_BUDGET
+)
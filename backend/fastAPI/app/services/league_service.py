@@ -1,45 +1,101 @@
-from typing import Optional
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
 from ..utils.constants import TOP_LEAGUES, LEAGUE_TIERS
+from ..core.config import settings
 from ..core.database import Database
+from ..core.snapshot import DatasetSnapshot
 import re
 
-async def get_team_tournaments(db: Database, teams: list[str]) -> set[str]:
-    """Hole alle Turniere für die ausgewählten Teams."""
-    query = """
-    SELECT ARRAY_AGG(DISTINCT tournament_name) as tournaments
-    FROM game 
-    WHERE team_home = ANY(:teams) OR team_away = ANY(:teams)
+_SEASON = re.compile(r'\s+\d{2,4}/\d{2,4}$')
+
+
+@lru_cache(maxsize=None)
+def base_name(tournament: str) -> str:
+    """Turniername ohne Saison ("Bundesliga 23/24" -> "Bundesliga")."""
+    return _SEASON.sub('', tournament)
+
+
+@lru_cache(maxsize=None)
+def league_rank(tournament: str) -> Tuple:
+    """
+    Sortierschlüssel für die Main Liga, größer = wichtiger: Top-5 Ligen vor
+    allen anderen, dann Tier der Liga, bei gleicher Liga die neueste Saison.
+    """
+    base = base_name(tournament)
+    return base in TOP_LEAGUES, LEAGUE_TIERS.get(base, 1), base, tournament
+
+
+class LeagueTable:
+    """
+    Vorberechnete Tabellen für die Liga-Auswahl: Team -> Turniere und
+    Team -> wichtigstes Turnier (nach league_rank). Die Main Liga mehrerer
+    Teams ist das wichtigste ihrer Turniere, also das Maximum der
+    vorberechneten Einträge: O(Teams) statt einer Abfrage über alle Spiele.
+
+    Gebaut aus dem Dataset-Snapshot (dort beim Export materialisiert) und
+    neu, sobald der Snapshot wechselt; ohne Snapshot aus einer DB-Abfrage,
+    erneuert nach refresh_interval Sekunden.
     """
-    result = await db.execute(query, {"teams": teams})
-    return set(result[0]["tournaments"]) if result and result[0]["tournaments"] else set()
-
-
-async def get_main_league(db: Database, teams: list[str]) -> Optional[str]:
-    """Bestimme die Main Liga"""
-    if not teams:
-        return None
-
-    tournaments = await get_team_tournaments(db, teams)
-
-    tournament_groups = {}
-    for tournament in tournaments:
-        base_name = re.sub(r'\s+\d{2,4}/\d{2,4}$', '', tournament)
-        if base_name not in tournament_groups:
-            tournament_groups[base_name] = []
-        tournament_groups[base_name].append(tournament)
-
-    # Erst Top-5 Ligen prüfen
-    for base_name in TOP_LEAGUES:
-        if base_name in tournament_groups:
-            # Nimm neueste Saison dieses Turniers
-            return max(tournament_groups[base_name])
-
-    # Sonst Liga mit höchstem Tier
-    max_base_name = max(
-        tournament_groups.keys(),
-        key=lambda t: LEAGUE_TIERS.get(t, 1),
-        default=None
-    )
-
-    if max_base_name:
-        return max(tournament_groups[max_base_name])
\ No newline at end of file
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._tournaments: Dict[str, frozenset] = {}
+        self._main_league: Dict[str, str] = {}
+        self._source = None  # Snapshot-Datei, aus der gebaut wurde (None = DB)
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._built_at > 0
+
+    def build(self, tournaments_by_team: Dict[str, Iterable[str]], source=None):
+        tournaments = {team: frozenset(names) for team, names in tournaments_by_team.items()}
+        self._tournaments = tournaments
+        self._main_league = {
+            team: max(names, key=league_rank) for team, names in tournaments.items() if names
+        }
+        self._source = source
+        self._built_at = time.time()
+
+    def stale(self, snapshot: Optional[DatasetSnapshot]) -> bool:
+        if snapshot and snapshot.ready:
+            return self._source != snapshot.data.identity
+        return not self.ready or self._source is not None or time.time() - self._built_at > self.refresh_interval
+
+    async def refresh(self, db: Database, snapshot: Optional[DatasetSnapshot] = None):
+        """Baut die Tabellen neu, falls veraltet: aus dem Snapshot, sonst mit einer DB-Abfrage."""
+        if not self.stale(snapshot):
+            return
+        if snapshot and snapshot.ready:
+            self.build(snapshot.tournaments_by_team(), source=snapshot.data.identity)
+            return
+
+        async with self._lock:
+            if not self.stale(snapshot):
+                return
+            result = await db.execute("""
+            SELECT team_home AS team, tournament_name FROM game
+            UNION
+            SELECT team_away AS team, tournament_name FROM game
+            """)
+            tournaments_by_team = {}
+            for row in result:
+                tournaments_by_team.setdefault(row["team"], []).append(row["tournament_name"])
+            self.build(tournaments_by_team)
+
+    def tournaments(self, teams: Iterable[str]) -> set[str]:
+        result = set()
+        for team in teams:
+            result.update(self._tournaments.get(team, ()))
+        return result
+
+    def main_league(self, teams: Iterable[str]) -> Optional[str]:
+        leagues = [self._main_league[team] for team in teams if team in self._main_league]
+        return max(leagues, key=league_rank, default=None)
+
+
+# Globale Instanz
+league_table = LeagueTable(settings.SNAPSHOT_REFRESH_INTERVAL)
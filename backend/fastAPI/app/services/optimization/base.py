@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
-from ...models.domain import Game
+from typing import Dict, List
+from .coverage import CoverageModel
 
 
 class PackageOptimizer(ABC):
@@ -9,10 +9,56 @@ class PackageOptimizer(ABC):
     @abstractmethod
     async def optimize(
             self,
-            games: List[Game],
-            packages: List[Dict],
-            coverage_map: Dict,
+            model: CoverageModel,
             max_packages: int
     ) -> Dict:
         pass
 
+    def _format_result(
+            self,
+            best_solution: List[int],
+            model: CoverageModel,
+    ) -> Dict:
+        """Baut das Ergebnis aus einer Lösung (Liste von Paket-Indizes)."""
+        if not best_solution:
+            return {
+                'selected_packages': [],
+                'total_cost': 0,
+                'coverage_ratio': 0,
+                'weighted_coverage': 0,
+                'uncovered_games': model.games
+            }
+
+        # Berechne Coverage
+        covered_mask = 0
+        total_cost = 0
+
+        # Formatiere selected_packages
+        selected_packages = []
+        for index in best_solution:
+            package = model.packages[index]
+            package_games = model.package_games(index)
+
+            cost_info = self.cost_calculator.cost_for_months(
+                package,
+                model.month_masks[index],
+            )
+
+            selected_packages.append({
+                'package': package,
+                'covered_games': package_games,
+                'cost': cost_info['total_cost'],
+                'subscription_type': cost_info['subscription_type'],
+                'active_months': cost_info.get('active_months')
+            })
+
+            covered_mask |= model.masks[index]
+            total_cost += cost_info['total_cost']
+
+        return {
+            'selected_packages': selected_packages,
+            'total_cost': total_cost,
+            'coverage_ratio': model.count(covered_mask) / len(model.games),
+            'weighted_coverage': model.weight_of(covered_mask) / model.total_weight,
+            'uncovered_games': model.games_of(model.full_mask & ~covered_mask)
+        }
@@ -0,0 +1,153 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from ...models.domain import Game
+from ..package_cost_calculator import month_ordinal
+
+
+class CoverageBuilder:
+    """
+    Baut Coverage Maps ({Paket-ID: {'games', 'weighted_sum'}}) aus Angeboten.
+
+    Die Angebote werden einmal nach Spiel gruppiert; eine Coverage Map für
+    eine Spielliste kostet danach nur einen Durchlauf über deren Angebote
+    (O(Spiele + Angebote)). Dabei entstehen die Live-Abdeckung und die
+    Abdeckung durch irgendein Angebot gleichzeitig. Spiele stehen in jeder
+    Liste in der Reihenfolge der übergebenen Spielliste; Angebote für
+    unbekannte Pakete werden ignoriert.
+    """
+
+    def __init__(self, packages: List[Dict], offers: Iterable[Dict]):
+        self.package_ids = [package['id'] for package in packages]
+        self.offers_by_game: Dict[int, List[Dict]] = {}
+        for offer in offers:
+            self.offers_by_game.setdefault(offer['game_id'], []).append(offer)
+
+    def coverage_maps(self, games: List[Game]) -> Dict[bool, Dict]:
+        """Coverage Maps für require_live=True (nur Live-Angebote) und False (jedes Angebot)."""
+        live_games = {package_id: [] for package_id in self.package_ids}
+        any_games = {package_id: [] for package_id in self.package_ids}
+
+        for game in games:
+            seen_any = set()
+            seen_live = set()
+            for offer in self.offers_by_game.get(game.id, ()):
+                package_id = offer['streaming_package_id']
+                package_games = any_games.get(package_id)
+                if package_games is None:
+                    continue
+                if package_id not in seen_any:
+                    seen_any.add(package_id)
+                    package_games.append(game)
+                if offer['live'] and package_id not in seen_live:
+                    seen_live.add(package_id)
+                    live_games[package_id].append(game)
+
+        return {
+            require_live: {
+                package_id: {
+                    'games': package_games,
+                    'weighted_sum': sum(game.total_weight for game in package_games)
+                }
+                for package_id, package_games in games_by_package.items()
+            }
+            for require_live, games_by_package in ((True, live_games), (False, any_games))
+        }
+
+
+class CoverageModel:
+    """
+    Kompakte Abdeckungsstruktur für die Optimierer.
+
+    Spiele werden auf dichte Indizes abgebildet, die Abdeckung eines Pakets
+    ist eine int-Bitmaske über diese Indizes. Vereinigungen und "neue Spiele"
+    sind damit Bit-Operationen, Anzahlen ein popcount und gewichtete Summen
+    Lookups in vorberechneten Byte-Tabellen.
+    """
+
+    def __init__(self, games: List[Game], packages: List[Dict], coverage_map: Dict):
+        self.games = games
+        self.packages = packages
+
+        self.game_index = {game.id: i for i, game in enumerate(games)}
+        self.package_index = {package['id']: i for i, package in enumerate(packages)}
+
+        self.weights = [game.total_weight for game in games]
+        self.total_weight = sum(self.weights)
+        self.full_mask = (1 << len(games)) - 1
+        self._byte_count = (len(games) + 7) // 8
+        self._weight_tables = self._build_weight_tables(self.weights)
+
+        # Abdeckung pro Paket als Bitmaske (gleiche Reihenfolge wie packages)
+        self.masks: List[int] = []
+        for package in packages:
+            mask = 0
+            for game in coverage_map[package['id']]['games']:
+                mask |= 1 << self.game_index[game.id]
+            self.masks.append(mask)
+
+        # Spiele pro Monat als Maske (Monatsbit -> Spielmaske), für Monatsmasken von Spielmengen
+        self.month_games: Dict[int, int] = {}
+        for i, game in enumerate(games):
+            month_bit = 1 << month_ordinal(game.starts_at)
+            self.month_games[month_bit] = self.month_games.get(month_bit, 0) | (1 << i)
+        self.month_masks: List[int] = [self.months_of(mask) for mask in self.masks]
+
+        # Bericht der Vorverarbeitung (siehe PackagePruner), None = ungefiltert
+        self.pruning: Optional[Dict] = None
+
+    def subset(self, indices: List[int]) -> "CoverageModel":
+        """Model mit nur den angegebenen Paketen; Spiele und Gewichtstabellen werden geteilt."""
+        model = object.__new__(CoverageModel)
+        model.__dict__.update(self.__dict__)
+        model.packages = [self.packages[i] for i in indices]
+        model.masks = [self.masks[i] for i in indices]
+        model.month_masks = [self.month_masks[i] for i in indices]
+        model.package_index = {package['id']: i for i, package in enumerate(model.packages)}
+        return model
+
+    @staticmethod
+    def _build_weight_tables(weights: List[float]) -> List[List[float]]:
+        """Pro 8 Spiele eine Tabelle: Byte-Wert -> Summe der Gewichte der gesetzten Bits."""
+        tables = []
+        for offset in range(0, len(weights), 8):
+            chunk = weights[offset:offset + 8]
+            table = [0.0] * 256
+            for value in range(1, 256):
+                low_bit = (value & -value).bit_length() - 1
+                weight = chunk[low_bit] if low_bit < len(chunk) else 0.0
+                table[value] = table[value & (value - 1)] + weight
+            tables.append(table)
+        return tables
+
+    @staticmethod
+    def iter_indices(mask: int) -> Iterator[int]:
+        """Liefert die Spiel-Indizes einer Maske in aufsteigender Reihenfolge."""
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    @staticmethod
+    def count(mask: int) -> int:
+        return mask.bit_count()
+
+    def weight_of(self, mask: int) -> float:
+        """Summe der Spielgewichte einer Maske."""
+        if not mask:
+            return 0.0
+        return sum(
+            table[byte]
+            for table, byte in zip(self._weight_tables, mask.to_bytes(self._byte_count, 'little'))
+            if byte
+        )
+
+    def games_of(self, mask: int) -> List[Game]:
+        """Spiele einer Maske in der ursprünglichen Reihenfolge."""
+        games = self.games
+        return [games[i] for i in self.iter_indices(mask)]
+
+    def months_of(self, mask: int) -> int:
+        """Monatsmaske (siehe PackageCostCalculator) der Spiele einer Maske."""
+        return sum(month_bit for month_bit, games in self.month_games.items() if mask & games)
+
+    def package_games(self, index: int) -> List[Game]:
+        return self.games_of(self.masks[index])
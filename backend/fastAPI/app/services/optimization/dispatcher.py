@@ -0,0 +1,126 @@
+import asyncio
+from math import comb
+from typing import Dict, List, Optional
+from .base import PackageOptimizer
+from .coverage import CoverageModel
+from .exact import ExactOptimizer
+from .greedy import GreedyOptimizer
+from .pareto import ParetoOptimizer
+from .simulated_annealing.optimizer import SimulatedAnnealingOptimizer
+from .simulated_annealing.parallel import ParallelSimulatedAnnealingOptimizer
+from ..package_cost_calculator import PackageCostCalculator
+from ...core.config import settings
+
+
+# Pro Worker-Prozess ein Dispatcher (siehe optimize_in_process)
+_worker_dispatcher: Optional["OptimizerDispatcher"] = None
+
+
+def optimize_in_process(
+        model: CoverageModel,
+        max_packages: int,
+        latency_budget: Optional[float] = None
+) -> Dict:
+    """Optimiert eine Anfrage in einem Worker-Prozess des gemeinsamen Pools."""
+    global _worker_dispatcher
+    if _worker_dispatcher is None:
+        _worker_dispatcher = OptimizerDispatcher(PackageCostCalculator(), allow_parallel=False)
+    return asyncio.run(_worker_dispatcher.optimize(model, max_packages, latency_budget))
+
+
+class OptimizerDispatcher(PackageOptimizer):
+    """
+    Wählt pro Anfrage die Strategie anhand von Instanzgröße und Latenzbudget:
+    - exact: wenn die vollständige Suche sicher ins Budget passt
+    - simulated_annealing: Normalfall, Zeitlimit = Budget
+      (ohne latency_budget: settings.SA_DEFAULT_BUDGET)
+      (parallel_simulated_annealing, wenn SA_PARALLEL_CHAINS > 1)
+    - greedy: wenn das Budget nicht einmal für SA reicht
+    """
+
+    # Grob gemessener Durchsatz des Branch-and-Bound (Suchknoten pro Sekunde
+    # bei bis zu GAMES_PER_NODE_UNIT Spielen; mehr Spiele machen Knoten teurer)
+    EXACT_NODES_PER_SECOND = 150_000
+    GAMES_PER_NODE_UNIT = 256
+
+    # Darunter lohnt sich SA nicht mehr, Greedy ist dann die Antwort
+    MIN_SA_BUDGET = 0.05
+
+    def __init__(
+            self,
+            cost_calculator: PackageCostCalculator,
+            exact_time_limit: float = 0.5,  # Maximal erlaubte Worst-Case-Zeit der exakten Suche
+            allow_parallel: bool = True  # False in Worker-Prozessen: keine verschachtelten Prozesspools
+    ):
+        self.cost_calculator = cost_calculator
+        self.greedy = GreedyOptimizer(cost_calculator)
+        self.exact = ExactOptimizer(cost_calculator)
+        self.pareto = ParetoOptimizer(cost_calculator)
+        # Das SA-Zeitlimit ist das Default-Budget aller Anfragen ohne eigenes Budget
+        self.simulated_annealing = SimulatedAnnealingOptimizer(
+            cost_calculator,
+            time_limit=settings.SA_DEFAULT_BUDGET
+        )
+        self.parallel_simulated_annealing = None
+        if allow_parallel and settings.SA_PARALLEL_CHAINS > 1:
+            self.parallel_simulated_annealing = ParallelSimulatedAnnealingOptimizer(
+                cost_calculator,
+                chains=settings.SA_PARALLEL_CHAINS,
+                migration_interval=settings.SA_MIGRATION_INTERVAL or None,
+                time_limit=self.simulated_annealing.time_limit
+            )
+        self.exact_time_limit = exact_time_limit
+
+    def estimate_exact_seconds(self, model: CoverageModel, max_packages: int) -> float:
+        """Worst-Case-Laufzeit der exakten Suche (alle Kombinationen ohne Pruning)."""
+        candidates = sum(1 for mask in model.masks if mask)
+        nodes = sum(comb(candidates, k) for k in range(1, min(max_packages, candidates) + 1))
+        node_cost = len(model.games) // self.GAMES_PER_NODE_UNIT + 1
+        return nodes * node_cost / self.EXACT_NODES_PER_SECOND
+
+    def choose_strategy(
+            self,
+            model: CoverageModel,
+            max_packages: int,
+            latency_budget: Optional[float] = None
+    ) -> str:
+        budget = self.simulated_annealing.time_limit if latency_budget is None else latency_budget
+
+        if self.estimate_exact_seconds(model, max_packages) <= min(budget, self.exact_time_limit):
+            return "exact"
+        if budget < self.MIN_SA_BUDGET:
+            return "greedy"
+        if self.parallel_simulated_annealing is not None:
+            return "parallel_simulated_annealing"
+        return "simulated_annealing"
+
+    async def optimize(
+            self,
+            model: CoverageModel,
+            max_packages: int,
+            latency_budget: Optional[float] = None,
+            seed_solutions: Optional[List[List[int]]] = None  # Paket-IDs früherer Lösungen, nur für SA
+    ) -> Dict:
+        strategy = self.choose_strategy(model, max_packages, latency_budget)
+
+        if strategy == "exact":
+            result = await self.exact.optimize(model, max_packages)
+        elif strategy == "greedy":
+            result = self.greedy.optimize(model, max_packages)
+        elif strategy == "parallel_simulated_annealing":
+            result = await self.parallel_simulated_annealing.optimize(
+                model,
+                max_packages,
+                time_limit=latency_budget,
+                seed_solutions=seed_solutions
+            )
+        else:
+            result = await self.simulated_annealing.optimize(
+                model,
+                max_packages,
+                time_limit=latency_budget,
+                seed_solutions=seed_solutions
+            )
+
+        result['strategy'] = strategy
+        return result
@@ -0,0 +1,83 @@
+import asyncio
+from typing import Dict, List
+from .base import PackageOptimizer
+from .coverage import CoverageModel
+from .simulated_annealing.evaluator import IncrementalEvaluator
+from ..package_cost_calculator import PackageCostCalculator
+from ...utils.profiling import profile_block
+
+
+class ExactOptimizer(PackageOptimizer):
+    """
+    Branch-and-Bound über alle Paket-Kombinationen bis max_packages.
+
+    Maximiert dieselbe Zielfunktion wie das Simulated Annealing und liefert
+    damit das beweisbare Optimum. Nur für kleine Instanzen gedacht, die
+    Auswahl trifft der OptimizerDispatcher.
+    """
+
+    def __init__(self, cost_calculator: PackageCostCalculator):
+        self.cost_calculator = cost_calculator
+
+    @profile_block("exact_optimizer.total")
+    async def optimize(self, model: CoverageModel, max_packages: int) -> Dict:
+        # CPU-gebunden: im Thread, damit der Event-Loop weiter Anfragen bedient
+        solution = await asyncio.to_thread(self.solve, model, max_packages)
+        return self._format_result(solution, model)
+
+    def solve(self, model: CoverageModel, max_packages: int) -> List[int]:
+        """Liefert die optimale Lösung als Liste von Paket-Indizes."""
+        evaluator = IncrementalEvaluator(self.cost_calculator, model)
+
+        # Pakete ohne Abdeckung verschlechtern jede Lösung und fallen weg.
+        # Absteigend nach Gewicht sortiert schrumpfen die Suffix-Schranken schneller.
+        candidates = sorted(
+            (i for i, mask in enumerate(model.masks) if mask),
+            key=lambda i: model.weight_of(model.masks[i]),
+            reverse=True
+        )
+        masks = [model.masks[i] for i in candidates]
+        costs = [evaluator.package_cost(i) for i in candidates]
+
+        # Vereinigung und günstigste Kosten aller Pakete ab Position i
+        suffix_union = [0] * (len(candidates) + 1)
+        suffix_min_cost = [float('inf')] * (len(candidates) + 1)
+        for i in reversed(range(len(candidates))):
+            suffix_union[i] = suffix_union[i + 1] | masks[i]
+            suffix_min_cost[i] = min(suffix_min_cost[i + 1], costs[i])
+
+        best = {'score': float('-inf'), 'solution': []}
+        chosen = []
+
+        def search(start: int, covered_mask: int, total_cost: int):
+            if chosen:
+                score = evaluator.compute_score(model.weight_of(covered_mask), total_cost, len(chosen))
+                if score > best['score']:
+                    best['score'] = score
+                    best['solution'] = chosen.copy()
+
+            if len(chosen) >= max_packages:
+                return
+
+            for i in range(start, len(candidates)):
+                # Obere Schranke für jede Erweiterung mit Paketen ab i:
+                # maximale Abdeckung, minimale Zusatzkosten, mindestens ein Paket mehr.
+                # Sie fällt monoton in i, daher kann die Schleife abbrechen.
+                bound = evaluator.compute_score(
+                    model.weight_of(covered_mask | suffix_union[i]),
+                    total_cost + suffix_min_cost[i],
+                    len(chosen) + 1
+                )
+                if bound <= best['score']:
+                    break
+
+                # Pakete ohne neue Spiele erhöhen nur Kosten und Strafterm
+                if not masks[i] & ~covered_mask:
+                    continue
+
+                chosen.append(i)
+                search(i + 1, covered_mask | masks[i], total_cost + costs[i])
+                chosen.pop()
+
+        search(0, 0, 0)
+        return [candidates[i] for i in best['solution']]
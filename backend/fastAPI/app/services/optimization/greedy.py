@@ -1,69 +1,145 @@
-from typing import Dict
+import heapq
+from typing import Dict, List, Optional
 from .base import PackageOptimizer
+from .coverage import CoverageModel
 from ..package_cost_calculator import PackageCostCalculator
 
 
 class GreedyOptimizer(PackageOptimizer):
-    """Greedy"""
+    """
+    Lazy Greedy (CELF).
+
+    Pakete liegen in einem Max-Heap nach einer oberen Schranke ihres Scores
+    (Gewicht neuer Spiele / Kosten) aus der letzten Bewertung. Pro Runde werden
+    nur Pakete neu bewertet, deren Schranke den besten aktuellen Score noch
+    erreicht. Das Ergebnis entspricht dem vollständigen Scan.
+
+    Bei Jahresabos ist die Schranke der letzte Score selbst (Kosten fix, neue
+    Spiele werden nur weniger). Bei Monatsabos sinken mit den neuen Spielen
+    auch die Kosten, dort gilt Gewicht pro Monat <= stärkster Einzelmonat.
+    """
 
     def __init__(self, cost_calculator: PackageCostCalculator):
         self.cost_calculator = cost_calculator
 
-    def optimize(self, games, packages, coverage_map, max_packages) -> Dict:
+    def _score_bound(self, model: CoverageModel, package: Dict, new_mask: int, weight_sum: float) -> float:
+        """Obere Schranke des Scores für jede Teilmenge der Spiele in new_mask."""
+        available_types = self.cost_calculator.get_available_subscription_types(package)
+        bounds = [0.0]
+
+        if "monthly" in available_types and package['monthly_price_cents'] > 0:
+            strongest_month = max(
+                model.weight_of(new_mask & month_games)
+                for month_games in model.month_games.values()
+                if new_mask & month_games
+            )
+            bounds.append(strongest_month / package['monthly_price_cents'])
+
+        if "yearly" in available_types and package['monthly_price_yearly_subscription_in_cents'] > 0:
+            bounds.append(weight_sum / (package['monthly_price_yearly_subscription_in_cents'] * 12))
+
+        return max(bounds)
+
+    def _evaluate(self, model: CoverageModel, index: int, covered_mask: int) -> Optional[Dict]:
+        """Bewertet ein Paket gegen die aktuelle Abdeckung (None = trägt nichts bei)."""
+        # Nur noch nicht abgedeckte Spiele zählen
+        new_mask = model.masks[index] & ~covered_mask
+        if not new_mask:
+            return None
+
+        package = model.packages[index]
+        cost_info = self.cost_calculator.cost_for_months(package, model.months_of(new_mask))
+        if cost_info["total_cost"] <= 0:
+            return None
+
+        weight_sum = model.weight_of(new_mask)
+        score = weight_sum / cost_info["total_cost"]
+        return {
+            'index': index,
+            'score': score,
+            'bound': max(score, self._score_bound(model, package, new_mask, weight_sum)),
+            'new_mask': new_mask,
+            'weight_sum': weight_sum,
+            'cost_info': cost_info
+        }
+
+    def _select(self, model: CoverageModel, limit: Optional[int]) -> List[Dict]:
+        """Greedy-Auswahl mit Lazy Evaluation; limit=None liefert das komplette Ranking."""
+        # Heap-Einträge: (-schranke, index); Bewertungen mit Runde, in der sie entstanden
+        heap = []
+        evaluations = {}
+        for index in range(len(model.packages)):
+            evaluation = self._evaluate(model, index, 0)
+            if evaluation:
+                evaluations[index] = (0, evaluation)
+                heap.append((-evaluation['bound'], index))
+        heapq.heapify(heap)
+
+        steps = []
+        covered_mask = 0
+        while heap and (limit is None or len(steps) < limit):
+            best = None
+            evaluated = []
+
+            # Nur Pakete bewerten, deren Schranke den besten Score noch erreicht
+            while heap and (best is None or -heap[0][0] >= best['score']):
+                _, index = heapq.heappop(heap)
+                evaluated_in, evaluation = evaluations.pop(index)
+                if evaluated_in != len(steps):
+                    evaluation = self._evaluate(model, index, covered_mask)
+                    if not evaluation:
+                        continue
+
+                evaluated.append(evaluation)
+                if (best is None or evaluation['score'] > best['score'] or
+                        (evaluation['score'] == best['score'] and index < best['index'])):
+                    best = evaluation
+
+            if not best:
+                break
+
+            steps.append(best)
+            covered_mask |= best['new_mask']
+
+            # Bewertete Pakete mit aktualisierter Schranke zurücklegen
+            for evaluation in evaluated:
+                if evaluation is not best:
+                    evaluations[evaluation['index']] = (len(steps) - 1, evaluation)
+                    heapq.heappush(heap, (-evaluation['bound'], evaluation['index']))
+
+        return steps
+
+    def rank(self, model: CoverageModel, limit: Optional[int] = None) -> List[int]:
+        """
+        Paket-Indizes in Greedy-Reihenfolge, bis kein Paket mehr neue Spiele bringt.
+        Günstig auch für große Limits und als Startlösung für SA.
+        """
+        return [step['index'] for step in self._select(model, limit)]
+
+    def optimize(self, model: CoverageModel, max_packages: int) -> Dict:
         selected_packages = []
-        covered_game_ids = set()
+        covered_mask = 0
         total_weight_covered = 0
         total_cost = 0
 
-        # Solange wir max_packages nicht erreicht haben und noch Packages da sind
-        for _ in range(max_packages):
-            best_score = -1
-            best_package_info = None
-
-            # Berechne Scores basierend auf noch ungedeckten Spielen
-            for package in packages:
-                pkg_games = coverage_map[package['id']]['games']
-
-                # Nur noch nicht abgedeckte Spiele zählen
-                new_games = [g for g in pkg_games if g.id not in covered_game_ids]
-                if not new_games:
-                    continue
-
-                weight_sum = sum(g.total_weight for g in new_games)
-                cost_info = self.cost_calculator.calculate_package_cost(package, new_games)
-
-                if cost_info["total_cost"] > 0:
-                    score = weight_sum / cost_info["total_cost"]
-                    if score > best_score:
-                        best_score = score
-                        best_package_info = {
-                            'package': package,
-                            'new_games': new_games,
-                            'weight_sum': weight_sum,
-                            'cost_info': cost_info
-                        }
-
-            if not best_package_info:
-                break
-
-            # Füge bestes Paket hinzu und aktualisiere covered_game_ids
+        for step in self._select(model, max_packages):
             selected_packages.append({
-                'package': best_package_info['package'],
-                'covered_games': best_package_info['new_games'],
-                'weight_sum': best_package_info['weight_sum'],
-                'cost': best_package_info['cost_info']["total_cost"],
-                'subscription_type': best_package_info['cost_info']["subscription_type"],
-                'active_months': best_package_info['cost_info']["active_months"]
+                'package': model.packages[step['index']],
+                'covered_games': model.games_of(step['new_mask']),
+                'weight_sum': step['weight_sum'],
+                'cost': step['cost_info']["total_cost"],
+                'subscription_type': step['cost_info']["subscription_type"],
+                'active_months': step['cost_info']["active_months"]
             })
 
-            covered_game_ids.update(g.id for g in best_package_info['new_games'])
-            total_weight_covered += best_package_info['weight_sum']
-            total_cost += best_package_info['cost_info']["total_cost"]
+            covered_mask |= step['new_mask']
+            total_weight_covered += step['weight_sum']
+            total_cost += step['cost_info']["total_cost"]
 
         return {
             'selected_packages': selected_packages,
             'total_cost': total_cost,
-            'coverage_ratio': len(covered_game_ids) / len(games),
-            'weighted_coverage': total_weight_covered / sum(g.total_weight for g in games),
-            'uncovered_games': [g for g in games if g.id not in covered_game_ids]
+            'coverage_ratio': model.count(covered_mask) / len(model.games),
+            'weighted_coverage': total_weight_covered / model.total_weight,
+            'uncovered_games': model.games_of(model.full_mask & ~covered_mask)
         }
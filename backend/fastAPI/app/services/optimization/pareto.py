@@ -0,0 +1,120 @@
+from typing import Dict, List, Tuple
+from .base import PackageOptimizer
+from .coverage import CoverageModel
+from .simulated_annealing.evaluator import IncrementalEvaluator, SolutionEvaluator
+from ..package_cost_calculator import PackageCostCalculator
+from ...utils.profiling import profile_block
+
+# Zustand einer Teillösung: (Kosten, abgedecktes Gewicht, Abdeckungsmaske, Paket-Indizes)
+State = Tuple[int, float, int, Tuple[int, ...]]
+
+
+class ParetoOptimizer(PackageOptimizer):
+    """
+    Alle nicht dominierten (total_cost, weighted_coverage)-Lösungen mit
+    1..max_packages Paketen in einem Durchlauf.
+
+    Die Suche erweitert Ebene für Ebene jeden Zustand um ein Paket. Pro
+    Abdeckungsmaske bleibt nur der günstigste Zustand; Zustände, deren Maske
+    von einem günstigeren Front-Punkt vollständig enthalten ist, werden
+    verworfen (jede ihrer Erweiterungen ist ebenfalls dominiert). Solange
+    max_states nicht greift, ist die Front damit exakt.
+    """
+
+    def __init__(self, cost_calculator: PackageCostCalculator, max_states: int = 500):
+        self.cost_calculator = cost_calculator
+        self.max_states = max_states  # Zustände pro Ebene, darüber wird ausgedünnt
+
+    @staticmethod
+    def _non_dominated(states: List[State]) -> List[State]:
+        """(Kosten, Gewicht)-Front einer Zustandsmenge, aufsteigend nach Kosten."""
+        front = []
+        best_weight = -1.0
+        for state in sorted(states, key=lambda state: (state[0], -state[1], len(state[3]))):
+            if state[1] > best_weight:
+                front.append(state)
+                best_weight = state[1]
+        return front
+
+    @profile_block("pareto_optimizer.front")
+    def front(self, model: CoverageModel, max_packages: int) -> Tuple[List[List[int]], bool]:
+        """
+        Liefert die Pareto-Front als Lösungen (aufsteigend nach Kosten) und ob
+        sie exakt ist (False, wenn Ebenen auf max_states gekürzt wurden).
+        """
+        evaluator = IncrementalEvaluator(self.cost_calculator, model)
+        candidates = [index for index, mask in enumerate(model.masks) if mask]
+        costs = {index: evaluator.package_cost(index) for index in candidates}
+
+        exact = True
+        level: List[State] = [(0, 0.0, 0, ())]
+        collected: List[State] = []
+
+        for _ in range(max_packages):
+            # Erweiterung um ein Paket; pro Maske nur der günstigste Zustand
+            cheapest: Dict[int, Tuple[int, Tuple[int, ...]]] = {}
+            for cost, _, mask, solution in level:
+                for index in candidates:
+                    package_mask = model.masks[index]
+                    if package_mask & ~mask == 0:
+                        continue  # bringt keine neuen Spiele
+                    new_mask = mask | package_mask
+                    new_cost = cost + costs[index]
+                    known = cheapest.get(new_mask)
+                    if known is None or new_cost < known[0]:
+                        cheapest[new_mask] = (new_cost, solution + (index,))
+
+            if not cheapest:
+                break
+
+            # Gewicht nur einmal pro Maske
+            states = [
+                (cost, model.weight_of(mask), mask, solution)
+                for mask, (cost, solution) in cheapest.items()
+            ]
+            front = self._non_dominated(states)
+            collected.extend(front)
+
+            # Zustände verwerfen, die ein höchstens gleich teurer Front-Punkt enthält
+            level = [
+                state for state in states
+                if not any(
+                    other is not state and other[0] <= state[0] and state[2] & ~other[2] == 0
+                    for other in front
+                )
+            ]
+
+            if len(level) > self.max_states:
+                # Ausdünnen: je zur Hälfte die effizientesten und die mit der höchsten Abdeckung,
+                # damit beide Enden der Front erreichbar bleiben
+                exact = False
+                by_weight = sorted(level, key=lambda state: (-state[1], state[0]))
+                by_ratio = sorted(level, key=lambda state: -state[1] / (state[0] + 1))
+                kept = {}
+                for state in by_weight[:self.max_states // 2] + by_ratio:
+                    kept.setdefault(state[2], state)
+                    if len(kept) >= self.max_states:
+                        break
+                level = list(kept.values())
+
+        return [list(state[3]) for state in self._non_dominated(collected)], exact
+
+    def format_front(self, solutions: List[List[int]], model: CoverageModel) -> List[Dict]:
+        """Formatiert die Front-Lösungen wie einzelne Ergebnisse, ergänzt um die Paketanzahl."""
+        front = []
+        for solution in solutions:
+            point = self._format_result(solution, model)
+            point['package_count'] = len(solution)
+            front.append(point)
+        return front
+
+    async def optimize(self, model: CoverageModel, max_packages: int) -> Dict:
+        """Front-Punkt mit dem besten Score, die ganze Front unter 'pareto_front'."""
+        solutions, exact = self.front(model, max_packages)
+        evaluator = SolutionEvaluator(self.cost_calculator)
+        best_solution = max(solutions, key=lambda solution: evaluator.evaluate(solution, model), default=[])
+
+        result = self._format_result(best_solution, model)
+        result['pareto_front'] = self.format_front(solutions, model)
+        result['pareto_exact'] = exact
+        return result
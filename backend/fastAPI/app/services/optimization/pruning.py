@@ -0,0 +1,79 @@
+from typing import Dict, List
+from .coverage import CoverageModel
+from ..package_cost_calculator import PackageCostCalculator
+
+
+class PackagePruner:
+    """
+    Vorverarbeitung der Kandidaten vor der Optimierung.
+
+    - Pakete ohne Abdeckung fallen weg.
+    - Pakete mit identischer Abdeckung bilden eine Äquivalenzklasse, die das
+      günstigste Paket vertritt.
+    - Ein Paket ist dominiert, wenn ein anderes eine echte Obermenge seiner
+      Spiele höchstens zum gleichen Preis abdeckt.
+
+    Kosten sind wie im Score die Kosten über die komplette Abdeckung eines
+    Pakets. Ein dominiertes Paket kann in jeder Lösung durch sein dominierendes
+    ersetzt werden, ohne dass Abdeckung oder Kosten schlechter werden; das
+    Optimum bleibt also erhalten.
+    """
+
+    def __init__(self, cost_calculator: PackageCostCalculator):
+        self.cost_calculator = cost_calculator
+
+    def prune(self, model: CoverageModel) -> CoverageModel:
+        """Liefert ein Model mit den verbleibenden Paketen; der Bericht liegt in model.pruning."""
+        costs = {}
+        classes: Dict[int, List[int]] = {}
+        empty = []
+        for index, mask in enumerate(model.masks):
+            if not mask:
+                empty.append(index)
+                continue
+            costs[index] = self.cost_calculator.cost_for_months(
+                model.packages[index],
+                model.month_masks[index],
+            )['total_cost']
+            classes.setdefault(mask, []).append(index)
+
+        # Vertreter: günstigstes Paket jeder Klasse (bei Gleichstand das erste)
+        representatives = []
+        equivalent = []
+        for members in classes.values():
+            members.sort(key=lambda index: (costs[index], index))
+            representatives.append(members[0])
+            if len(members) > 1:
+                equivalent.append({
+                    'package': model.packages[members[0]]['name'],
+                    'equivalents': [model.packages[index]['name'] for index in members[1:]]
+                })
+
+        dominated = []
+        kept = []
+        for index in representatives:
+            mask = model.masks[index]
+            dominator = next((
+                other for other in representatives
+                if other != index
+                and costs[other] <= costs[index]
+                and mask & ~model.masks[other] == 0
+            ), None)
+            if dominator is None:
+                kept.append(index)
+            else:
+                dominated.append({
+                    'package': model.packages[index]['name'],
+                    'dominated_by': model.packages[dominator]['name']
+                })
+
+        kept.sort()
+        pruned = model.subset(kept)
+        pruned.pruning = {
+            'candidates_before': len(model.packages),
+            'candidates_after': len(kept),
+            'empty': len(empty),
+            'dominated': dominated,
+            'equivalent': equivalent
+        }
+        return pruned
@@ -1,6 +1,6 @@
-from typing import List, Dict
+from typing import List, Optional, Tuple
 import math
-from ....models.domain import Game
+from ..coverage import CoverageModel
 
 
 class SolutionEvaluator:
@@ -9,11 +9,11 @@ class SolutionEvaluator:
 
     def evaluate(
             self,
-            solution: List[Dict],
-            games: List[Game],
+            solution: List[int],
+            model: CoverageModel,
     ) -> float:
         """
-        Bewertet eine Lösung und gibt einen Score zurück.
+        Bewertet eine Lösung (Liste von Paket-Indizes) und gibt einen Score zurück.
         Höherer Score = bessere Lösung.
         """
         if not solution:
@@ -21,28 +21,137 @@ class SolutionEvaluator:
 
         # Berechne Grundmetriken
         total_cost = 0
-        covered_game_weights = {}  # Speichert für jedes Spiel das beste Gewicht
+        covered_mask = 0
 
         # Evaluiere die Gesamtabdeckung
-        for package in solution:
+        for index in solution:
             # Kosten berechnen
-            cost_info = self.cost_calculator.calculate_package_cost(
-                package['package'],
-                package['covered_games'],
+            cost_info = self.cost_calculator.cost_for_months(
+                model.packages[index],
+                model.month_masks[index],
             )
             total_cost += cost_info['total_cost']
-
-            # Für jedes Spiel im Paket: Aktualisiere bestes Gewicht
-            for game in package['covered_games']:
-                if game.id not in covered_game_weights:
-                    covered_game_weights[game.id] = game.total_weight
+            covered_mask |= model.masks[index]
 
         # Berechne Score
-        total_weight_covered = sum(covered_game_weights.values())
-        total_weight = sum(game.total_weight for game in games)
-
-        coverage_ratio = total_weight_covered / total_weight
+        coverage_ratio = model.weight_of(covered_mask) / model.total_weight
         cost_factor = math.log(total_cost + 1)
         package_count_penalty = len(solution) / 4
 
         return (coverage_ratio * 1000) - cost_factor - package_count_penalty
+
+
+class IncrementalEvaluator:
+    """
+    Inkrementelle Bewertung für den SA-Loop.
+
+    Hält Cover-Counts pro Spiel, das abgedeckte Gewicht und die Kosten der
+    gewählten Pakete. Ein Move (removed, added) wird als Score-Delta bewertet,
+    ohne die Lösung neu aufzubauen. Der Score entspricht SolutionEvaluator.evaluate.
+    """
+
+    def __init__(self, cost_calculator, model: CoverageModel):
+        self.cost_calculator = cost_calculator
+        self.model = model
+        self._package_costs: List[Optional[int]] = [None] * len(model.packages)
+        self.reset([])
+
+    def reset(self, solution: List[int]):
+        """Setzt den Zustand auf eine neue Lösung."""
+        self.solution: List[int] = []
+        self.cover_counts = [0] * len(self.model.games)
+        self.covered_mask = 0
+        self.single_mask = 0  # Spiele, die genau ein gewähltes Paket abdeckt
+        self.covered_weight = 0.0
+        self.total_cost = 0
+        self.score = float('-inf')
+
+        for index in solution:
+            self.apply((None, index))
+
+    def package_cost(self, index: int) -> int:
+        """Kosten eines Pakets über seine komplette Abdeckung (gecacht)."""
+        cost = self._package_costs[index]
+        if cost is None:
+            cost = self.cost_calculator.cost_for_months(
+                self.model.packages[index],
+                self.model.month_masks[index],
+            )['total_cost']
+            self._package_costs[index] = cost
+        return cost
+
+    def compute_score(self, covered_weight: float, total_cost: int, package_count: int) -> float:
+        """Score aus den aggregierten Kennzahlen einer Lösung."""
+        if package_count == 0:
+            return float('-inf')
+
+        coverage_ratio = covered_weight / self.model.total_weight
+        cost_factor = math.log(total_cost + 1)
+        package_count_penalty = package_count / 4
+
+        return (coverage_ratio * 1000) - cost_factor - package_count_penalty
+
+    def score_after(self, move: Tuple[Optional[int], Optional[int]]) -> float:
+        """Score der Lösung nach Anwendung des Moves, ohne den Zustand zu ändern."""
+        removed, added = move
+        masks = self.model.masks
+
+        added_mask = masks[added] if added is not None else 0
+        gained = added_mask & ~self.covered_mask
+        lost = masks[removed] & self.single_mask & ~added_mask if removed is not None else 0
+
+        covered_weight = self.covered_weight
+        if gained:
+            covered_weight += self.model.weight_of(gained)
+        if lost:
+            covered_weight -= self.model.weight_of(lost)
+
+        total_cost = self.total_cost
+        package_count = len(self.solution)
+        if added is not None:
+            total_cost += self.package_cost(added)
+            package_count += 1
+        if removed is not None:
+            total_cost -= self.package_cost(removed)
+            package_count -= 1
+
+        return self.compute_score(covered_weight, total_cost, package_count)
+
+    def delta(self, move: Tuple[Optional[int], Optional[int]]) -> float:
+        """Score-Differenz eines Moves gegenüber der aktuellen Lösung."""
+        if not self.solution:
+            return float('inf')
+        return self.score_after(move) - self.score
+
+    def apply(self, move: Tuple[Optional[int], Optional[int]]):
+        """Übernimmt einen Move; Aufwand proportional zu den Spielen der betroffenen Pakete."""
+        removed, added = move
+        counts = self.cover_counts
+
+        if removed is not None:
+            for game_index in self.model.iter_indices(self.model.masks[removed]):
+                counts[game_index] -= 1
+                bit = 1 << game_index
+                if counts[game_index] == 0:
+                    self.covered_mask ^= bit
+                    self.single_mask ^= bit
+                elif counts[game_index] == 1:
+                    self.single_mask |= bit
+            self.solution.remove(removed)
+            self.total_cost -= self.package_cost(removed)
+
+        if added is not None:
+            for game_index in self.model.iter_indices(self.model.masks[added]):
+                counts[game_index] += 1
+                bit = 1 << game_index
+                if counts[game_index] == 1:
+                    self.covered_mask |= bit
+                    self.single_mask |= bit
+                elif counts[game_index] == 2:
+                    self.single_mask &= ~bit
+            self.solution.append(added)
+            self.total_cost += self.package_cost(added)
+
+        # Exakt aus der Maske statt aufsummiert, damit sich keine Rundungsfehler ansammeln
+        self.covered_weight = self.model.weight_of(self.covered_mask)
+        self.score = self.compute_score(self.covered_weight, self.total_cost, len(self.solution))
@@ -1,17 +1,20 @@
-from typing import List, Dict
+from typing import List, Optional, Tuple
 import random
 
+# Ein Move ist (entferntes Paket, hinzugefügtes Paket) als Paket-Indizes, jeweils optional
+Move = Tuple[Optional[int], Optional[int]]
+
 
 class MoveOperator:
     def get_neighbor(
             self,
-            current_solution: List[Dict],
-            available_packages: List[Dict],
-            coverage_map: Dict,
+            current_solution: List[int],
+            package_count: int,
             max_packages: int
-    ) -> List[Dict]:
+    ) -> Move:
         """
-        Generiert eine neue Nachbarlösung durch zufällige Move-Operation.
+        Wählt eine zufällige Move-Operation für die aktuelle Lösung.
+        Der Move wird nur beschrieben, angewendet wird er vom IncrementalEvaluator.
         """
         move_ops = [
             self.swap_package,
@@ -23,74 +26,53 @@ class MoveOperator:
             move_ops.remove(self.add_package)
         if len(current_solution) <= 1:
             move_ops.remove(self.remove_package)
+        if not current_solution:
+            move_ops.remove(self.swap_package)
 
         move_op = random.choice(move_ops)
-        return move_op(current_solution, available_packages, coverage_map, max_packages)
+        return move_op(current_solution, package_count, max_packages)
+
+    @staticmethod
+    def _random_unused(solution: List[int], package_count: int) -> Optional[int]:
+        """Zieht einen zufälligen, noch nicht gewählten Paket-Index (oder None)."""
+        if len(solution) >= package_count:
+            return None
+        used = set(solution)
+        # Rejection Sampling: bei wenigen gewählten Paketen praktisch immer ein Treffer
+        while True:
+            index = random.randrange(package_count)
+            if index not in used:
+                return index
 
     def swap_package(
             self,
-            solution: List[Dict],
-            available_packages: List[Dict],
-            coverage_map: Dict,
+            solution: List[int],
+            package_count: int,
             max_packages: int
-    ) -> List[Dict]:
+    ) -> Move:
         """Tauscht ein zufälliges Paket gegen ein anderes."""
-        new_solution = solution.copy()
-
-        # Wähle zufällig ein Paket zum Entfernen
-        package_to_remove = random.choice(new_solution)
-        new_solution.remove(package_to_remove)
-
-        # Wähle zufällig ein neues Paket
-        unused_packages = [p for p in available_packages
-                           if not any(sp['package']['id'] == p['id']
-                                      for sp in new_solution)]
-        if unused_packages:
-            new_package = random.choice(unused_packages)
-            new_solution.append({
-                'package': new_package,
-                'covered_games': coverage_map[new_package['id']]['games']
-            })
-
-        return new_solution
+        package_to_remove = random.choice(solution)
+        new_package = self._random_unused(solution, package_count)
+        return package_to_remove, new_package
 
     def add_package(
             self,
-            solution: List[Dict],
-            available_packages: List[Dict],
-            coverage_map: Dict,
+            solution: List[int],
+            package_count: int,
             max_packages: int
-    ) -> List[Dict]:
+    ) -> Move:
         """Fügt ein neues Paket hinzu wenn möglich."""
         if len(solution) >= max_packages:
-            return solution.copy()
-
-        new_solution = solution.copy()
-        unused_packages = [p for p in available_packages
-                           if not any(sp['package']['id'] == p['id']
-                                      for sp in new_solution)]
-
-        if unused_packages:
-            new_package = random.choice(unused_packages)
-            new_solution.append({
-                'package': new_package,
-                'covered_games': coverage_map[new_package['id']]['games']
-            })
-
-        return new_solution
+            return None, None
+        return None, self._random_unused(solution, package_count)
 
     def remove_package(
             self,
-            solution: List[Dict],
-            available_packages: List[Dict],
-            coverage_map: Dict,
+            solution: List[int],
+            package_count: int,
             max_packages: int
-    ) -> List[Dict]:
+    ) -> Move:
         """Entfernt ein zufälliges Paket."""
         if len(solution) <= 1:
-            return solution.copy()
-
-        new_solution = solution.copy()
-        package_to_remove = random.choice(new_solution)
-        new_solution.remove(package_to_remove)
-        return new_solution
\ No newline at end of file
+            return None, None
+        return random.choice(solution), None
@@ -1,8 +1,11 @@
-from typing import List, Dict
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
 from ..base import PackageOptimizer
-from .evaluator import SolutionEvaluator
+from ..coverage import CoverageModel
+from .evaluator import IncrementalEvaluator, SolutionEvaluator
 from .moves import MoveOperator
-from ....models.domain import Game
+from .schedule import AdaptiveCooling
 from ...optimization.greedy import GreedyOptimizer
 import math
 import random
@@ -11,147 +14,217 @@ from ....utils.profiling import profile_block, ProfilingBlock
 
 
 class SimulatedAnnealingOptimizer(PackageOptimizer):
+    # Warmstart: der Abkühlplan beginnt bei diesem Fortschritt (kühler),
+    # das Zeitbudget schrumpft entsprechend
+    WARM_START_PROGRESS = 0.5
+
     def __init__(
             self,
             cost_calculator,
-            initial_temp: float = 100.0,
-            cooling_rate: float = 0.98,
-            min_temp: float = 0.01,
             max_iterations: int = 100000,
-            time_limit: float = 10.0  # Zeitlimit in Sekunden
+            time_limit: float = 10.0,  # Zeitlimit in Sekunden
+            schedule=None  # Abkühlplan, Default adaptiv; GeometricCooling = fester Plan
     ):
         self.cost_calculator = cost_calculator
-        self.evaluator = SolutionEvaluator(cost_calculator)
         self.move_operator = MoveOperator()
         self.greedy_optimizer = GreedyOptimizer(cost_calculator)
 
         # SA Parameter
-        self.initial_temp = initial_temp
-        self.cooling_rate = cooling_rate
-        self.min_temp = min_temp
+        self.schedule = schedule or AdaptiveCooling()
         self.max_iterations = max_iterations
         self.time_limit = time_limit
 
     @profile_block("sa_optimizer.total")
     async def optimize(
             self,
-            games: List[Game],
-            packages: List[Dict],
-            coverage_map: Dict,
-            max_packages: int
+            model: CoverageModel,
+            max_packages: int,
+            time_limit: Optional[float] = None,
+            seed_solutions: Optional[List[List[int]]] = None
     ) -> Dict:
+        """
+        seed_solutions: frühere Lösungen als Listen von Paket-IDs (z.B. einer
+        ähnlichen Anfrage). Ist die beste davon mindestens so gut wie Greedy,
+        startet das SA dort mit kühlerem Plan und kürzerem Budget.
+        """
+        # Optionales Zeitlimit pro Aufruf, z.B. aus dem Latenzbudget des Dispatchers
+        time_limit = self.time_limit if time_limit is None else time_limit
 
-        # Starte mit Greedy-Lösung
+        # Starte mit Greedy-Lösung (oder einer besseren Seed-Lösung)
         with ProfilingBlock("sa_optimizer.initial_solution"):
-            greedy_solution = self.greedy_optimizer.optimize(
-                games, packages, coverage_map, max_packages
+            initial_solution, progress_start, time_limit, warm_start = self.warm_start(
+                model, max_packages, time_limit, seed_solutions
             )
 
-        current_solution = greedy_solution["selected_packages"]
-        current_score = self.evaluator.evaluate(current_solution, games)
+        with ProfilingBlock("sa_optimizer.main_loop"):
+            # CPU-gebunden: im Thread, damit der Event-Loop weiter Anfragen bedient
+            chain = await asyncio.to_thread(
+                self.anneal, model, initial_solution, max_packages, time_limit, (progress_start, 1.0)
+            )
+
+        result = self._format_result(chain['best_solution'], model)
+        result['annealing'] = chain['stats']
+        if warm_start:
+            result['warm_start'] = self.warm_start_report(warm_start, chain['best_score'])
+        return result
+
+    def initial_solution(self, model: CoverageModel, max_packages: int) -> List[int]:
+        """Greedy-Lösung als Liste von Paket-Indizes."""
+        return self.greedy_optimizer.rank(model, max_packages)
+
+    def warm_start(
+            self,
+            model: CoverageModel,
+            max_packages: int,
+            time_limit: float,
+            seed_solutions: Optional[List[List[int]]] = None
+    ) -> Tuple[List[int], float, float, Optional[Dict]]:
+        """
+        Wählt die Startlösung: Greedy oder die beste Seed-Lösung, falls mindestens
+        gleich gut. Seeds sind Paket-IDs; Pakete, die das Model nicht (mehr)
+        enthält, fallen weg, überzählige am Ende ebenso.
+        Returns: (Startlösung, Plan-Fortschritt, Zeitlimit, Seed-Info oder None)
+        """
+        initial_solution = self.initial_solution(model, max_packages)
+        if not seed_solutions:
+            return initial_solution, 0.0, time_limit, None
+
+        evaluator = SolutionEvaluator(self.cost_calculator)
+        best_seed, best_seed_score = None, float('-inf')
+        for package_ids in seed_solutions:
+            seed = []
+            for package_id in package_ids:
+                index = model.package_index.get(package_id)
+                if index is not None and index not in seed:
+                    seed.append(index)
+            seed = seed[:max_packages]
+            score = evaluator.evaluate(seed, model)
+            if seed and score > best_seed_score:
+                best_seed, best_seed_score = seed, score
+
+        greedy_score = evaluator.evaluate(initial_solution, model)
+        if best_seed is None or best_seed_score < greedy_score:
+            return initial_solution, 0.0, time_limit, None
+
+        warm_start = {'seed_score': best_seed_score, 'greedy_score': greedy_score}
+        return (
+            best_seed,
+            self.WARM_START_PROGRESS,
+            time_limit * (1 - self.WARM_START_PROGRESS),
+            warm_start
+        )
+
+    @staticmethod
+    def warm_start_report(warm_start: Dict, best_score: float) -> Dict:
+        return {
+            **warm_start,
+            'score': best_score,
+            'improvement': best_score - warm_start['seed_score']
+        }
+
+    def anneal(
+            self,
+            model: CoverageModel,
+            initial_solution: List[int],
+            max_packages: int,
+            time_limit: float,
+            progress: Tuple[float, float] = (0.0, 1.0),
+            on_improvement: Optional[Callable[[List[int], float], None]] = None,
+            stop_event: Optional[threading.Event] = None,
+            cooling=None,
+            schedule_time_limit: Optional[float] = None
+    ) -> Dict:
+        """
+        Eine SA-Kette ab initial_solution. Synchron, damit sie auch in
+        Worker-Prozessen oder Threads laufen kann. progress gibt an, welchen
+        Abschnitt des Abkühlplans dieser Aufruf abdeckt.
+        Etappen: cooling ist der Abkühlplan (Run) aus dem vorigen Aufruf; die
+        Kette setzt mit Temperatur, Stagnations- und Nachheizzustand fort,
+        statt neu zu kalibrieren. schedule_time_limit ist dann das Zeitbudget
+        des ganzen Plans, time_limit nur das dieser Etappe.
+        on_improvement wird bei jeder strikt besseren Lösung aufgerufen,
+        stop_event bricht die Kette vorzeitig ab.
+        Returns: best_solution, best_score, current_solution, temperature,
+        iterations, finished (Plan vorzeitig beendet), cooling, stats
+        """
+        # Inkrementeller Zustand: Moves werden als Score-Delta bewertet
+        state = IncrementalEvaluator(self.cost_calculator, model)
+        state.reset(initial_solution)
 
         # Beste Lösung tracken
-        best_solution = current_solution
-        best_score = current_score
+        best_solution = state.solution.copy()
+        best_score = state.score
 
-        # Temperatur und Zeit initialisieren
-        temperature = self.initial_temp
+        # Abkühlplan kalibrieren (oder fortsetzen) und Zeit initialisieren
         start_time = time.time()
+        if cooling is None:
+            cooling = self.schedule.start(
+                state,
+                self.move_operator,
+                max_packages,
+                time_limit if schedule_time_limit is None else schedule_time_limit,
+                self.max_iterations,
+                progress
+            )
+        # Bisherige Laufzeit des Plans aus früheren Etappen
+        elapsed_before = cooling.elapsed
 
         # Hauptloop
         iteration = 0
-        with ProfilingBlock("sa_optimizer.main_loop"):
-            while (temperature > self.min_temp and
-                   iteration < self.max_iterations and
-                   time.time() - start_time < self.time_limit):
-
-                # Generiere neue Lösung
-                new_solution = self.move_operator.get_neighbor(
-                    current_solution,
-                    packages,
-                    coverage_map,
-                    max_packages
-                )
-                new_score = self.evaluator.evaluate(new_solution, games)
-
-                # Berechne Akzeptanzwahrscheinlichkeit
-                if self._should_accept(current_score, new_score, temperature):
-                    current_solution = new_solution
-                    current_score = new_score
-
-                    # Update beste Lösung wenn nötig
-                    if current_score > best_score:
-                        best_solution = current_solution
-                        best_score = current_score
-
-                # Kühle ab
-                temperature *= self.cooling_rate
-                iteration += 1
-
-        return self._format_result(best_solution, games, coverage_map)
+        elapsed = time.time() - start_time
+        while (model.packages and
+               not cooling.finished and
+               cooling.iterations < self.max_iterations and
+               elapsed < time_limit and
+               not (stop_event and stop_event.is_set())):
+
+            # Generiere Move und bewerte nur die Änderung
+            move = self.move_operator.get_neighbor(
+                state.solution,
+                len(model.packages),
+                max_packages
+            )
+            delta = state.delta(move)
+
+            # Berechne Akzeptanzwahrscheinlichkeit
+            accepted = self._should_accept(delta, cooling.temperature)
+            improved = False
+            if accepted:
+                state.apply(move)
+
+                # Update beste Lösung wenn nötig
+                if state.score > best_score:
+                    best_solution = state.solution.copy()
+                    best_score = state.score
+                    improved = True
+                    if on_improvement:
+                        on_improvement(best_solution, best_score)
+
+            # Kühle ab (bzw. heize bei Stagnation nach)
+            iteration += 1
+            elapsed = time.time() - start_time
+            cooling.record(delta, accepted, improved, elapsed_before + elapsed)
+
+        return {
+            'best_solution': best_solution,
+            'best_score': best_score,
+            'current_solution': state.solution.copy(),
+            'temperature': cooling.temperature,
+            'iterations': iteration,
+            'finished': cooling.finished,
+            'cooling': cooling,
+            'stats': cooling.stats()
+        }
 
     @staticmethod
-    def _should_accept(current_score: float, new_score: float, temperature: float) -> bool:
+    def _should_accept(delta: float, temperature: float) -> bool:
         """
-        Entscheidet, ob eine neue Lösung akzeptiert wird.
+        Entscheidet anhand des Score-Deltas, ob ein Move akzeptiert wird.
         Bessere Lösungen werden immer akzeptiert.
         Schlechtere mit einer temperaturabhängigen Wahrscheinlichkeit.
         """
-        if new_score > current_score:
+        if delta > 0:
             return True
 
-        delta = new_score - current_score
         probability = math.exp(delta / temperature)
         return random.random() < probability
-
-    def _format_result(
-            self,
-            best_solution: List[Dict],
-            games: List[Game],
-            coverage_map: Dict,
-    ) -> Dict:
-        if not best_solution:
-            return {
-                'selected_packages': [],
-                'total_cost': 0,
-                'coverage_ratio': 0,
-                'weighted_coverage': 0,
-                'uncovered_games': games
-            }
-
-        # Berechne Coverage
-        covered_game_ids = set()
-        total_cost = 0
-        total_weight_covered = 0
-        total_weight = sum(game.total_weight for game in games)
-
-        # Formatiere selected_packages
-        selected_packages = []
-        for package in best_solution:
-            package_games = coverage_map[package['package']['id']]['games']
-            new_games = [g for g in package_games if g.id not in covered_game_ids]
-
-            cost_info = self.cost_calculator.calculate_package_cost(
-                package['package'],
-                package_games,
-            )
-
-            selected_packages.append({
-                'package': package['package'],
-                'covered_games': package_games,
-                'cost': cost_info['total_cost'],
-                'subscription_type': cost_info['subscription_type'],
-                'active_months': cost_info.get('active_months')
-            })
-
-            covered_game_ids.update(g.id for g in new_games)
-            total_weight_covered += sum(g.total_weight for g in new_games)
-            total_cost += cost_info['total_cost']
-
-        return {
-            'selected_packages': selected_packages,
-            'total_cost': total_cost,
-            'coverage_ratio': len(covered_game_ids) / len(games),
-            'weighted_coverage': total_weight_covered / total_weight,
-            'uncovered_games': [g for g in games if g.id not in covered_game_ids]
-        }
@@ -0,0 +1,210 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from ..base import PackageOptimizer
+from ..coverage import CoverageModel
+from .optimizer import SimulatedAnnealingOptimizer
+from ....core.config import settings
+from ....utils.profiling import profile_block, ProfilingBlock
+
+# Prozesspool für alle Anfragen; erzeugt bei der ersten Nutzung oder per
+# start_executor beim App-Start (nur wenn parallele SA-Ketten konfiguriert sind)
+_executor: Optional[ProcessPoolExecutor] = None
+POOL_WORKERS = settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+
+# Pro Worker-Prozess: zuletzt benutzte (Optimizer, Model)-Paare nach Token
+_worker_models: "OrderedDict[str, tuple]" = OrderedDict()
+_WORKER_MODEL_CACHE_SIZE = 4
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Gemeinsamer Prozesspool. spawn statt fork, da der Server Threads hält."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _warm_worker(hold: float) -> int:
+    """Im Worker: importiert die Optimierung vorab und bleibt kurz belegt."""
+    from .. import dispatcher  # noqa: F401  (optimize_in_process der Batch-Anfragen)
+    time.sleep(hold)
+    return os.getpid()
+
+
+async def start_executor(timeout: float = 60.0) -> int:
+    """
+    Startet alle Prozesse des Pools und lädt dort die Module, damit keine
+    Anfrage Prozessstart und Imports in ihrem Latenzbudget bezahlt. Die Tasks
+    bleiben kurz belegt, sodass jeder Prozess einen bekommt.
+    Returns: Anzahl gestarteter Prozesse
+    """
+    executor = get_executor()
+    loop = asyncio.get_running_loop()
+    pids = set()
+    deadline = time.monotonic() + timeout
+    while len(pids) < POOL_WORKERS and time.monotonic() < deadline:
+        pids.update(await asyncio.gather(*(
+            loop.run_in_executor(executor, _warm_worker, 0.1) for _ in range(POOL_WORKERS)
+        )))
+    return len(pids)
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _run_chain(
+        token: str,
+        payload: bytes,
+        initial_solution: List[int],
+        max_packages: int,
+        time_limit: float,
+        progress: Tuple[float, float],
+        seed: int,
+        cooling=None,
+        schedule_time_limit: Optional[float] = None
+) -> Dict:
+    """
+    Läuft im Worker: deserialisiert das Model nur einmal pro Token und Prozess.
+    cooling ist der Abkühlplan der Kette aus der vorigen Epoche (None = kalibrieren).
+    """
+    if token not in _worker_models:
+        _worker_models[token] = pickle.loads(payload)
+        if len(_worker_models) > _WORKER_MODEL_CACHE_SIZE:
+            _worker_models.popitem(last=False)
+    optimizer, model = _worker_models[token]
+
+    random.seed(seed)
+    return optimizer.anneal(
+        model,
+        initial_solution,
+        max_packages,
+        time_limit,
+        progress,
+        cooling=cooling,
+        schedule_time_limit=schedule_time_limit
+    )
+
+
+class ParallelSimulatedAnnealingOptimizer(PackageOptimizer):
+    """
+    Mehrere unabhängig geseedete SA-Ketten in einem Prozesspool.
+
+    Mit migration_interval laufen die Ketten in Epochen; nach jeder Epoche
+    übernimmt die schlechteste Kette die global beste Lösung (Island-Modell).
+    Zurückgegeben wird die beste Lösung aller Ketten.
+    """
+
+    def __init__(
+            self,
+            cost_calculator,
+            chains: Optional[int] = None,
+            workers: Optional[int] = None,
+            migration_interval: Optional[float] = None,  # Sekunden, None = keine Migration
+            time_limit: float = 10.0
+    ):
+        self.cost_calculator = cost_calculator
+        self.sa_optimizer = SimulatedAnnealingOptimizer(cost_calculator, time_limit=time_limit)
+        self.workers = workers or POOL_WORKERS
+        self.chains = chains or self.workers
+        self.migration_interval = migration_interval
+        self.time_limit = time_limit
+
+    @profile_block("parallel_sa_optimizer.total")
+    async def optimize(
+            self,
+            model: CoverageModel,
+            max_packages: int,
+            time_limit: Optional[float] = None,
+            seed_solutions: Optional[List[List[int]]] = None
+    ) -> Dict:
+        time_limit = self.time_limit if time_limit is None else time_limit
+
+        with ProfilingBlock("parallel_sa_optimizer.initial_solution"):
+            initial_solution, progress_start, time_limit, warm_start = self.sa_optimizer.warm_start(
+                model, max_packages, time_limit, seed_solutions
+            )
+
+        # Model wird einmal serialisiert; Worker cachen es über das Token
+        payload = pickle.dumps((self.sa_optimizer, model))
+        token = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+
+        if self.migration_interval:
+            epochs = max(1, math.ceil(time_limit / self.migration_interval))
+        else:
+            epochs = 1
+        epoch_time = time_limit / epochs
+
+        # Jede Kette hat einen Abkühlplan über das ganze Budget, kalibriert in
+        # der ersten Epoche; spätere Epochen setzen ihn mit Temperatur,
+        # Stagnations- und Nachheizzustand fort
+        chains = [initial_solution for _ in range(self.chains)]
+        coolings = [None] * self.chains
+        best_solution = initial_solution
+        best_score = float('-inf')
+        iterations = 0
+        results = []
+
+        with ProfilingBlock("parallel_sa_optimizer.chains"):
+            for epoch in range(epochs):
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(
+                        executor,
+                        _run_chain,
+                        token,
+                        payload,
+                        chain,
+                        max_packages,
+                        epoch_time,
+                        (progress_start, 1.0),
+                        random.getrandbits(32),
+                        cooling,
+                        time_limit
+                    )
+                    for chain, cooling in zip(chains, coolings)
+                ))
+
+                for result in results:
+                    iterations += result['iterations']
+                    if result['best_score'] > best_score:
+                        best_score = result['best_score']
+                        best_solution = result['best_solution']
+
+                chains = [result['current_solution'] for result in results]
+                coolings = [result['cooling'] for result in results]
+
+                # Alle Ketten stagniert: weitere Epochen bringen nichts
+                if all(result['finished'] for result in results):
+                    break
+
+                # Migration: schlechteste Kette setzt bei der global besten Lösung fort
+                worst = min(range(len(results)), key=lambda i: results[i]['best_score'])
+                chains[worst] = best_solution
+
+        result = self._format_result(best_solution, model)
+        result['annealing'] = {
+            'chains': self.chains,
+            'epochs': epochs,
+            'iterations': iterations,
+            'chain_stats': [chain_result['stats'] for chain_result in results]
+        }
+        if warm_start:
+            result['warm_start'] = self.sa_optimizer.warm_start_report(warm_start, best_score)
+        return result
@@ -0,0 +1,221 @@
+import math
+import time
+from typing import Dict, Tuple
+from .evaluator import IncrementalEvaluator
+from .moves import MoveOperator
+
+
+class GeometricCooling:
+    """Feste geometrische Abkühlung (ursprüngliches Verhalten)."""
+
+    def __init__(self, initial_temp: float = 100.0, cooling_rate: float = 0.98, min_temp: float = 0.01):
+        self.initial_temp = initial_temp
+        self.cooling_rate = cooling_rate
+        self.min_temp = min_temp
+
+    def start(
+            self,
+            state: IncrementalEvaluator,
+            move_operator: MoveOperator,
+            max_packages: int,
+            time_limit: float,
+            max_iterations: int,
+            progress: Tuple[float, float] = (0.0, 1.0)
+    ) -> "GeometricRun":
+        start, _ = progress
+        # Fortsetzung einer Kette: Temperatur dort aufnehmen, wo sie aufgehört hat
+        temperature = self.initial_temp * self.cooling_rate ** (start * max_iterations)
+        return GeometricRun(self, temperature)
+
+
+class GeometricRun:
+    def __init__(self, schedule: GeometricCooling, temperature: float):
+        self.schedule = schedule
+        self.temperature = temperature
+        self.initial_temperature = temperature
+        self.iterations = 0
+        self.accepted = 0
+        self.elapsed = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.temperature <= self.schedule.min_temp
+
+    def record(self, delta: float, accepted: bool, improved: bool, elapsed: float):
+        self.iterations += 1
+        self.accepted += accepted
+        self.elapsed = elapsed
+        self.temperature *= self.schedule.cooling_rate
+
+    def stats(self) -> Dict:
+        return {
+            "schedule": "geometric",
+            "iterations": self.iterations,
+            "acceptance_rate": self.accepted / self.iterations if self.iterations else 0.0,
+            "initial_temperature": self.initial_temperature,
+            "final_temperature": self.temperature
+        }
+
+
+class AdaptiveCooling:
+    """
+    Budgetabhängige Abkühlung.
+
+    - Start- und Endtemperatur werden aus Stichproben von Move-Deltas kalibriert:
+      eine durchschnittliche Verschlechterung wird anfangs mit initial_acceptance
+      akzeptiert, eine kleine (final_quantile) am Ende mit final_acceptance.
+      Die Deltas streuen stark (Abdeckungsverlust vs. Kostenänderung), daher
+      reicht der Mittelwert für das Ende nicht.
+    - Die Temperatur fällt geometrisch über den Fortschritt im Budget
+      (Iterationen oder Zeit, je nachdem was zuerst knapp wird).
+    - Ohne Verbesserung über stagnation_fraction des Budgets wird nachgeheizt;
+      nach max_reheats endet die Kette vorzeitig.
+    """
+
+    def __init__(
+            self,
+            initial_acceptance: float = 0.8,
+            final_acceptance: float = 0.001,
+            reheat_acceptance: float = 0.3,
+            final_quantile: float = 0.1,
+            calibration_samples: int = 100,
+            stagnation_fraction: float = 0.1,
+            max_reheats: int = 3
+    ):
+        self.initial_acceptance = initial_acceptance
+        self.final_acceptance = final_acceptance
+        self.reheat_acceptance = reheat_acceptance
+        self.final_quantile = final_quantile
+        self.calibration_samples = calibration_samples
+        self.stagnation_fraction = stagnation_fraction
+        self.max_reheats = max_reheats
+
+    @staticmethod
+    def _temperature_for(worsening: float, acceptance: float) -> float:
+        """Temperatur, bei der eine Verschlechterung dieser Größe mit acceptance angenommen wird."""
+        return worsening / -math.log(acceptance)
+
+    def start(
+            self,
+            state: IncrementalEvaluator,
+            move_operator: MoveOperator,
+            max_packages: int,
+            time_limit: float,
+            max_iterations: int,
+            progress: Tuple[float, float] = (0.0, 1.0)
+    ) -> "AdaptiveRun":
+        # Stichproben ohne Anwenden: liefern Delta-Größen und Kosten pro Iteration
+        worsenings = []
+        sample_start = time.time()
+        for _ in range(self.calibration_samples):
+            move = move_operator.get_neighbor(state.solution, len(state.model.packages), max_packages)
+            delta = state.delta(move)
+            if -math.inf < delta < 0:
+                worsenings.append(-delta)
+        seconds_per_iteration = (time.time() - sample_start) / self.calibration_samples
+
+        worsenings.sort()
+        mean_worsening = sum(worsenings) / len(worsenings) if worsenings else 1.0
+        small_worsening = worsenings[int(len(worsenings) * self.final_quantile)] if worsenings else 1.0
+        median_worsening = worsenings[len(worsenings) // 2] if worsenings else 1.0
+        iteration_budget = max_iterations
+        if seconds_per_iteration > 0:
+            iteration_budget = min(max_iterations, int(time_limit / seconds_per_iteration))
+
+        return AdaptiveRun(
+            schedule=self,
+            initial_temperature=self._temperature_for(mean_worsening, self.initial_acceptance),
+            final_temperature=self._temperature_for(small_worsening, self.final_acceptance),
+            reheat_temperature=self._temperature_for(median_worsening, self.reheat_acceptance),
+            iteration_budget=max(iteration_budget, 1),
+            time_limit=time_limit,
+            progress=progress
+        )
+
+
+class AdaptiveRun:
+    def __init__(
+            self,
+            schedule: AdaptiveCooling,
+            initial_temperature: float,
+            final_temperature: float,
+            reheat_temperature: float,
+            iteration_budget: int,
+            time_limit: float,
+            progress: Tuple[float, float]
+    ):
+        self.schedule = schedule
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+        self.reheat_temperature = reheat_temperature
+        self.iteration_budget = iteration_budget
+        self.time_limit = time_limit
+        self.progress_start, self.progress_end = progress
+
+        # Aktueller Abkühlzyklus: ab Fortschritt cycle_progress von cycle_temperature
+        # auf final_temperature bei progress_end
+        self.cycle_progress = self.progress_start
+        self.cycle_temperature = self._base_temperature(self.progress_start)
+        self.temperature = self.cycle_temperature
+        self.start_temperature = self.temperature
+
+        self.stagnation_window = max(int(iteration_budget * schedule.stagnation_fraction), 1)
+        self.iterations = 0
+        self.last_improvement = 0
+        self.reheats = 0
+        self.worsening_moves = 0
+        self.worsening_accepted = 0
+        self.accepted = 0
+        self.elapsed = 0.0  # Laufzeit des Plans bisher, über Etappen hinweg
+        self.stagnated = False
+
+    def _base_temperature(self, progress: float) -> float:
+        ratio = self.final_temperature / self.initial_temperature
+        return self.initial_temperature * ratio ** progress
+
+    @property
+    def finished(self) -> bool:
+        return self.stagnated
+
+    def record(self, delta: float, accepted: bool, improved: bool, elapsed: float):
+        self.iterations += 1
+        self.accepted += accepted
+        self.elapsed = elapsed
+        if delta < 0:
+            self.worsening_moves += 1
+            self.worsening_accepted += accepted
+
+        fraction = min(max(self.iterations / self.iteration_budget, elapsed / self.time_limit), 1.0)
+        progress = self.progress_start + (self.progress_end - self.progress_start) * fraction
+
+        if improved:
+            self.last_improvement = self.iterations
+        elif self.iterations - self.last_improvement >= self.stagnation_window:
+            if self.reheats >= self.schedule.max_reheats:
+                self.stagnated = True
+            elif progress < self.progress_end:
+                # Nachheizen: neuer Zyklus ab hier, endet wieder bei final_temperature
+                self.reheats += 1
+                self.last_improvement = self.iterations
+                self.cycle_progress = progress
+                self.cycle_temperature = max(self.temperature, self.reheat_temperature)
+
+        span = self.progress_end - self.cycle_progress
+        cycle_fraction = (progress - self.cycle_progress) / span if span > 0 else 1.0
+        ratio = self.final_temperature / self.cycle_temperature
+        self.temperature = self.cycle_temperature * ratio ** cycle_fraction
+
+    def stats(self) -> Dict:
+        return {
+            "schedule": "adaptive",
+            "iterations": self.iterations,
+            "iteration_budget": self.iteration_budget,
+            "acceptance_rate": self.accepted / self.iterations if self.iterations else 0.0,
+            "worsening_acceptance_rate": (
+                self.worsening_accepted / self.worsening_moves if self.worsening_moves else 0.0
+            ),
+            "initial_temperature": self.start_temperature,
+            "final_temperature": self.temperature,
+            "reheats": self.reheats,
+            "stagnated": self.stagnated
+        }
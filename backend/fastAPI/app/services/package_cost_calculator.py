@@ -1,8 +1,57 @@
-from typing import Dict, List
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+from ..core.config import settings
 from ..models.domain import Game
 
+# Monats-Ordinalzahlen zählen ab Januar dieses Jahres (Bit 0 der Monatsmasken).
+# Frühere Zeitpunkte haben keine Monatsnummer (negatives Bit).
+MONTH_EPOCH_YEAR = 2000
+
+
+def month_ordinal(starts_at: datetime) -> int:
+    """
+    Fortlaufende Monatsnummer eines Zeitpunkts (Januar MONTH_EPOCH_YEAR = 0).
+    Raises: ValueError für Zeitpunkte vor MONTH_EPOCH_YEAR
+    """
+    if starts_at.year < MONTH_EPOCH_YEAR:
+        raise ValueError(f"Zeitpunkt vor {MONTH_EPOCH_YEAR} hat keine Monatsnummer: {starts_at.isoformat()}")
+    return (starts_at.year - MONTH_EPOCH_YEAR) * 12 + starts_at.month - 1
+
+
+def month_label(ordinal: int) -> str:
+    """Monatsnummer als 'YYYY-MM'."""
+    year, month = divmod(ordinal, 12)
+    return f"{year + MONTH_EPOCH_YEAR:04d}-{month + 1:02d}"
+
 
 class PackageCostCalculator:
+    """
+    Kosten eines Pakets hängen nur von den Monaten ab, in denen es gebraucht
+    wird. Spiele werden daher auf eine Monatsmaske (ein Bit pro Monat)
+    abgebildet und die Kosten pro (Preise, Monatsmaske) gecacht; die Wahl
+    zwischen Monats- und Jahresabo ist ein popcount und ein Vergleich.
+    Die Preise sind der Cache-Key, damit ein langlebiger Calculator nach
+    Preisänderungen keine veralteten Kosten liefert. Der Cache ist ein
+    begrenzter LRU (lru_cache, threadsicher: SA und exakte Suche laufen in
+    Threads).
+    """
+
+    def __init__(self, cache_size: int = settings.COST_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cached_cost = lru_cache(maxsize=cache_size)(self._compute_cost)
+        self._game_months: Dict[int, int] = {}  # Spiel-ID -> Monatsbit
+
+    def __getstate__(self) -> Dict:
+        # Der LRU-Cache ist nicht picklebar (Worker-Prozesse); er startet dort leer
+        state = self.__dict__.copy()
+        del state['_cached_cost']
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._cached_cost = lru_cache(maxsize=self.cache_size)(self._compute_cost)
+
     @staticmethod
     def get_available_subscription_types(package: Dict) -> List[str]:
         """Ermittelt verfügbare Abo-Typen"""
@@ -16,60 +65,75 @@ class PackageCostCalculator:
 
         return available_types
 
+    def month_mask(self, games: List[Game]) -> int:
+        """Monatsmaske einer Spielliste."""
+        mask = 0
+        game_months = self._game_months
+        for game in games:
+            bit = game_months.get(game.id)
+            if bit is None:
+                bit = game_months[game.id] = 1 << month_ordinal(game.starts_at)
+            mask |= bit
+        return mask
+
     def calculate_package_cost(self, package: Dict, package_games: List[Game]) -> Dict:
         """Berechnet optimale Kosten für ein Paket"""
-        available_types = self.get_available_subscription_types(package)
+        return self.cost_for_months(package, self.month_mask(package_games))
 
+    def cost_for_months(self, package: Dict, month_mask: int) -> Dict:
+        """
+        Optimale Kosten eines Pakets für die Monate einer Monatsmaske (gecacht).
+        Das gelieferte Dict wird geteilt und darf nicht verändert werden.
+        """
+        return self._cached_cost(
+            package.get('monthly_price_cents'),
+            package.get('monthly_price_yearly_subscription_in_cents'),
+            month_mask
+        )
+
+    def cache_info(self):
+        """Treffer, Fehlschläge und Größe des Kosten-Caches."""
+        return self._cached_cost.cache_info()
+
+    def _compute_cost(self, monthly_price: Optional[int], yearly_price: Optional[int], month_mask: int) -> Dict:
         # Wenn nur Jahresabo verfügbar
-        if available_types == ["yearly"]:
-            yearly_cost = package['monthly_price_yearly_subscription_in_cents'] * 12
+        if monthly_price is None and yearly_price is not None:
             return {
-                "total_cost": yearly_cost,
+                "total_cost": yearly_price * 12,
                 "subscription_type": "yearly",
                 "active_months": None
             }
 
-        sorted_games = sorted(package_games, key=lambda g: g.starts_at)
-
-        if not sorted_games:
+        if not month_mask:
             return {
                 "total_cost": 0,
                 "subscription_type": None,
                 "active_months": None
             }
 
-        # Berechne aktive Monate
-        active_months = set()
-        for game in sorted_games:
-            game_month = game.starts_at.strftime('%Y-%m')
-            active_months.add(game_month)
-
         # Berechne Kosten für beide Varianten
-        monthly_price = package.get('monthly_price_cents')
-        yearly_price = package.get('monthly_price_yearly_subscription_in_cents')
+        monthly_total = month_mask.bit_count() * monthly_price
 
-        # Wenn nur Monatsabo verfügbar
-        if "yearly" not in available_types:
-            monthly_total = len(active_months) * monthly_price
+        # Monatsabo, wenn nur dieses verfügbar oder günstiger als das Jahresabo
+        if yearly_price is None or monthly_total < yearly_price * 12:
             return {
                 "total_cost": monthly_total,
                 "subscription_type": "monthly",
-                "active_months": active_months
+                "active_months": self._active_months(month_mask)
             }
 
-        # Vergleiche Monats- und Jahresabo
-        monthly_total = len(active_months) * monthly_price
-        yearly_total = yearly_price * 12
+        return {
+            "total_cost": yearly_price * 12,
+            "subscription_type": "yearly",
+            "active_months": None
+        }
 
-        if monthly_total < yearly_total:
-            return {
-                "total_cost": monthly_total,
-                "subscription_type": "monthly",
-                "active_months": active_months
-            }
-        else:
-            return {
-                "total_cost": yearly_total,
-                "subscription_type": "yearly",
-                "active_months": None
-            }
+    @staticmethod
+    def _active_months(month_mask: int) -> set:
+        """Aktive Monate als 'YYYY-MM'-Strings."""
+        active_months = set()
+        while month_mask:
+            low_bit = month_mask & -month_mask
+            active_months.add(month_label(low_bit.bit_length() - 1))
+            month_mask ^= low_bit
+        return active_months
@@ -1,25 +1,36 @@
-from typing import List, Dict
+import asyncio
+import threading
+from typing import AsyncIterator, List, Dict, Optional, Union
 from ..core.database import Database
-from .optimization.greedy import GreedyOptimizer
+from ..core.snapshot import DatasetSnapshot
+from .optimization.coverage import CoverageBuilder, CoverageModel
+from .optimization.dispatcher import OptimizerDispatcher, optimize_in_process
+from .optimization.pruning import PackagePruner
+from .optimization.simulated_annealing.parallel import get_executor
 from .package_cost_calculator import PackageCostCalculator
 from ..models.domain import Game
-from ..services.optimization.simulated_annealing.optimizer import SimulatedAnnealingOptimizer
 from ..utils.profiling import profile_block, ProfilingBlock
 
 
 class PackageService:
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, snapshot: Optional[DatasetSnapshot] = None):
         self.db = db
+        # Sobald geladen, ersetzt der Snapshot die Paket- und Angebots-Queries
+        self.snapshot = snapshot
         self.cost_calculator = PackageCostCalculator()
-        self.optimizer = GreedyOptimizer(self.cost_calculator)  # Später austauschbar
-        self.sa_optimizer = SimulatedAnnealingOptimizer(self.cost_calculator)
+        self.optimizer = OptimizerDispatcher(self.cost_calculator)
+        self.pruner = PackagePruner(self.cost_calculator)
+        self.sa_optimizer = self.optimizer.simulated_annealing
 
     @profile_block("package_service.total")
     async def find_best_combination(
             self,
             games: List[Game],
             max_packages: int = 3,
-            require_live: bool = True
+            require_live: bool = True,
+            latency_budget: Optional[float] = None,
+            pareto: bool = False,
+            seed_solutions: Optional[List[List[int]]] = None
     ) -> Dict:
         """
         Findet die beste Paket-Kombination basierend auf:
@@ -27,15 +38,14 @@ class PackageService:
         - Erkannten Pausen
         - Maximaler Paketanzahl
         - Live-Anforderung
+        Die Strategie (exakt, SA, Greedy) wählt der Dispatcher anhand von
+        Instanzgröße und Latenzbudget (Sekunden, Default: SA-Zeitlimit).
+        Mit pareto=True enthält das Ergebnis zusätzlich alle nicht dominierten
+        Kosten/Abdeckungs-Kombinationen mit 1..max_packages Paketen.
+        seed_solutions (Paket-IDs früherer Lösungen) dienen dem SA als Warmstart.
         """
 
-        # Hole verfügbare Pakete
-        with ProfilingBlock("package_service.get_packages"):
-            packages = await self._get_available_packages()
-
-        # Finde Spiel-Abdeckung pro Paket
-        with ProfilingBlock("package_service.build_coverage"):
-            coverage_map = await self._get_coverage_map(games, packages, require_live)
+        model = await self._build_model(games, require_live)
 
         with ProfilingBlock("package_service.optimize"):
             # Bestimme unique Teams
@@ -44,16 +54,164 @@ class PackageService:
                 unique_teams.add(game.team_home)
                 unique_teams.add(game.team_away)
 
-            result = await self.sa_optimizer.optimize(
-                games=games,
-                packages=packages,
-                coverage_map=coverage_map,
-                max_packages=max_packages
+            result = await self.optimizer.optimize(
+                model=model,
+                max_packages=max_packages,
+                latency_budget=latency_budget,
+                seed_solutions=seed_solutions
             )
+        result['pruning'] = model.pruning
+
+        if pareto:
+            with ProfilingBlock("package_service.pareto_front"):
+                # Front-Suche ist CPU-gebunden und läuft im Thread
+                solutions, exact = await asyncio.to_thread(self.optimizer.pareto.front, model, max_packages)
+                result['pareto_front'] = self.optimizer.pareto.format_front(solutions, model)
+                result['pareto_exact'] = exact
         return result
 
+    async def iter_best_combinations(
+            self,
+            games: List[Game],
+            max_packages: int = 3,
+            require_live: bool = True,
+            time_limit: Optional[float] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Anytime-Variante: liefert sofort die Greedy-Lösung und danach jede
+        strikt bessere Lösung des Simulated Annealing. Das SA läuft in einem
+        Thread und wird abgebrochen, sobald der Konsument aufhört zu lesen.
+        Das SA startet erst, wenn nach der Greedy-Lösung weitergelesen wird.
+        """
+        model = await self._build_model(games, require_live)
+
+        greedy_result = self.optimizer.greedy.optimize(model, max_packages)
+        greedy_result['strategy'] = "greedy"
+        yield greedy_result
+
+        loop = asyncio.get_running_loop()
+        improvements: asyncio.Queue = asyncio.Queue()
+        stop_event = threading.Event()
+
+        def on_improvement(solution: List[int], score: float):
+            loop.call_soon_threadsafe(improvements.put_nowait, solution)
+
+        initial_solution = self.sa_optimizer.initial_solution(model, max_packages)
+        annealing = asyncio.create_task(asyncio.to_thread(
+            self.sa_optimizer.anneal,
+            model,
+            initial_solution,
+            max_packages,
+            self.sa_optimizer.time_limit if time_limit is None else time_limit,
+            on_improvement=on_improvement,
+            stop_event=stop_event
+        ))
+        # Ende-Marker, nachdem alle Verbesserungen in der Queue liegen
+        annealing.add_done_callback(lambda _: improvements.put_nowait(None))
+
+        try:
+            while (solution := await improvements.get()) is not None:
+                result = self.sa_optimizer._format_result(solution, model)
+                result['strategy'] = "simulated_annealing"
+                yield result
+            await annealing
+        finally:
+            # Abbruch oder Disconnect: Kette anhalten und auf den Thread warten,
+            # damit kein SA im Hintergrund weiterläuft
+            stop_event.set()
+            if not annealing.done():
+                try:
+                    await annealing
+                except asyncio.CancelledError:
+                    annealing.cancel()
+                    raise
+                except Exception as e:
+                    print(f"Simulated Annealing nach Abbruch fehlgeschlagen: {str(e)}")
+
+    @profile_block("package_service.batch")
+    async def find_best_combinations_batch(
+            self,
+            queries: List[Dict],
+            latency_budget: Optional[float] = None
+    ) -> List[Union[Dict, Exception]]:
+        """
+        Optimiert viele Anfragen (Dicts mit games, max_packages, require_live) auf einmal.
+
+        Pakete und Angebote werden nur einmal für die Vereinigung aller Spiele
+        geladen und einmal nach Spiel gruppiert (CoverageBuilder). Jede
+        Anfrage bekommt daraus ihr eigenes (gepruntes) Model; optimiert wird
+        parallel im Prozesspool. Ergebnisse in Anfragereihenfolge, Fehler als
+        Exception an der Stelle der Anfrage. Scheitert der gemeinsame Teil
+        (Laden, Gruppieren), wird jede Anfrage einzeln optimiert, damit eine
+        fehlerhafte Anfrage nur ihr eigenes Ergebnis kostet.
+        """
+        try:
+            union_games = {game.id: game for query in queries for game in query['games']}
+            with ProfilingBlock("package_service.get_packages_and_offers"):
+                packages, offers = await asyncio.gather(
+                    self._get_available_packages(),
+                    self._get_offers(list(union_games))
+                )
+
+            # Angebote einmal gruppieren, pro Anfrage nur noch ein Durchlauf über ihre Angebote
+            with ProfilingBlock("package_service.build_coverage"):
+                builder = CoverageBuilder(packages, offers)
+        except Exception as e:
+            print(f"Batch-Vorbereitung fehlgeschlagen, optimiere Anfragen einzeln: {str(e)}")
+            return await asyncio.gather(*(
+                self.find_best_combination(
+                    games=query['games'],
+                    max_packages=query['max_packages'],
+                    require_live=query['require_live'],
+                    latency_budget=latency_budget
+                )
+                for query in queries
+            ), return_exceptions=True)
+
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+
+        async def optimize(query: Dict) -> Dict:
+            games = query['games']
+            coverage_map = builder.coverage_maps(games)[query['require_live']]
+            model = self.pruner.prune(CoverageModel(games, packages, coverage_map))
+
+            result = await loop.run_in_executor(
+                executor,
+                optimize_in_process,
+                model,
+                query['max_packages'],
+                latency_budget
+            )
+            result['pruning'] = model.pruning
+            return result
+
+        with ProfilingBlock("package_service.optimize"):
+            return await asyncio.gather(*(optimize(query) for query in queries), return_exceptions=True)
+
+    async def _build_model(self, games: List[Game], require_live: bool) -> CoverageModel:
+        """Lädt Pakete und Angebote und baut das CoverageModel (ohne leere und dominierte Pakete)."""
+        # Pakete und Angebote sind unabhängig voneinander: parallel laden
+        with ProfilingBlock("package_service.get_packages_and_offers"):
+            packages, offers = await asyncio.gather(
+                self._get_available_packages(),
+                self._get_offers([game.id for game in games])
+            )
+
+        # Finde Spiel-Abdeckung pro Paket
+        with ProfilingBlock("package_service.build_coverage"):
+            coverage_map = CoverageBuilder(packages, offers).coverage_maps(games)[require_live]
+
+        with ProfilingBlock("package_service.build_model"):
+            model = CoverageModel(games, packages, coverage_map)
+
+        with ProfilingBlock("package_service.prune_packages"):
+            return self.pruner.prune(model)
+
     async def _get_available_packages(self) -> List[Dict]:
         """Holt alle verfügbaren Streaming-Pakete."""
+        if self.snapshot and self.snapshot.ready:
+            return self.snapshot.packages()
 
         query = """
         SELECT 
@@ -66,55 +224,21 @@ class PackageService:
 
         return await self.db.execute(query)
 
-    async def _get_coverage_map(
-            self,
-            games: List[Game],
-            packages: List[Dict],
-            require_live: bool
-    ) -> Dict:
-        """
-        Erstellt eine Map welches Paket welche Spiele abdeckt.
-        Berücksichtigt Live/Highlight Anforderungen.
-        """
-        coverage_map = {}
+    async def _get_offers(self, game_ids: List[int]) -> List[Dict]:
+        """Holt alle Streaming-Angebote für die Spiele."""
+        if not game_ids:
+            return []
+        if self.snapshot and self.snapshot.ready:
+            return self.snapshot.offers_for_games(game_ids)
 
-        # Hole alle Streaming-Angebote für die Spiele
-        game_ids = [game.id for game in games]
-        game_ids_str = ','.join(str(game_id) for game_id in game_ids)
-
-        query = f"""
+        query = """
         SELECT 
             game_id,
             streaming_package_id,
             live,
             highlights
         FROM streaming_offer
-        WHERE game_id IN({game_ids_str})
+        WHERE game_id = ANY(:game_ids)
         """
 
-        offers = await self.db.execute(query, {"game_ids": game_ids})
-
-        # Baue Coverage Map
-        for package in packages:
-            package_id = package['id']
-            coverage_map[package_id] = {
-                'games': [],
-                'weighted_sum': 0
-            }
-
-            for game in games:
-                game_offers = [
-                    o for o in offers
-                    if o['game_id'] == game.id and o['streaming_package_id'] == package_id
-                ]
-
-                for offer in game_offers:
-                    # Prüfe, ob Angebot den Anforderungen entspricht
-                    if require_live and not offer['live']:
-                        continue
-
-                    coverage_map[package_id]['games'].append(game)
-                    coverage_map[package_id]['weighted_sum'] += game.total_weight
-                    break  # Ein passendes Angebot reicht
-
-        return coverage_map
+        return await self.db.execute(query, {"game_ids": game_ids})
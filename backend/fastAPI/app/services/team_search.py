@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from ..core.database import Database
+from ..core.snapshot import DatasetSnapshot
+from ..utils.constants import POPULAR_TEAMS
+
+# Umschreibungen, die nach dem Entfernen der Akzente gleich aussehen sollen ("Muenchen" = "München")
+_FOLDS = (("ß", "ss"), ("ae", "a"), ("oe", "o"), ("ue", "u"))
+
+
+def fold(text: str) -> str:
+    """Suchform: klein, ohne Akzente/Umlaute, Umschreibungen vereinheitlicht, einfache Leerzeichen."""
+    text = text.casefold()
+    text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    for old, new in _FOLDS:
+        text = text.replace(old, new)
+    return " ".join(text.split())
+
+
+def trigrams(folded: str) -> set:
+    """Trigramme pro Wort (wie pg_trgm mit zwei Leerzeichen davor, einem dahinter)."""
+    grams = set()
+    for word in folded.split(" "):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TeamSearchIndex:
+    """
+    Type-Ahead-Suche über alle Teamnamen, komplett im Speicher.
+
+    Präfix-Treffer: sortierte Liste von (Suchform ab Wortanfang, Team), ein
+    bisect liefert alle Namen, bei denen ein Wort mit der Eingabe beginnt
+    ("dort" findet "Borussia Dortmund"). Reichen die nicht, ergänzen
+    Trigramm-Treffer Tippfehler. Durch die Suchform finden "Munchen" und
+    "Muenchen" "Bayern München". Sortiert wird nach Beliebtheit: erst
+    POPULAR_TEAMS, dann Anzahl Spiele.
+
+    Neu aufgebaut wird, wenn der Dataset-Snapshot gewechselt hat bzw. ohne
+    Snapshot nach refresh_interval Sekunden.
+    """
+
+    MIN_SIMILARITY = 0.45  # Anteil der Trigramme der Eingabe, die im Namen vorkommen
+    MIN_FUZZY_LENGTH = 4   # kürzere Eingaben passen fuzzy auf zu viele Namen
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._keys: List[Tuple[str, int]] = []  # (Suchform ab Wortanfang, Team-Index), sortiert
+        self._teams: List[str] = []
+        self._popularity: List[Tuple[int, int]] = []  # Sortierschlüssel pro Team, größer = beliebter
+        self._trigrams: Dict[str, List[int]] = {}
+        self._source = None  # Snapshot-Datei, aus der gebaut wurde (None = DB)
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._built_at > 0
+
+    def build(self, game_counts: Dict[str, int], source=None):
+        """Baut den Index aus Team -> Anzahl Spiele und ersetzt ihn in einem Schritt."""
+        popular = {team: len(POPULAR_TEAMS) - rank for rank, team in enumerate(POPULAR_TEAMS)}
+        teams = sorted(game_counts)
+        keys = []
+        postings: Dict[str, List[int]] = {}
+        for index, team in enumerate(teams):
+            folded = fold(team)
+            words = folded.split(" ")
+            for position in range(len(words)):
+                keys.append((" ".join(words[position:]), index))
+            for gram in trigrams(folded):
+                postings.setdefault(gram, []).append(index)
+        keys.sort()
+
+        self._keys = keys
+        self._teams = teams
+        self._popularity = [(popular.get(team, 0), game_counts[team]) for team in teams]
+        self._trigrams = postings
+        self._source = source
+        self._built_at = time.time()
+
+    def stale(self, snapshot: Optional[DatasetSnapshot]) -> bool:
+        if snapshot and snapshot.ready:
+            return self._source != snapshot.data.identity
+        return not self.ready or self._source is not None or time.time() - self._built_at > self.refresh_interval
+
+    async def refresh(self, db: Database, snapshot: Optional[DatasetSnapshot] = None):
+        """Baut den Index neu, falls veraltet: aus dem Snapshot, sonst mit einer DB-Abfrage."""
+        if not self.stale(snapshot):
+            return
+        if snapshot and snapshot.ready:
+            self.build(snapshot.team_game_counts(), source=snapshot.data.identity)
+            return
+
+        async with self._lock:
+            if not self.stale(snapshot):
+                return
+            result = await db.execute("""
+            SELECT team, COUNT(*) AS games
+            FROM (
+                SELECT team_home AS team FROM game
+                UNION ALL
+                SELECT team_away AS team FROM game
+            ) teams
+            GROUP BY team
+            """)
+            self.build({row["team"]: row["games"] for row in result})
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Bis zu limit Teams: Präfix-Treffer nach Beliebtheit, danach Fuzzy-Treffer nach Ähnlichkeit."""
+        folded = fold(query)
+        if not folded:
+            return []
+        keys, popularity = self._keys, self._popularity
+
+        matches = set()
+        position = bisect_left(keys, (folded,))
+        while position < len(keys) and keys[position][0].startswith(folded):
+            matches.add(keys[position][1])
+            position += 1
+        ranked = heapq.nlargest(limit, matches, key=lambda index: popularity[index])
+
+        if len(ranked) < limit and len(folded) >= self.MIN_FUZZY_LENGTH:
+            ranked += self._fuzzy(folded, limit - len(ranked), exclude=matches)
+        return [self._teams[index] for index in ranked]
+
+    def _fuzzy(self, folded: str, limit: int, exclude: set) -> List[int]:
+        grams = trigrams(folded)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+
+        candidates = []
+        for index, count in shared.items():
+            if index in exclude:
+                continue
+            similarity = count / len(grams)
+            if similarity >= self.MIN_SIMILARITY:
+                candidates.append(((similarity, self._popularity[index]), index))
+        return [index for _, index in heapq.nlargest(limit, candidates)]
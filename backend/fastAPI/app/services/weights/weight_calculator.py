@@ -54,15 +54,10 @@ class WeightCalculator:
         """
         Berechnet den Wichtigkeits-Multiplikator nur basierend auf Tabellenposition.
         """
-        # Hole Tabellenpositionen
-        home_pos, total_teams = await self.api_service.get_table_positions(
+        # Hole Tabellenpositionen (beide aus derselben Saison-Map)
+        (home_pos, total_teams), (away_pos, _) = await self.api_service.get_table_positions_many(
             tournament=game.tournament,
-            team=game.team_home,
-            game_date=game.starts_at
-        )
-        away_pos, _ = await self.api_service.get_table_positions(
-            tournament=game.tournament,
-            team=game.team_away,
+            teams=[game.team_home, game.team_away],
             game_date=game.starts_at
         )
 
@@ -26,3 +26,56 @@ def format_package_for_response(package):
         "subscriptionType": package["subscription_type"],
         "gamesCovered": [format_game_for_response(g) for g in package["covered_games"]]
     }
+
+
+def format_result_for_response(result, unstreamable_games):
+    """Formatiert ein Optimierungsergebnis für den data-Teil der API Response."""
+    return {
+        "selected_packages": [
+            format_package_for_response(pkg)
+            for pkg in result["selected_packages"]
+        ],
+        "total_cost": result["total_cost"] / 100,  # Convert cents to euros
+        "coverage_ratio": f"{result['coverage_ratio'] * 100:.1f}%",
+        "weighted_coverage": f"{result['weighted_coverage'] * 100:.1f}%",
+        "uncovered_games": [
+            format_game_for_response(g)
+            for g in result["uncovered_games"]
+        ],
+        "unstreamable_games": [
+            format_game_for_response(g)
+            for g in unstreamable_games
+        ]
+    }
+
+
+def format_pareto_front_for_response(front):
+    """Formatiert die Pareto-Front (aufsteigend nach Kosten) für die API Response."""
+    return [
+        {
+            "package_count": point["package_count"],
+            "selected_packages": [
+                format_package_for_response(pkg)
+                for pkg in point["selected_packages"]
+            ],
+            "total_cost": point["total_cost"] / 100,
+            "coverage_ratio": f"{point['coverage_ratio'] * 100:.1f}%",
+            "weighted_coverage": f"{point['weighted_coverage'] * 100:.1f}%",
+            "uncovered_games_count": len(point["uncovered_games"])
+        }
+        for point in front
+    ]
+
+
+def format_warm_start_for_response(seed, warm_start):
+    """Formatiert Herkunft und Wirkung eines Warmstarts (None ohne Seed)."""
+    if not seed:
+        return None
+    return {
+        "seedTeams": seed["query"]["teams"],
+        "seedStartDate": seed["query"]["start_date"],
+        "used": warm_start is not None,
+        "seedScore": warm_start["seed_score"] if warm_start else None,
+        "score": warm_start["score"] if warm_start else None,
+        "improvement": warm_start["improvement"] if warm_start else None
+    }
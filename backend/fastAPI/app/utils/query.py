@@ -0,0 +1,40 @@
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_query(
+        teams: List[str],
+        start_date: datetime,
+        max_combinations: int,
+        live_only: bool
+) -> Dict:
+    """Kanonische Form einer Kombinations-Anfrage (Teams sortiert, Datum auf den Tag)."""
+    return {
+        "teams": sorted(set(teams)),
+        "start_date": start_date.date().isoformat(),
+        "max_combinations": max_combinations,
+        "live_only": bool(live_only)
+    }
+
+
+def query_hash(normalized_query: Dict) -> str:
+    """Stabiler Hash einer normalisierten Anfrage, z.B. für Cache- oder Job-Keys."""
+    encoded = json.dumps(normalized_query, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def query_distance(query: Dict, other: Dict) -> Optional[Tuple[int, int]]:
+    """
+    Abstand zweier normalisierter Anfragen als (Team-Unterschiede, Tage).
+    None, wenn sie nicht vergleichbar sind (andere Paketanzahl/Live-Einstellung
+    oder kein gemeinsames Team).
+    """
+    if (query["max_combinations"], query["live_only"]) != (other["max_combinations"], other["live_only"]):
+        return None
+    teams, other_teams = set(query["teams"]), set(other["teams"])
+    if not teams & other_teams:
+        return None
+    days = abs((date.fromisoformat(query["start_date"]) - date.fromisoformat(other["start_date"])).days)
+    return len(teams ^ other_teams), days
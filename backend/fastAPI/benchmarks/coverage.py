@@ -0,0 +1,117 @@
+"""
+Micro-Benchmark: Coverage-Map-Aufbau alt (Pakete x Spiele x Angebote) gegen
+CoverageBuilder (Angebote einmal nach Spiel gruppiert, Live- und Gesamt-
+Abdeckung in einem Durchlauf).
+
+Aufruf aus backend/fastAPI:
+
+    python -m benchmarks.coverage                  # Golden-Instanzen
+    python -m benchmarks.coverage --teams 1 4 8 16 # zusätzlich Instanzen mit so vielen Teams
+
+Pro Instanz: Laufzeit beider Varianten für beide Live-Einstellungen und der
+Speedup. Die Ergebnisse werden auf Gleichheit geprüft.
+"""
+import argparse
+import time
+from typing import Dict, List
+from app.models.domain import Game
+from app.services.optimization.coverage import CoverageBuilder
+from .generator import Instance, generate_instance
+from .run import load_golden
+
+
+def legacy_coverage_map(games: List[Game], packages: List[Dict], offers: List[Dict], require_live: bool) -> Dict:
+    """Bisheriger Aufbau aus PackageService (Referenz für Ergebnis und Laufzeit)."""
+    coverage_map = {}
+    for package in packages:
+        package_id = package['id']
+        coverage_map[package_id] = {
+            'games': [],
+            'weighted_sum': 0
+        }
+
+        for game in games:
+            game_offers = [
+                o for o in offers
+                if o['game_id'] == game.id and o['streaming_package_id'] == package_id
+            ]
+
+            for offer in game_offers:
+                if require_live and not offer['live']:
+                    continue
+
+                coverage_map[package_id]['games'].append(game)
+                coverage_map[package_id]['weighted_sum'] += game.total_weight
+                break
+
+    return coverage_map
+
+
+def _query_offers(instance: Instance) -> List[Dict]:
+    """Angebote für die Spiele der Anfrage, wie sie _get_offers liefert."""
+    game_ids = {game.id for game in instance.games}
+    return [offer for offer in instance.offers if offer['game_id'] in game_ids]
+
+
+def _same(left: Dict, right: Dict) -> bool:
+    return left.keys() == right.keys() and all(
+        [game.id for game in left[package_id]['games']] == [game.id for game in right[package_id]['games']]
+        and abs(left[package_id]['weighted_sum'] - right[package_id]['weighted_sum']) < 1e-9
+        for package_id in left
+    )
+
+
+def bench_instance(instance: Instance, repeat: int) -> Dict:
+    offers = _query_offers(instance)
+
+    started = time.perf_counter()
+    legacy = {
+        require_live: legacy_coverage_map(instance.games, instance.packages, offers, require_live)
+        for require_live in (True, False)
+    }
+    legacy_wall = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        current = CoverageBuilder(instance.packages, offers).coverage_maps(instance.games)
+    current_wall = (time.perf_counter() - started) / repeat
+
+    if not all(_same(legacy[require_live], current[require_live]) for require_live in (True, False)):
+        raise RuntimeError(f"CoverageBuilder weicht bei {instance.name} von der Referenz ab")
+
+    return {
+        "instance": instance.name,
+        "games": len(instance.games),
+        "packages": len(instance.packages),
+        "offers": len(offers),
+        "legacy_s": legacy_wall,
+        "builder_s": current_wall,
+        "speedup": legacy_wall / current_wall if current_wall else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coverage-Map-Benchmark")
+    parser.add_argument("--teams", type=int, nargs="*", default=[], help="Zusätzliche Instanzen mit so vielen Teams")
+    parser.add_argument("--seed", type=int, default=0, help="Seed der zusätzlichen Instanzen")
+    parser.add_argument("--repeat", type=int, default=20, help="Läufe des CoverageBuilder pro Instanz")
+    args = parser.parse_args()
+
+    instances = load_golden() + [
+        generate_instance(seed=args.seed, team_count=team_count, name=f"seed{args.seed}-teams{team_count}")
+        for team_count in args.teams
+    ]
+
+    header = f"{'instance':<22} {'games':>5} {'pkgs':>4} {'offers':>6} {'legacy_s':>9} {'builder_s':>9} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for instance in instances:
+        row = bench_instance(instance, args.repeat)
+        print(
+            f"{row['instance']:<22} {row['games']:>5} {row['packages']:>4} {row['offers']:>6} "
+            f"{row['legacy_s']:>9.4f} {row['builder_s']:>9.5f} {row['speedup']:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
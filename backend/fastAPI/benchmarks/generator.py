@@ -0,0 +1,231 @@
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.models.domain import Game
+from app.utils.weights import TOURNAMENT_WEIGHTS
+
+# Ligen mit ihren Teams; Pokale und Europapokal werden aus diesen Teams gelost
+LEAGUES = {
+    "Bundesliga": [
+        "Bayern München", "Borussia Dortmund", "RB Leipzig", "Bayer Leverkusen",
+        "VfB Stuttgart", "Eintracht Frankfurt", "SC Freiburg", "VfL Wolfsburg",
+        "Borussia Mönchengladbach", "1. FC Union Berlin", "Werder Bremen", "TSG Hoffenheim",
+        "1. FSV Mainz 05", "FC Augsburg", "1. FC Heidenheim", "VfL Bochum",
+        "FC St. Pauli", "Holstein Kiel"
+    ],
+    "Premier League": [
+        "Manchester City", "Arsenal", "Liverpool", "Chelsea", "Manchester United",
+        "Tottenham Hotspur", "Newcastle United", "Aston Villa", "Brighton", "West Ham United"
+    ],
+    "LaLiga": [
+        "Real Madrid", "Barcelona", "Atlético Madrid", "Girona", "Athletic Club",
+        "Real Sociedad", "Real Betis", "Villarreal", "Valencia", "Sevilla"
+    ],
+}
+CUPS = {
+    # Turnier: (Liga der Teilnehmer, Anzahl Runden, Monate der Runden)
+    "DFB Pokal": ("Bundesliga", 6, [8, 10, 12, 2, 4, 5]),
+    "FA Cup": ("Premier League", 5, [1, 2, 3, 4, 5]),
+    "Copa del Rey": ("LaLiga", 5, [10, 12, 1, 2, 4]),
+}
+EUROPEAN = ["UEFA Champions League", "UEFA Europa League"]
+
+SEASON_START = datetime(2024, 8, 23, 18, 30)
+SEASON_SUFFIX = " 24/25"
+
+
+@dataclass
+class Instance:
+    """Eine Benchmark-Instanz: Spiele einer Anfrage plus alle Pakete und Angebote."""
+    name: str
+    seed: int
+    teams: List[str]
+    games: List[Game]
+    packages: List[Dict]
+    offers: List[Dict]
+    max_packages: int = 3
+    require_live: bool = True
+    best_known_score: Optional[float] = None
+    meta: Dict = field(default_factory=dict)
+
+
+class InstanceDatabase:
+    """Beantwortet die Paket- und Angebots-Queries des PackageService aus einer Instanz."""
+
+    def __init__(self, instance: Instance):
+        self.instance = instance
+
+    async def execute(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        if "FROM streaming_package" in query:
+            return [dict(package) for package in self.instance.packages]
+        if "FROM streaming_offer" in query:
+            game_ids = set(params["game_ids"])
+            return [offer for offer in self.instance.offers if offer["game_id"] in game_ids]
+        raise ValueError(f"Unbekannte Benchmark-Query: {query}")
+
+
+def _weight(tournament: str) -> float:
+    return TOURNAMENT_WEIGHTS.get(tournament, 0.4)
+
+
+def _round_robin(rnd: random.Random, teams: List[str], rounds: int) -> List[List[tuple]]:
+    """Spieltage mit zufälligen Paarungen (jedes Team spielt einmal pro Spieltag)."""
+    matchdays = []
+    for _ in range(rounds):
+        shuffled = teams[:]
+        rnd.shuffle(shuffled)
+        matchdays.append([(shuffled[i], shuffled[i + 1]) for i in range(0, len(shuffled) - 1, 2)])
+    return matchdays
+
+
+def generate_season(seed: int) -> List[Game]:
+    """Alle Spiele einer Saison: Ligen, nationale Pokale, Europapokal."""
+    rnd = random.Random(seed)
+    games = []
+
+    def add_game(home: str, away: str, tournament: str, starts_at: datetime):
+        games.append(Game(
+            id=len(games) + 1,
+            team_home=home,
+            team_away=away,
+            tournament=tournament + SEASON_SUFFIX,
+            starts_at=starts_at,
+            base_weight=_weight(tournament),
+            phase_multiplier=1.0,
+            importance_multiplier=1.0
+        ))
+
+    # Ligen: ein Spieltag pro Woche, Winterpause im Januar (Bundesliga-typisch)
+    for league, teams in LEAGUES.items():
+        rounds = 2 * (len(teams) - 1)
+        for matchday, pairings in enumerate(_round_robin(rnd, teams, rounds)):
+            week = matchday + (3 if matchday >= rounds // 2 else 0)
+            for home, away in pairings:
+                offset = timedelta(days=7 * week + rnd.choice([0, 1, 2]), hours=rnd.choice([-3, 0, 2]))
+                add_game(home, away, league, SEASON_START + offset)
+
+    # Pokale: pro Runde halbiert sich das Feld
+    for cup, (league, rounds, months) in CUPS.items():
+        field_teams = LEAGUES[league][:]
+        rnd.shuffle(field_teams)
+        for round_index in range(rounds):
+            if len(field_teams) < 2:
+                break
+            month = months[round_index]
+            year = SEASON_START.year if month >= 8 else SEASON_START.year + 1
+            winners = []
+            for i in range(0, len(field_teams) - 1, 2):
+                add_game(field_teams[i], field_teams[i + 1], cup, datetime(year, month, rnd.randint(1, 28), 20, 45))
+                winners.append(field_teams[rnd.choice([i, i + 1])])
+            field_teams = winners
+
+    # Europapokal: Top-Teams jeder Liga, Ligaphase September bis Januar, danach K.O.
+    top_teams = [team for teams in LEAGUES.values() for team in teams[:4]]
+    rnd.shuffle(top_teams)
+    for competition, participants in zip(EUROPEAN, (top_teams[:8], top_teams[8:])):
+        for matchday, pairings in enumerate(_round_robin(rnd, participants, 8)):
+            month_offset = 1 + matchday * 4 // 8
+            year = SEASON_START.year + (SEASON_START.month + month_offset - 1) // 12
+            month = (SEASON_START.month + month_offset - 1) % 12 + 1
+            for home, away in pairings:
+                add_game(home, away, competition, datetime(year, month, rnd.randint(1, 28), 21, 0))
+        knockout = participants[:]
+        for month in (2, 3, 4, 5):
+            if len(knockout) < 2:
+                break
+            rnd.shuffle(knockout)
+            knockout = knockout[:len(knockout) // 2 * 2]
+            for i in range(0, len(knockout), 2):
+                add_game(knockout[i], knockout[i + 1], competition, datetime(SEASON_START.year + 1, month, rnd.randint(1, 28), 21, 0))
+            knockout = knockout[::2]
+
+    games.sort(key=lambda game: (game.starts_at, game.id))
+    return games
+
+
+def generate_packages(seed: int, tournaments: List[str], count: int = 40) -> List[Dict]:
+    """
+    Streaming-Pakete mit Turnier-Schwerpunkten und Monats-/Jahrespreisen.
+    Ein Teil sind Preisstufen desselben Angebots (gleiche Turniere, anderer Preis).
+    """
+    rnd = random.Random(seed)
+    packages = []
+    for package_id in range(1, count + 1):
+        if packages and rnd.random() < 0.2:
+            # Preisstufe eines bestehenden Pakets
+            base = rnd.choice(packages)
+            focus = base["_tournaments"]
+        else:
+            focus = rnd.sample(tournaments, rnd.choice([1, 1, 2, 3]))
+
+        monthly = rnd.choice([None, rnd.randrange(499, 5999, 100)])
+        if monthly is None:
+            yearly = rnd.randrange(599, 3999, 100)
+        else:
+            yearly = rnd.choice([None, int(monthly * rnd.uniform(0.6, 0.9))])
+
+        packages.append({
+            "id": package_id,
+            "name": f"Paket {package_id:02d}",
+            "monthly_price_cents": monthly,
+            "monthly_price_yearly_subscription_in_cents": yearly,
+            "_tournaments": focus,
+            "_coverage": rnd.choice([0.5, 0.8, 1.0]),
+            "_live": rnd.choice([0.3, 0.7, 1.0]),
+        })
+    return packages
+
+
+def generate_offers(seed: int, games: List[Game], packages: List[Dict]) -> List[Dict]:
+    """Angebote pro (Spiel, Paket) nach Turnier-Schwerpunkt, Abdeckungs- und Live-Quote."""
+    rnd = random.Random(seed)
+    offers = []
+    for game in games:
+        for package in packages:
+            if game.tournament not in package["_tournaments"] or rnd.random() >= package["_coverage"]:
+                continue
+            live = rnd.random() < package["_live"]
+            offers.append({
+                "game_id": game.id,
+                "streaming_package_id": package["id"],
+                "live": live,
+                "highlights": not live or rnd.random() < 0.5
+            })
+    return offers
+
+
+def generate_instance(
+        seed: int,
+        team_count: int = 3,
+        package_count: int = 40,
+        max_packages: int = 3,
+        require_live: bool = True,
+        name: Optional[str] = None
+) -> Instance:
+    """Reproduzierbare Instanz: Saison, Pakete und Angebote aus einem Seed, Anfrage für team_count Teams."""
+    games = generate_season(seed)
+    tournaments = sorted({game.tournament for game in games})
+    packages = generate_packages(seed + 1, tournaments, package_count)
+    offers = generate_offers(seed + 2, games, packages)
+
+    rnd = random.Random(seed + 3)
+    all_teams = [team for teams in LEAGUES.values() for team in teams]
+    teams = rnd.sample(all_teams, team_count)
+    query_games = [game for game in games if game.team_home in teams or game.team_away in teams]
+
+    # Interne Generator-Felder gehören nicht zum DB-Schema
+    db_packages = [
+        {key: value for key, value in package.items() if not key.startswith("_")}
+        for package in packages
+    ]
+    return Instance(
+        name=name or f"seed{seed}-teams{team_count}",
+        seed=seed,
+        teams=teams,
+        games=query_games,
+        packages=db_packages,
+        offers=offers,
+        max_packages=max_packages,
+        require_live=require_live
+    )
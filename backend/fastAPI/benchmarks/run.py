@@ -0,0 +1,219 @@
+"""
+Benchmark für Greedy, Simulated Annealing und PackageCostCalculator.
+
+Aufruf aus backend/fastAPI:
+
+    python -m benchmarks.run                    # Golden-Instanzen
+    python -m benchmarks.run --random 5         # zusätzlich 5 zufällige Instanzen
+    python -m benchmarks.run --update-golden    # best-known Scores fortschreiben
+
+Pro Instanz und Strategie: Laufzeit, Iterationen pro Sekunde (SA: Annealing-
+Iterationen, Greedy: komplette Läufe), Score und Abstand zum best-known Score.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.services.optimization.coverage import CoverageModel
+from app.services.optimization.exact import ExactOptimizer
+from app.services.optimization.dispatcher import OptimizerDispatcher
+from app.services.optimization.greedy import GreedyOptimizer
+from app.services.optimization.simulated_annealing.evaluator import SolutionEvaluator
+from app.services.optimization.simulated_annealing.optimizer import SimulatedAnnealingOptimizer
+from app.services.package_cost_calculator import PackageCostCalculator
+from app.services.package_service import PackageService
+from .generator import Instance, InstanceDatabase, generate_instance
+
+GOLDEN_PATH = Path(__file__).with_name("golden.json")
+
+# Exakte Suche nur, wenn ihre Worst-Case-Schätzung darunter liegt (Sekunden)
+EXACT_ESTIMATE_LIMIT = 30.0
+
+
+def load_golden() -> List[Instance]:
+    """Golden-Instanzen aus golden.json; prüft, dass der Generator sie unverändert erzeugt."""
+    instances = []
+    for entry in json.loads(GOLDEN_PATH.read_text()):
+        instance = generate_instance(
+            seed=entry["seed"],
+            team_count=entry["team_count"],
+            max_packages=entry["max_packages"],
+            require_live=entry["require_live"],
+            name=entry["name"]
+        )
+        if (len(instance.games), len(instance.offers)) != (entry["games"], entry["offers"]):
+            raise RuntimeError(
+                f"Golden-Instanz {entry['name']} weicht ab: Generator geändert? "
+                f"({len(instance.games)} Spiele/{len(instance.offers)} Angebote statt "
+                f"{entry['games']}/{entry['offers']})"
+            )
+        instance.best_known_score = entry["best_known_score"]
+        instance.meta = entry
+        instances.append(instance)
+    return instances
+
+
+def save_golden(instances: List[Instance]):
+    entries = []
+    for instance in instances:
+        entry = dict(instance.meta)
+        entry.update({
+            "games": len(instance.games),
+            "offers": len(instance.offers),
+            "best_known_score": instance.best_known_score
+        })
+        entries.append(entry)
+    GOLDEN_PATH.write_text(json.dumps(entries, indent=2, ensure_ascii=False) + "\n")
+
+
+async def build_model(instance: Instance) -> CoverageModel:
+    """Model über denselben Weg wie im Service (Coverage-Map, Pruning)."""
+    service = PackageService(InstanceDatabase(instance))
+    return await service._build_model(instance.games, instance.require_live)
+
+
+def _score(model: CoverageModel, result: Dict) -> float:
+    solution = [model.package_index[item["package"]["id"]] for item in result["selected_packages"]]
+    return SolutionEvaluator(PackageCostCalculator()).evaluate(solution, model)
+
+
+def bench_greedy(model: CoverageModel, max_packages: int, repeat: int) -> Dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        # Neuer Calculator pro Lauf, damit der Kosten-Cache nicht mitgemessen wird
+        result = GreedyOptimizer(PackageCostCalculator()).optimize(model, max_packages)
+    wall = (time.perf_counter() - started) / repeat
+    return {"wall": wall, "iterations_per_second": 1 / wall if wall else None, "score": _score(model, result)}
+
+
+def bench_simulated_annealing(model: CoverageModel, max_packages: int, time_limit: float, seed: int) -> Dict:
+    random.seed(seed)
+    optimizer = SimulatedAnnealingOptimizer(PackageCostCalculator(), time_limit=time_limit)
+    started = time.perf_counter()
+    result = asyncio.run(optimizer.optimize(model, max_packages))
+    wall = time.perf_counter() - started
+    iterations = result["annealing"]["iterations"]
+    return {"wall": wall, "iterations_per_second": iterations / wall, "score": _score(model, result)}
+
+
+def bench_exact(model: CoverageModel, max_packages: int) -> Optional[Dict]:
+    """Exakte Lösung, sofern die Suche überschaubar ist (liefert den best-known Score)."""
+    calculator = PackageCostCalculator()
+    if OptimizerDispatcher(calculator).estimate_exact_seconds(model, max_packages) > EXACT_ESTIMATE_LIMIT:
+        return None
+    started = time.perf_counter()
+    result = asyncio.run(ExactOptimizer(calculator).optimize(model, max_packages))
+    wall = time.perf_counter() - started
+    return {"wall": wall, "iterations_per_second": None, "score": _score(model, result)}
+
+
+def bench_cost_calculator(instance: Instance, samples: int, seed: int) -> Dict:
+    """Aufrufe pro Sekunde für zufällige (Paket, Spielmenge)-Paare, mit kaltem und warmem Cache."""
+    rnd = random.Random(seed)
+    calls = [
+        (rnd.choice(instance.packages), rnd.sample(instance.games, rnd.randrange(min(len(instance.games), 40) + 1)))
+        for _ in range(samples)
+    ]
+    calculator = PackageCostCalculator()
+    timings = {}
+    for phase in ("cold", "warm"):
+        started = time.perf_counter()
+        for package, games in calls:
+            calculator.calculate_package_cost(package, games)
+        timings[phase] = samples / (time.perf_counter() - started)
+    return timings
+
+
+def run_instance(instance: Instance, args) -> List[Dict]:
+    model = asyncio.run(build_model(instance))
+    rows = [
+        {"strategy": "greedy", **bench_greedy(model, instance.max_packages, args.greedy_repeat)},
+        {"strategy": "simulated_annealing", **bench_simulated_annealing(model, instance.max_packages, args.sa_time, args.seed)},
+    ]
+    if not args.skip_exact:
+        exact = bench_exact(model, instance.max_packages)
+        if exact:
+            rows.append({"strategy": "exact", **exact})
+
+    best_found = max(row["score"] for row in rows)
+    if instance.best_known_score is None or best_found > instance.best_known_score + 1e-9:
+        instance.best_known_score = best_found
+    for row in rows:
+        row["gap"] = instance.best_known_score - row["score"]
+
+    calculator = bench_cost_calculator(instance, args.cost_samples, args.seed)
+    rows.append({
+        "strategy": "cost_calculator",
+        "wall": None,
+        "iterations_per_second": calculator["warm"],
+        "cold_calls_per_second": calculator["cold"],
+        "score": None,
+        "gap": None
+    })
+    for row in rows:
+        row.update({
+            "instance": instance.name,
+            "games": len(instance.games),
+            "candidates": len(model.packages),
+            "max_packages": instance.max_packages
+        })
+    return rows
+
+
+def _fmt(value, digits: int) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_rows(rows: List[Dict]):
+    header = f"{'instance':<22} {'games':>5} {'pkgs':>4} {'strategy':<20} {'wall_s':>8} {'it/s':>11} {'score':>9} {'gap':>7}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['instance']:<22} {row['games']:>5} {row['candidates']:>4} {row['strategy']:<20} "
+            f"{_fmt(row['wall'], 3):>8} {_fmt(row['iterations_per_second'], 0):>11} "
+            f"{_fmt(row['score'], 3):>9} {_fmt(row['gap'], 3):>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimizer-Benchmark")
+    parser.add_argument("--random", type=int, default=0, help="Zusätzliche zufällige Instanzen")
+    parser.add_argument("--seed", type=int, default=0, help="Seed für Zufallsinstanzen und SA")
+    parser.add_argument("--sa-time", type=float, default=2.0, help="Zeitlimit des SA in Sekunden")
+    parser.add_argument("--greedy-repeat", type=int, default=5, help="Greedy-Läufe pro Instanz")
+    parser.add_argument("--cost-samples", type=int, default=5000, help="Aufrufe im Calculator-Benchmark")
+    parser.add_argument("--skip-exact", action="store_true", help="Keine exakte Referenzlösung berechnen")
+    parser.add_argument("--no-golden", action="store_true", help="Golden-Instanzen überspringen")
+    parser.add_argument("--update-golden", action="store_true", help="Bessere Scores in golden.json schreiben")
+    parser.add_argument("--json", type=Path, help="Ergebnisse zusätzlich als JSON schreiben")
+    args = parser.parse_args()
+
+    golden = [] if args.no_golden else load_golden()
+    rnd = random.Random(args.seed)
+    instances = golden + [
+        generate_instance(
+            seed=rnd.randrange(1_000_000),
+            team_count=rnd.randint(1, 8),
+            max_packages=rnd.randint(2, 5),
+            require_live=rnd.random() < 0.8
+        )
+        for _ in range(args.random)
+    ]
+
+    rows = []
+    for instance in instances:
+        rows.extend(run_instance(instance, args))
+    print_rows(rows)
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    if args.update_golden and golden:
+        save_golden(golden)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from benchmarks.generator import generate_instance
+from benchmarks.run import build_model
+from app.services.optimization.coverage import CoverageBuilder, CoverageModel
+
+BRUTE_FORCE_SEEDS = range(40)
+
+
+def unpruned_model(instance, require_live: bool = True) -> CoverageModel:
+    """Model aller Pakete der Instanz, ohne Pruning (auch leere und dominierte Pakete)."""
+    coverage_map = CoverageBuilder(instance.packages, instance.offers).coverage_maps(instance.games)[require_live]
+    return CoverageModel(instance.games, instance.packages, coverage_map)
+
+
+@pytest.fixture
+def instance():
+    """Anfrage für 3 Teams mit bis zu 4 Paketen (Service-, Job- und SA-Tests)."""
+    return generate_instance(seed=7, team_count=3, max_packages=4, require_live=True, name="fixture")
+
+
+@pytest.fixture
+def model(instance):
+    """Model der Instanz über denselben Weg wie im Service (Coverage-Map, Pruning)."""
+    return asyncio.run(build_model(instance))
+
+
+@pytest.fixture(scope="session")
+def small_instances():
+    """Instanzen mit 16 Paketen, klein genug für Brute Force über alle Kombinationen."""
+    return [
+        generate_instance(seed=seed, team_count=2, package_count=16, max_packages=4, name=f"brute{seed}")
+        for seed in BRUTE_FORCE_SEEDS
+    ]
+
+
+@pytest.fixture(scope="session")
+def small_models(small_instances):
+    """Ungekürzte Models der small_instances."""
+    return [unpruned_model(instance) for instance in small_instances]
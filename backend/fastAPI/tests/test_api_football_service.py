@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from app.core.config import settings
+from app.services.api_football_service import APIFootballService
+
+GAME_DATE = datetime(2024, 11, 9, tzinfo=timezone.utc)
+FIXTURES = {"response": []}
+
+
+class StubResponse:
+    def __init__(self, status: int, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+    async def json(self):
+        return FIXTURES
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubSession:
+    """Stub für die aiohttp-Session: liefert die Statuscodes der Reihe nach, dann 200."""
+
+    def __init__(self, statuses=(), delay: float = 0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = []
+
+    def get(self, url, params=None):
+        self.requests.append(params)
+        session = self
+
+        class Request:
+            async def __aenter__(self):
+                await asyncio.sleep(session.delay)
+                status = session.statuses.pop(0) if session.statuses else 200
+                return StubResponse(status, {"Retry-After": "0"} if status == 429 else None)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Request()
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "API_FOOTBALL_BACKOFF", 0.0)
+    monkeypatch.setattr(settings, "API_FOOTBALL_RETRIES", 3)
+
+
+def _service(session: StubSession) -> APIFootballService:
+    service = APIFootballService()
+    service._get_session = lambda: session
+    return service
+
+
+def test_concurrent_calls_share_one_fetch():
+    session = StubSession(delay=0.05)
+    service = _service(session)
+
+    async def run():
+        return await asyncio.gather(*(
+            service._fetch_from_api("Bundesliga 24/25", GAME_DATE) for _ in range(10)
+        ))
+
+    results = asyncio.run(run())
+    assert results == [FIXTURES] * 10
+    assert len(session.requests) == 1
+    assert not service._in_flight
+
+
+def test_rate_limit_and_server_errors_are_retried(no_backoff):
+    session = StubSession(statuses=[429, 503, 500])
+    service = _service(session)
+
+    assert asyncio.run(service._fetch_from_api("Bundesliga 24/25", GAME_DATE)) == FIXTURES
+    assert len(session.requests) == 4
+
+
+def test_client_errors_are_not_retried(no_backoff):
+    session = StubSession(statuses=[404])
+    service = _service(session)
+
+    with pytest.raises(Exception, match="404"):
+        asyncio.run(service._fetch_from_api("Bundesliga 24/25", GAME_DATE))
+    assert len(session.requests) == 1
+
+
+def test_retries_give_up_after_limit(no_backoff):
+    session = StubSession(statuses=[503] * 4)
+    service = _service(session)
+
+    with pytest.raises(Exception, match="503"):
+        asyncio.run(service._fetch_from_api("Bundesliga 24/25", GAME_DATE))
+    assert len(session.requests) == 4
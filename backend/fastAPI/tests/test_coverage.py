@@ -0,0 +1,14 @@
+from benchmarks.coverage import _query_offers, _same, legacy_coverage_map
+from app.services.optimization.coverage import CoverageBuilder
+
+
+def test_builder_matches_legacy_coverage_map(small_instances, instance):
+    for current in small_instances + [instance]:
+        offers = _query_offers(current)
+        coverage_maps = CoverageBuilder(current.packages, offers).coverage_maps(current.games)
+        # Wie im Batch: ein Builder über die Angebote vieler Spiele
+        shared_maps = CoverageBuilder(current.packages, current.offers).coverage_maps(current.games)
+        for require_live in (True, False):
+            expected = legacy_coverage_map(current.games, current.packages, offers, require_live)
+            assert _same(coverage_maps[require_live], expected), f"{current.name}, require_live={require_live}"
+            assert _same(shared_maps[require_live], expected), f"{current.name}, require_live={require_live}"
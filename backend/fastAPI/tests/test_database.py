@@ -0,0 +1,47 @@
+import asyncio
+from app.core.database import PostgresDatabase, _positional
+
+
+class RecordingPool:
+    """Stub für den asyncpg-Pool: merkt sich SQL und Bind-Argumente."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetch(self, sql, *args):
+        self.calls.append((sql, args))
+        return [{"id": 1}]
+
+
+def test_repeated_parameter_shares_placeholder():
+    sql, order = _positional(
+        "SELECT * FROM game WHERE team_home = :team OR team_away = :team AND starts_at >= :start",
+        ("start", "team")
+    )
+    assert sql == "SELECT * FROM game WHERE team_home = $1 OR team_away = $1 AND starts_at >= $2"
+    assert order == ("team", "start")
+
+
+def test_missing_parameter_and_casts_stay_untouched():
+    sql, order = _positional(
+        "SELECT :known::date, :unknown, '12:30' FROM game",
+        ("known",)
+    )
+    assert sql == "SELECT $1::date, :unknown, '12:30' FROM game"
+    assert order == ("known",)
+
+
+def test_list_parameter_is_bound_as_array():
+    database = PostgresDatabase("postgresql://unused", min_size=1, max_size=1)
+    database.pool = RecordingPool()
+
+    rows = asyncio.run(database.execute(
+        "SELECT id FROM game WHERE team_home = ANY(:teams) OR team_away = ANY(:teams) AND id > :min_id",
+        {"teams": ["Bayern München", "Borussia Dortmund"], "min_id": 3}
+    ))
+
+    assert rows == [{"id": 1}]
+    assert database.pool.calls == [(
+        "SELECT id FROM game WHERE team_home = ANY($1) OR team_away = ANY($1) AND id > $2",
+        (["Bayern München", "Borussia Dortmund"], 3)
+    )]
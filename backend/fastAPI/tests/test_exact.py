@@ -0,0 +1,27 @@
+import itertools
+from app.services.optimization.exact import ExactOptimizer
+from app.services.optimization.simulated_annealing.evaluator import SolutionEvaluator
+from app.services.package_cost_calculator import PackageCostCalculator
+
+
+def brute_force_score(model, max_packages: int) -> float:
+    """Bester Score über alle Kombinationen mit 1..max_packages Paketen."""
+    evaluator = SolutionEvaluator(PackageCostCalculator())
+    return max(
+        evaluator.evaluate(list(solution), model)
+        for count in range(1, max_packages + 1)
+        for solution in itertools.combinations(range(len(model.packages)), count)
+    )
+
+
+def test_exact_matches_brute_force(small_instances, small_models):
+    calculator = PackageCostCalculator()
+    evaluator = SolutionEvaluator(calculator)
+    optimizer = ExactOptimizer(calculator)
+
+    for instance, model in zip(small_instances, small_models):
+        for max_packages in (1, 2, 4):
+            solution = optimizer.solve(model, max_packages)
+            assert len(solution) <= max_packages
+            assert abs(evaluator.evaluate(solution, model) - brute_force_score(model, max_packages)) < 1e-9, \
+                f"{instance.name}, max_packages={max_packages}"
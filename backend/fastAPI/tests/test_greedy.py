@@ -0,0 +1,34 @@
+from app.services.optimization.greedy import GreedyOptimizer
+from app.services.package_cost_calculator import PackageCostCalculator
+
+
+def full_scan_rank(optimizer: GreedyOptimizer, model) -> list:
+    """Greedy ohne Lazy Evaluation: bewertet pro Runde alle Pakete neu."""
+    ranking = []
+    covered_mask = 0
+    while True:
+        evaluations = [
+            optimizer._evaluate(model, index, covered_mask)
+            for index in range(len(model.packages))
+            if index not in ranking
+        ]
+        # Bester Score, bei Gleichstand der kleinste Index
+        best = max(
+            filter(None, evaluations),
+            key=lambda evaluation: (evaluation['score'], -evaluation['index']),
+            default=None
+        )
+        if best is None:
+            return ranking
+        ranking.append(best['index'])
+        covered_mask |= best['new_mask']
+
+
+def test_lazy_greedy_matches_full_scan(small_instances, small_models, model):
+    optimizer = GreedyOptimizer(PackageCostCalculator())
+
+    named_models = [(instance.name, small_model) for instance, small_model in zip(small_instances, small_models)]
+    for name, coverage_model in named_models + [("fixture", model)]:
+        expected = full_scan_rank(optimizer, coverage_model)
+        assert optimizer.rank(coverage_model) == expected, name
+        assert optimizer.rank(coverage_model, limit=2) == expected[:2], name
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from datetime import datetime
+from benchmarks.generator import InstanceDatabase
+from app.core.kv_store import MemoryStore
+from app.services.job_service import JobManager
+from app.services.package_service import PackageService
+from app.utils.query import normalize_query
+
+
+def test_duplicate_jobs_are_keyed_by_time_budget(instance):
+    package_service = PackageService(InstanceDatabase(instance))
+    manager = JobManager(MemoryStore(), max_workers=2, ttl=60, max_time_budget=5.0)
+    query = normalize_query(["Team A"], datetime(2024, 8, 1), 3, True)
+
+    async def submit(time_budget):
+        return await manager.submit(query, instance.games, [], package_service, time_budget=time_budget)
+
+    async def run():
+        short = await submit(0.1)
+        assert (await submit(0.1))["id"] == short["id"]
+
+        longer = await submit(0.2)
+        assert longer["id"] != short["id"]
+        assert longer["time_budget"] == 0.2
+
+        # Budgets über dem Maximum landen beim selben (gekappten) Job
+        capped = await submit(60.0)
+        assert capped["time_budget"] == 5.0
+        assert (await submit(30.0))["id"] == capped["id"]
+
+        for job in (short, longer, capped):
+            await manager.cancel(job["id"])
+        await manager.shutdown(1.0)
+
+    asyncio.run(run())
+
+
+class CancelBeforeWriteStore(MemoryStore):
+    """Simuliert einen Abbruch auf einem anderen Worker direkt vor dem nächsten Update."""
+
+    def __init__(self):
+        super().__init__()
+        self.cancel_next = False
+
+    async def compare_and_set(self, key, expected, value, ttl):
+        if self.cancel_next:
+            self.cancel_next = False
+            await self.set(key, json.dumps({**json.loads(expected), "status": "cancelled"}), ttl)
+        return await super().compare_and_set(key, expected, value, ttl)
+
+
+def test_refinement_does_not_overwrite_concurrent_cancel(instance):
+    package_service = PackageService(InstanceDatabase(instance))
+    store = CancelBeforeWriteStore()
+    manager = JobManager(store, max_workers=1, ttl=60, max_time_budget=5.0)
+    query = normalize_query(["Team A"], datetime(2024, 8, 1), 3, True)
+
+    async def run():
+        job = await manager.submit(query, instance.games, [], package_service, time_budget=0.5)
+        store.cancel_next = True
+        await manager.shutdown(5.0)
+        stored = await manager._load(job["id"])
+        assert stored["status"] == "cancelled"
+        assert stored["updates"] == 1
+
+    asyncio.run(run())
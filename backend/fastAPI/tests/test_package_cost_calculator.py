@@ -0,0 +1,39 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import pytest
+from app.services.package_cost_calculator import MONTH_EPOCH_YEAR, PackageCostCalculator, month_label, month_ordinal
+
+PACKAGE = {"id": 1, "monthly_price_cents": 1000, "monthly_price_yearly_subscription_in_cents": 700}
+
+
+def test_cost_cache_is_bounded():
+    calculator = PackageCostCalculator(cache_size=8)
+    for month_mask in range(1, 100):
+        calculator.cost_for_months(PACKAGE, month_mask)
+    assert calculator.cache_info().currsize == 8
+
+
+def test_cost_cache_is_shared_between_threads():
+    calculator = PackageCostCalculator(cache_size=64)
+    masks = [month_mask % 32 + 1 for month_mask in range(2000)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        costs = list(pool.map(lambda month_mask: calculator.cost_for_months(PACKAGE, month_mask)['total_cost'], masks))
+    # Gleiche Kosten wie ohne Cache
+    assert costs == [PackageCostCalculator(cache_size=0).cost_for_months(PACKAGE, m)['total_cost'] for m in masks]
+    assert calculator.cache_info().currsize <= 64
+
+
+def test_calculator_pickles_without_cache():
+    calculator = PackageCostCalculator(cache_size=8)
+    calculator.cost_for_months(PACKAGE, 0b111)
+    copy = pickle.loads(pickle.dumps(calculator))
+    assert copy.cache_info().currsize == 0
+    assert copy.cost_for_months(PACKAGE, 0b111) == calculator.cost_for_months(PACKAGE, 0b111)
+
+
+def test_month_ordinal_rejects_dates_before_epoch():
+    assert month_ordinal(datetime(MONTH_EPOCH_YEAR, 1, 15)) == 0
+    assert month_label(month_ordinal(datetime(2024, 8, 24, tzinfo=timezone.utc))) == "2024-08"
+    with pytest.raises(ValueError):
+        month_ordinal(datetime(MONTH_EPOCH_YEAR - 1, 12, 31))
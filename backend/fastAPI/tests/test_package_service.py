@@ -0,0 +1,63 @@
+import asyncio
+import threading
+from benchmarks.generator import InstanceDatabase
+from app.services.package_service import PackageService
+
+
+def test_closing_stream_stops_annealing_thread(instance):
+    service = PackageService(InstanceDatabase(instance))
+    anneal = service.sa_optimizer.anneal
+    running = threading.Event()
+    finished = threading.Event()
+
+    def tracked_anneal(*args, **kwargs):
+        running.set()
+        try:
+            return anneal(*args, **kwargs)
+        finally:
+            finished.set()
+
+    service.sa_optimizer.anneal = tracked_anneal
+
+    async def run():
+        stream = service.iter_best_combinations(instance.games, instance.max_packages, time_limit=30.0)
+        assert (await stream.__anext__())['strategy'] == "greedy"
+        # Weiterlesen startet das SA; Verbesserungen gibt es nicht zwingend
+        try:
+            await asyncio.wait_for(stream.__anext__(), timeout=0.2)
+        except asyncio.TimeoutError:
+            pass
+        assert running.is_set()
+        await stream.aclose()
+        # Nach dem Schließen läuft keine Kette mehr im Hintergrund
+        assert finished.is_set()
+
+    asyncio.run(run())
+
+
+class PoisonedDatabase(InstanceDatabase):
+    """Angebots-Query schlägt fehl, sobald ein bestimmtes Spiel darin vorkommt."""
+
+    def __init__(self, instance, poisoned_game_id: int):
+        super().__init__(instance)
+        self.poisoned_game_id = poisoned_game_id
+
+    async def execute(self, query, params=None):
+        if "FROM streaming_offer" in query and self.poisoned_game_id in params["game_ids"]:
+            raise ValueError("kaputtes Spiel")
+        return await super().execute(query, params)
+
+
+def test_batch_failure_of_one_query_keeps_other_results(instance):
+    games = instance.games
+    service = PackageService(PoisonedDatabase(instance, poisoned_game_id=games[-1].id))
+    queries = [
+        {"games": games[:10], "max_packages": 2, "require_live": True},
+        {"games": games[-5:], "max_packages": 2, "require_live": True},
+        {"games": games[10:20], "max_packages": 2, "require_live": True}
+    ]
+
+    results = asyncio.run(service.find_best_combinations_batch(queries, latency_budget=0.1))
+
+    assert isinstance(results[1], ValueError)
+    assert all(isinstance(result, dict) and result['selected_packages'] for result in (results[0], results[2]))
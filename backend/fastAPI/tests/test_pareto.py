@@ -0,0 +1,50 @@
+import itertools
+from app.services.optimization.pareto import ParetoOptimizer
+from app.services.optimization.simulated_annealing.evaluator import IncrementalEvaluator
+from app.services.package_cost_calculator import PackageCostCalculator
+
+
+def point(model, evaluator: IncrementalEvaluator, solution) -> tuple:
+    """(Kosten, abgedecktes Gewicht) einer Lösung."""
+    covered_mask = 0
+    for index in solution:
+        covered_mask |= model.masks[index]
+    return sum(evaluator.package_cost(index) for index in solution), round(model.weight_of(covered_mask), 9)
+
+
+def brute_force_front(model, evaluator: IncrementalEvaluator, max_packages: int) -> list:
+    """Nicht dominierte Punkte aller Kombinationen mit 1..max_packages Paketen, aufsteigend nach Kosten."""
+    candidates = [index for index, mask in enumerate(model.masks) if mask]
+    points = sorted(
+        (point(model, evaluator, solution)
+         for count in range(1, max_packages + 1)
+         for solution in itertools.combinations(candidates, count)),
+        key=lambda p: (p[0], -p[1])
+    )
+    front = []
+    for cost, weight in points:
+        if not front or weight > front[-1][1]:
+            front.append((cost, weight))
+    return front
+
+
+def test_front_matches_brute_force(small_instances, small_models):
+    calculator = PackageCostCalculator()
+    # Ohne Ausdünnen muss die Front exakt sein
+    unbounded = ParetoOptimizer(calculator, max_states=10 ** 6)
+    default = ParetoOptimizer(calculator)
+
+    for instance, model in zip(small_instances, small_models):
+        evaluator = IncrementalEvaluator(calculator, model)
+        for max_packages in (1, 2, 4):
+            expected = brute_force_front(model, evaluator, max_packages)
+            solutions, exact = unbounded.front(model, max_packages)
+            assert exact, instance.name
+            assert all(len(solution) <= max_packages for solution in solutions)
+            assert [point(model, evaluator, solution) for solution in solutions] == expected, \
+                f"{instance.name}, max_packages={max_packages}"
+
+            # Mit Ausdünnen darf die Front nur exakt heißen, wenn sie es ist
+            solutions, exact = default.front(model, max_packages)
+            if exact:
+                assert [point(model, evaluator, solution) for solution in solutions] == expected, instance.name
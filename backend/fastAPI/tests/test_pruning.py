@@ -0,0 +1,43 @@
+import itertools
+from app.services.optimization.pruning import PackagePruner
+from app.services.optimization.simulated_annealing.evaluator import SolutionEvaluator
+from app.services.package_cost_calculator import PackageCostCalculator
+
+
+def best_score(model, max_packages: int) -> float:
+    """Optimum per Brute Force über alle Kombinationen mit 1..max_packages Paketen."""
+    evaluator = SolutionEvaluator(PackageCostCalculator())
+    return max(
+        evaluator.evaluate(list(solution), model)
+        for count in range(1, max_packages + 1)
+        for solution in itertools.combinations(range(len(model.packages)), count)
+    )
+
+
+def test_pruning_keeps_the_optimum(small_instances, small_models):
+    calculator = PackageCostCalculator()
+    pruner = PackagePruner(calculator)
+
+    for instance, model in zip(small_instances, small_models):
+        pruned = pruner.prune(model)
+        report = pruned.pruning
+        # Jedes entfernte Paket ist leer, dominiert oder äquivalent zu einem verbleibenden
+        removed = report['empty'] + len(report['dominated']) + sum(
+            len(entry['equivalents']) for entry in report['equivalent']
+        )
+        assert report['candidates_after'] + removed == report['candidates_before'], instance.name
+
+        index_of = {package['name']: index for index, package in enumerate(model.packages)}
+
+        def cost(index):
+            return calculator.cost_for_months(model.packages[index], model.month_masks[index])['total_cost']
+
+        # Dominierende Pakete decken alle Spiele ab und kosten höchstens gleich viel
+        for entry in report['dominated']:
+            package, dominator = index_of[entry['package']], index_of[entry['dominated_by']]
+            assert model.masks[package] & ~model.masks[dominator] == 0, instance.name
+            assert cost(dominator) <= cost(package), instance.name
+
+        for max_packages in (1, 2, 4):
+            assert abs(best_score(pruned, max_packages) - best_score(model, max_packages)) < 1e-9, \
+                f"{instance.name}, max_packages={max_packages}"
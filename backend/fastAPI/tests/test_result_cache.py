@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timezone
+from app.core.kv_store import MemoryStore
+from app.core.result_cache import ResultCache
+from app.core.snapshot import DatasetSnapshot
+from app.core.snapshot_file import write_snapshot
+
+GAMES = [{
+    "id": 1,
+    "team_home": "Bayern München",
+    "team_away": "Borussia Dortmund",
+    "tournament_name": "Bundesliga 24/25",
+    "starts_at": datetime(2024, 8, 24, 18, 30, tzinfo=timezone.utc)
+}]
+PACKAGES = [{"id": 1, "name": "Sky", "monthly_price_cents": 2999, "monthly_price_yearly_subscription_in_cents": 2499}]
+QUERY = {"teams": ["Bayern München"], "start_date": "2024-08-01", "max_packages": 3, "require_live": True}
+
+
+def _cache(snapshot=None) -> ResultCache:
+    return ResultCache(MemoryStore(), local_size=10, local_ttl=60, ttl=60, snapshot=snapshot)
+
+
+def test_entry_survives_without_data_change(tmp_path):
+    path = str(tmp_path / "dataset.snapshot")
+    write_snapshot(path, GAMES, [], PACKAGES)
+    snapshot = DatasetSnapshot(path)
+    snapshot.reopen()
+    cache = _cache(snapshot)
+
+    async def run():
+        await cache.set(QUERY, {"total_cost": 1.0})
+        assert await cache.get(QUERY) == {"total_cost": 1.0}
+
+    asyncio.run(run())
+
+
+def test_snapshot_refresh_invalidates_cached_entry(tmp_path):
+    path = str(tmp_path / "dataset.snapshot")
+    write_snapshot(path, GAMES, [], PACKAGES)
+    snapshot = DatasetSnapshot(path)
+    snapshot.reopen()
+    cache = _cache(snapshot)
+
+    async def run():
+        await cache.set(QUERY, {"total_cost": 1.0})
+        version = await cache.dataset_version()
+
+        # Neuer Export (z.B. durch den Refresh eines anderen Workers), dann Wechsel
+        write_snapshot(path, GAMES, [{"game_id": 1, "streaming_package_id": 1, "live": True, "highlights": True}], PACKAGES)
+        assert snapshot.reopen()
+
+        assert await cache.dataset_version() != version
+        assert await cache.get(QUERY) is None
+
+    asyncio.run(run())
+
+
+def test_bump_dataset_version_invalidates_without_snapshot():
+    cache = _cache()
+
+    async def run():
+        await cache.set(QUERY, {"total_cost": 1.0})
+        await cache.bump_dataset_version()
+        assert await cache.get(QUERY) is None
+
+    asyncio.run(run())
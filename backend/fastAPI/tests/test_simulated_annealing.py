@@ -0,0 +1,28 @@
+import random
+from app.services.optimization.simulated_annealing.optimizer import SimulatedAnnealingOptimizer
+from app.services.package_cost_calculator import PackageCostCalculator
+
+
+def test_anneal_continues_schedule_across_stages(instance, model):
+    optimizer = SimulatedAnnealingOptimizer(PackageCostCalculator(), max_iterations=20000)
+    initial_solution = optimizer.initial_solution(model, instance.max_packages)
+
+    random.seed(1)
+    # Epoche 1: kalibriert den Plan für das Gesamtbudget, läuft aber nur einen Teil
+    first = optimizer.anneal(model, initial_solution, instance.max_packages, 0.02, schedule_time_limit=10.0)
+    cooling = first['cooling']
+    temperature, iterations, reheats = cooling.temperature, cooling.iterations, cooling.reheats
+    assert cooling.iteration_budget == 20000
+    assert 0 < iterations < 20000
+
+    # Epoche 2: setzt denselben Plan fort, ohne neu zu kalibrieren
+    second = optimizer.anneal(
+        model, first['current_solution'], instance.max_packages, 10.0, cooling=cooling
+    )
+    assert second['cooling'] is cooling
+    assert cooling.start_temperature == first['stats']['initial_temperature']
+    assert cooling.iterations == iterations + second['iterations']
+    assert cooling.reheats >= reheats
+    # Der Plan läuft bis zum Ende des Gesamtbudgets (oder stagniert vorher)
+    assert cooling.iterations == 20000 or cooling.finished
+    assert cooling.temperature < temperature or cooling.finished